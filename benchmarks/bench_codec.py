@@ -0,0 +1,119 @@
+"""
+Бенчмарк кодеков JSON
+
+Сравнивает прежний путь сериализации (to_dict + json.dumps с indent=2 для
+файлов, TaskResponse/LogEntryResponse через pydantic для API) с кодеками
+из repository/codec.py на списке заданий и на потоке записей лога.
+
+Запуск: python benchmarks/bench_codec.py [число_заданий [число_логов]]
+По умолчанию 10 000 заданий и 1 000 000 записей лога.
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+# Добавляем корень проекта в PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import TypeAdapter
+
+from domain.task import Task, TaskStatus
+from domain.log import LogEntry, LogLevel, LogCategory
+from repository.codec import JSONCodec, OrjsonCodec, orjson
+from web.schemas import TaskResponse, LogEntryResponse
+
+
+DEFAULT_TASKS = 10_000
+DEFAULT_LOGS = 1_000_000
+
+
+def make_tasks(count: int) -> List[Task]:
+    """Создает задания для замера"""
+    return [
+        Task(type_task="Ввоз", status=TaskStatus.WAITING, date="2024-01-01", time_slot="08:00-12:00",
+             num_auto=f"А{i % 1000:03d}АА78", driver="Иванов И.И.", place="Терминал 1",
+             number_container=f"MSKU{i:07d}", position=(i + 1) * 1024)
+        for i in range(count)
+    ]
+
+
+def make_logs(count: int) -> List[LogEntry]:
+    """Создает записи лога для замера"""
+    now = datetime.now()
+    return [
+        LogEntry(id=f"log_{i}", timestamp=now, level=LogLevel.INFO, category=LogCategory.TASK_EXECUTION,
+                 message="Попытка записи на слот", details=f"Попытка {i % 60}", task_id=f"task_{i % 500}")
+        for i in range(count)
+    ]
+
+
+def timed(func) -> float:
+    """Время выполнения функции в секундах"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench_tasks(tasks: List[Task], codecs) -> None:
+    """Файл заданий и ответ /api/tasks"""
+    adapter = TypeAdapter(List[TaskResponse])
+    rows = [
+        ("файл: to_dict + json indent=2",
+         lambda: json.dumps([t.to_dict() for t in tasks], ensure_ascii=False, indent=2).encode('utf-8')),
+        ("API: TaskResponse + pydantic",
+         lambda: adapter.dump_json([TaskResponse(**t.to_dict()) for t in tasks])),
+    ]
+    for codec in codecs:
+        rows.append((f"{codec.name}.encode_tasks", lambda codec=codec: codec.encode_tasks(tasks)))
+
+    data = JSONCodec().encode_tasks(tasks)
+    rows.append(("чтение: json.loads + from_dict", lambda: [Task.from_dict(d) for d in json.loads(data)]))
+    for codec in codecs:
+        rows.append((f"чтение: {codec.name}.loads + from_dict",
+                     lambda codec=codec: [Task.from_dict(d) for d in codec.loads(data)]))
+
+    print(f"\nЗадания: {len(tasks)}")
+    for name, func in rows:
+        print(f"  {name:<40} {timed(func):>8.3f} s")
+
+
+def bench_logs(entries: List[LogEntry], codecs) -> None:
+    """Строки сегмента логов и ответ /api/logs"""
+    adapter = TypeAdapter(List[LogEntryResponse])
+    rows = [
+        ("сегмент: to_dict + json.dumps",
+         lambda: [json.dumps(e.to_dict(), ensure_ascii=False).encode('utf-8') for e in entries]),
+        ("API: LogEntryResponse + pydantic",
+         lambda: adapter.dump_json([LogEntryResponse(**e.to_dict()) for e in entries])),
+    ]
+    for codec in codecs:
+        rows.append((f"сегмент: {codec.name}.encode_log",
+                     lambda codec=codec: [codec.encode_log(e) for e in entries]))
+        rows.append((f"API: {codec.name}.encode_logs", lambda codec=codec: codec.encode_logs(entries)))
+
+    print(f"\nЗаписи лога: {len(entries)}")
+    for name, func in rows:
+        print(f"  {name:<40} {timed(func):>8.3f} s")
+
+
+def main():
+    """Точка входа"""
+    task_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TASKS
+    log_count = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LOGS
+
+    codecs = [JSONCodec()]
+    if orjson is not None:
+        codecs.append(OrjsonCodec())
+    else:
+        print("orjson не установлен - замеряется только стандартный кодек")
+
+    bench_tasks(make_tasks(task_count), codecs)
+    bench_logs(make_logs(log_count), codecs)
+
+
+if __name__ == "__main__":
+    main()
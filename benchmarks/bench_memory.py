@@ -0,0 +1,91 @@
+"""
+Бенчмарк памяти моделей
+
+Сравнивает память, занимаемую записями лога LogEntry и их компактным
+вариантом CompactLogEntry из domain/compact.py. Записи создаются из
+словарей, как при чтении из хранилища (from_dict после разбора JSON).
+
+Запуск: python benchmarks/bench_memory.py [число_логов]
+По умолчанию 1 000 000 записей лога.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Добавляем корень проекта в PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from domain.log import LogEntry
+from domain.compact import CompactLogEntry
+
+
+DEFAULT_LOGS = 1_000_000
+
+LEVELS = ["INFO", "INFO", "INFO", "DEBUG", "WARN", "ERROR"]
+CATEGORIES = ["TASK_EXECUTION", "BROWSER_AUTOMATION", "USER_ACTION", "SYSTEM"]
+MESSAGES = ["Попытка записи на слот", "Слот недоступен", "Задание запущено", "Страница загружена"]
+
+
+def log_dicts(count: int):
+    """Словари записей лога в том виде, в каком они приходят из сегментов"""
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        yield {
+            "id": f"log_{i:09d}",
+            "timestamp": (start + timedelta(milliseconds=37 * i)).isoformat(),
+            "level": LEVELS[i % len(LEVELS)],
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            # Строки из JSON - отдельные объекты, даже если текст совпадает
+            "message": "".join(MESSAGES[i % len(MESSAGES)]),
+            "details": f"Попытка {i % 60}",
+            "task_id": "".join(f"task_{i % 500}"),
+            "user_action": i % 10 == 0,
+            "error": ""
+        }
+
+
+def measure(factory, make_dicts, count: int) -> tuple:
+    """Память списка объектов (МБ) и время его построения (с)
+
+    Время замеряется отдельным проходом: под tracemalloc оно сильно завышено.
+    """
+    dicts = list(make_dicts(count))
+    gc.collect()
+    start = time.perf_counter()
+    items = [factory(data) for data in dicts]
+    elapsed = time.perf_counter() - start
+    del items
+
+    gc.collect()
+    tracemalloc.start()
+    items = [factory(data) for data in dicts]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current / 1024 / 1024, elapsed
+
+
+def report(title: str, count: int, rows) -> None:
+    """Печатает таблицу замеров"""
+    print(f"\n{title}: {count}")
+    print(f"  {'модель':<18} {'память, МБ':>11} {'байт/объект':>12} {'время, с':>9}")
+    for name, (memory, elapsed) in rows:
+        print(f"  {name:<18} {memory:>11.1f} {memory * 1024 * 1024 / count:>12.0f} {elapsed:>9.2f}")
+
+
+def main():
+    """Точка входа"""
+    log_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LOGS
+
+    report("Записи лога", log_count, [
+        ("LogEntry", measure(LogEntry.from_dict, log_dicts, log_count)),
+        ("CompactLogEntry", measure(CompactLogEntry.from_dict, log_dicts, log_count)),
+    ])
+
+
+if __name__ == "__main__":
+    main()
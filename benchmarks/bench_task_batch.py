@@ -0,0 +1,97 @@
+"""
+Бенчмарк пакетного обновления заданий
+
+Сравнивает остановку N заданий по одному (save в цикле) и одним вызовом
+update_fields_many для JSON и SQLite хранилищ.
+
+Запуск: python benchmarks/bench_task_batch.py [N ...]
+"""
+
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Добавляем корень проекта в PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from domain.task import Task, TaskStatus
+from repository.json_repository import JSONTaskRepository
+from repository.sqlite_repository import SQLiteDatabase, SQLiteTaskRepository
+
+
+DEFAULT_SIZES = [50, 200, 1000, 5000]
+
+
+def make_json_repo(data_dir: str):
+    """Создает JSON репозиторий заданий"""
+    repo = JSONTaskRepository(data_dir)
+    repo.initialize()
+    return repo
+
+
+def make_sqlite_repo(data_dir: str):
+    """Создает SQLite репозиторий заданий"""
+    db = SQLiteDatabase(str(Path(data_dir) / "bench.db"))
+    db.initialize()
+    return SQLiteTaskRepository(db)
+
+
+def fill(repo, count: int) -> None:
+    """Заполняет репозиторий заданиями в работе"""
+    repo.save_many([
+        Task(type_task="Ввоз", status=TaskStatus.IN_WORK, in_work=True, date="2024-01-01",
+             time_slot="08:00-12:00", num_auto="А001АА78", driver="Иванов И.И.")
+        for _ in range(count)
+    ])
+
+
+def stop_one_by_one(repo) -> None:
+    """Старый путь: save для каждого задания"""
+    for task in repo.get_by_status(TaskStatus.IN_WORK):
+        task.status = TaskStatus.WAITING
+        task.updated_at = datetime.now()
+        repo.save(task)
+
+
+def stop_batch(repo) -> None:
+    """Новый путь: одно пакетное обновление"""
+    now = datetime.now()
+    repo.update_fields_many({
+        task.id: {"status": TaskStatus.WAITING, "updated_at": now}
+        for task in repo.get_by_status(TaskStatus.IN_WORK)
+    })
+
+
+def measure(factory, count: int, stop) -> float:
+    """Время остановки count заданий в секундах"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        repo = factory(data_dir)
+        fill(repo, count)
+        start = time.perf_counter()
+        stop(repo)
+        elapsed = time.perf_counter() - start
+        if hasattr(repo, 'db'):
+            repo.db.close()
+        return elapsed
+
+
+def main():
+    """Точка входа"""
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'backend':<8} {'tasks':>6} {'save loop, s':>13} {'batch, s':>10} {'speedup':>8}")
+    for name, factory in (("json", make_json_repo), ("sqlite", make_sqlite_repo)):
+        for count in sizes:
+            # Цикл save для JSON квадратичен - большие размеры не ждем
+            if name == "json" and count > 2000:
+                loop = float('nan')
+            else:
+                loop = measure(factory, count, stop_one_by_one)
+            batch = measure(factory, count, stop_batch)
+            print(f"{name:<8} {count:>6} {loop:>13.3f} {batch:>10.4f} {loop / batch:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
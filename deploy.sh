@@ -102,6 +102,14 @@ pip install -q -r requirements.txt || {
 }
 echo -e "${GREEN}✓ Зависимости обновлены${NC}"
 
+# Собираем статику: файлы с хешем в имени и сжатые копии
+echo -e "${YELLOW}📦 Собираем статические файлы...${NC}"
+python -m web.assets || {
+    echo -e "${RED}❌ Ошибка сборки статических файлов${NC}"
+    exit 1
+}
+echo -e "${GREEN}✓ Статические файлы собраны${NC}"
+
 # Проверяем, что uvicorn установлен (должен быть в requirements.txt)
 echo -e "${YELLOW}📦 Проверяем uvicorn...${NC}"
 pip show uvicorn >/dev/null 2>&1 || {
@@ -1,13 +1,15 @@
 """Доменные модели системы"""
 from .task import Task, TaskStatus, TaskType, TIME_SLOTS
-from .settings import Settings, ConnectionTestResult
-from .references import ReferenceItem, References, ReferenceType
+from .settings import Settings, FrozenSettings, ConnectionTestResult
+from .references import ReferenceItem, References, ReferenceType, ReferenceIndex
 from .log import LogEntry, LogLevel, LogCategory
+from .compact import CompactLogEntry
 
 __all__ = [
     'Task', 'TaskStatus', 'TaskType', 'TIME_SLOTS',
-    'Settings', 'ConnectionTestResult',
-    'ReferenceItem', 'References', 'ReferenceType',
-    'LogEntry', 'LogLevel', 'LogCategory'
+    'Settings', 'FrozenSettings', 'ConnectionTestResult',
+    'ReferenceItem', 'References', 'ReferenceType', 'ReferenceIndex',
+    'LogEntry', 'LogLevel', 'LogCategory',
+    'CompactLogEntry'
 ]
 
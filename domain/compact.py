@@ -0,0 +1,161 @@
+"""Компактное представление записи лога для кольцевого буфера в памяти
+
+Класс со __slots__ не заводит словарь атрибутов на каждый экземпляр.
+Уровень и категория хранятся как общие экземпляры Enum, поэтому все
+записи ссылаются на одни и те же объекты. Сообщения, ID заданий и
+ошибки не интернируются: их значения почти не повторяются, и таблица
+интернированных строк росла бы без ограничений. Дата хранится в том
+виде, в котором пришла из хранилища (ISO строка), и разбирается в
+datetime только при первом обращении, а to_dict отдает исходную строку
+без разбора.
+
+Контракт to_dict/from_dict совпадает с обычными моделями; методы
+моделей (is_valid, __str__ и т.п.) переиспользуются как есть.
+
+Компактных вариантов Task и ReferenceItem нет намеренно: заданий и
+элементов справочников в памяти тысячи (около 600 байт на задание), а
+кэши репозиториев отдают наружу копии обычных моделей, так что
+компактное хранение добавило бы разбор дат на каждое чтение ради
+нескольких мегабайт. Памятью распоряжаются логи - их миллионы.
+"""
+import sys
+from datetime import datetime
+from typing import Tuple
+
+from .log import LogEntry, LogLevel, LogCategory, generate_log_id
+
+
+class LazyDatetime:
+    """Поле даты: хранит ISO строку и разбирает ее при первом чтении"""
+
+    def __set_name__(self, owner, name):
+        self.slot = "_" + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if type(value) is str:
+            value = datetime.fromisoformat(value)
+            setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, value)
+
+    def isoformat(self, obj) -> str:
+        """ISO строка без разбора, если дата еще не разбиралась"""
+        value = getattr(obj, self.slot)
+        return value if type(value) is str else value.isoformat()
+
+
+class CompactModel:
+    """Общая часть компактных моделей"""
+
+    __slots__ = ()
+
+    # Поля в порядке to_dict и поля-даты
+    FIELDS: Tuple[str, ...] = ()
+    DATES: Tuple[str, ...] = ()
+    model = None
+
+    def to_dict(self) -> dict:
+        """Преобразует объект в словарь"""
+        cls = type(self)
+        data = {}
+        for name in self.FIELDS:
+            if name in self.DATES:
+                data[name] = getattr(cls, name).isoformat(self)
+            else:
+                value = getattr(self, name)
+                data[name] = value.value if name in ('level', 'category') else value
+        return data
+
+    def to_model(self):
+        """Создает обычную модель (dataclass) с теми же данными"""
+        values = {name: getattr(self, name) for name in self.FIELDS}
+        return self.model(**values)
+
+    @classmethod
+    def from_model(cls, model) -> 'CompactModel':
+        """Создает компактную копию обычной модели"""
+        return cls(**{name: getattr(model, name) for name in cls.FIELDS})
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CompactModel) or (self.model is not None and isinstance(other, self.model)):
+            return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+    @staticmethod
+    def _date_from(data: dict, name: str):
+        """Дата из словаря в виде строки или datetime; None, если ее нет"""
+        value = data.get(name)
+        if isinstance(value, (str, datetime)):
+            return value
+        return None
+
+
+class CompactLogEntry(CompactModel):
+    """Компактная запись лога"""
+
+    __slots__ = ('id', '_timestamp', 'level', 'category', 'message', 'details', 'task_id', 'user_action', 'error')
+
+    FIELDS = ('id', 'timestamp', 'level', 'category', 'message', 'details', 'task_id', 'user_action', 'error')
+    DATES = ('timestamp',)
+    model = LogEntry
+
+    timestamp = LazyDatetime()
+
+    def __init__(self, id: str = None, timestamp=None, level: LogLevel = LogLevel.INFO,
+                 category: LogCategory = LogCategory.SYSTEM, message: str = "", details: str = "",
+                 task_id: str = "", user_action: bool = False, error: str = ""):
+        self.id = id if id is not None else generate_log_id()
+        self._timestamp = timestamp if timestamp is not None else datetime.now()
+        # Уровень и категория - общие экземпляры Enum
+        self.level = LogLevel(level)
+        self.category = LogCategory(category)
+        self.message = message
+        self.details = details
+        self.task_id = task_id
+        self.user_action = user_action
+        self.error = error
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CompactLogEntry':
+        """Создает объект из словаря"""
+        return cls(
+            id=data.get('id'),
+            timestamp=cls._date_from(data, 'timestamp'),
+            level=data.get('level', 'INFO'),
+            category=data.get('category', 'SYSTEM'),
+            message=data.get('message', ''),
+            details=data.get('details', ''),
+            task_id=data.get('task_id', ''),
+            user_action=data.get('user_action', False),
+            error=data.get('error', '')
+        )
+
+    def day(self) -> str:
+        """День записи (YYYY-MM-DD) без разбора даты"""
+        value = self._timestamp
+        return value[:10] if type(value) is str else value.date().isoformat()
+
+    __str__ = LogEntry.__str__
+    get_level_color = LogEntry.get_level_color
+
+
+def compact_sizeof(obj: CompactModel) -> int:
+    """Оценка памяти компактного объекта вместе с его значениями (общие Enum не учитываются)"""
+    size = sys.getsizeof(obj)
+    for slot in obj.__slots__:
+        value = getattr(obj, slot)
+        if isinstance(value, (LogLevel, LogCategory)) or value is None or type(value) is bool:
+            continue
+        size += sys.getsizeof(value)
+    return size
@@ -1,7 +1,7 @@
 """Модели справочников"""
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List
+from typing import Dict, FrozenSet, List, Optional
 from enum import Enum
 import random
 import string
@@ -242,7 +242,7 @@ class References:
     def has_duplicate_value(self, ref_type: ReferenceType, value: str) -> bool:
         """Проверяет наличие дубликата"""
         items = self.get_active_items(ref_type)
-        return any(item.value.lower() == value.lower() for item in items)
+        return any(item.value.casefold() == value.casefold() for item in items)
 
     def validate_new_item(self, ref_type: ReferenceType, value: str, description: str = "") -> tuple[bool, str]:
         """Валидирует новый элемент справочника"""
@@ -257,6 +257,42 @@ class References:
         return True, ""
 
 
+class ReferenceIndex:
+    """Снимок справочников с множествами активных значений по типам
+
+    Проверка значения - поиск в множестве, без перебора элементов и
+    чтения хранилища. Снимок неизменяем и помечен версией хранилища, из
+    которой построен; репозиторий строит новый при смене версии.
+    """
+
+    def __init__(self, references: References, version: Optional[int] = None):
+        self.references = references
+        self.version = version
+        # Активные значения в порядке справочника (для сообщений об ошибках)
+        self._values: Dict[ReferenceType, List[str]] = {}
+        self._sets: Dict[ReferenceType, FrozenSet[str]] = {}
+        self._folded: Dict[ReferenceType, FrozenSet[str]] = {}
+        for ref_type in ReferenceType:
+            values = [item.value for item in references.get_active_items(ref_type)]
+            self._values[ref_type] = values
+            self._sets[ref_type] = frozenset(values)
+            self._folded[ref_type] = frozenset(value.casefold() for value in values)
+
+    def get_active_values(self, ref_type: ReferenceType) -> List[str]:
+        """Возвращает активные значения справочника"""
+        return list(self._values.get(ref_type, []))
+
+    def contains(self, ref_type: ReferenceType, value: str) -> bool:
+        """Есть ли значение среди активных элементов справочника (точное совпадение)"""
+        return value in self._sets.get(ref_type, ())
+
+    def has_duplicate_value(self, ref_type: ReferenceType, value: str) -> bool:
+        """Проверяет наличие дубликата без учета регистра"""
+        return value.casefold() in self._folded.get(ref_type, ())
+
+    validate_new_item = References.validate_new_item
+
+
 def get_reference_type_display_name(ref_type: ReferenceType) -> str:
     """Возвращает отображаемое имя типа справочника"""
     names = {
@@ -125,6 +125,28 @@ class Settings:
         self.updated_at = datetime.now()
 
 
+class FrozenSettings(Settings):
+    """Настройки только для чтения: общий снимок, который нельзя случайно изменить"""
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> 'FrozenSettings':
+        """Создает неизменяемую копию настроек"""
+        frozen = object.__new__(cls)
+        for name in settings.__dataclass_fields__:
+            object.__setattr__(frozen, name, getattr(settings, name))
+        return frozen
+
+    def thaw(self) -> Settings:
+        """Возвращает изменяемую копию"""
+        return Settings(**{name: getattr(self, name) for name in self.__dataclass_fields__})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Снимок настроек только для чтения: используйте get() и update()")
+
+    def __delattr__(self, name):
+        raise AttributeError("Снимок настроек только для чтения: используйте get() и update()")
+
+
 @dataclass
 class ConnectionTestResult:
     """Результат теста подключения"""
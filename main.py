@@ -4,7 +4,7 @@ import signal
 import sys
 from pathlib import Path
 
-from repository.json_repository import JSONDataManager
+from repository import create_data_manager
 from service.task_service import TaskService
 from service.automation_service import AutomationService
 from web.server import create_web_server
@@ -21,7 +21,7 @@ def main():
     data_dir = home_dir / ".rlisystems_python"
     
     # Инициализируем менеджер данных
-    data_manager = JSONDataManager(str(data_dir))
+    data_manager = create_data_manager(str(data_dir))
     
     try:
         data_manager.initialize()
@@ -41,7 +41,8 @@ def main():
         data_manager.get_tasks(),
         data_manager.get_logs(),
         data_manager.get_references(),
-        data_manager.get_settings()
+        data_manager.get_settings(),
+        data_manager.unit_of_work
     )
     
     automation_service = AutomationService(
@@ -67,6 +68,7 @@ def main():
         )
         data_manager.get_logs().save(shutdown_log)
         
+        # Сбрасываем очередь логов на диск и закрываем хранилище
         data_manager.close()
         print("Приложение успешно завершено")
         sys.exit(0)
@@ -1,12 +1,40 @@
 """Слой хранения данных"""
+import os
+
 from .interfaces import (
     TaskRepository, SettingsRepository, ReferencesRepository, 
     LogRepository, DataManager
 )
+from .unit_of_work import UnitOfWork
 from .json_repository import JSONDataManager
+from .sqlite_repository import SQLiteDataManager
+
+
+def create_data_manager(data_dir: str) -> DataManager:
+    """Создает менеджер данных по переменным окружения
+
+    Хранилище выбирается переменной RLI_STORAGE: json (по умолчанию) или sqlite.
+    Параметры очереди логов задаются RLI_LOG_FLUSH_MS и RLI_LOG_BATCH_SIZE,
+    для JSON хранилища также RLI_LOG_FSYNC и RLI_LOG_BUFFER_SIZE.
+    """
+    if os.getenv('RLI_STORAGE', 'json') == 'sqlite':
+        return SQLiteDataManager(
+            data_dir,
+            log_flush_interval_ms=int(os.getenv('RLI_LOG_FLUSH_MS', 200)),
+            log_batch_size=int(os.getenv('RLI_LOG_BATCH_SIZE', 200))
+        )
+    return JSONDataManager(
+        data_dir,
+        log_fsync_policy=os.getenv('RLI_LOG_FSYNC', 'interval'),
+        log_buffer_size=int(os.getenv('RLI_LOG_BUFFER_SIZE', 1000)),
+        log_flush_interval_ms=int(os.getenv('RLI_LOG_FLUSH_MS', 200)),
+        log_batch_size=int(os.getenv('RLI_LOG_BATCH_SIZE', 200))
+    )
+
 
 __all__ = [
     'TaskRepository', 'SettingsRepository', 'ReferencesRepository',
-    'LogRepository', 'DataManager', 'JSONDataManager'
+    'LogRepository', 'DataManager', 'JSONDataManager',
+    'SQLiteDataManager', 'UnitOfWork', 'create_data_manager'
 ]
 
@@ -0,0 +1,107 @@
+"""Атомарная запись файлов и redo-журнал для многофайловых операций"""
+import os
+import tempfile
+from typing import Any, Dict
+
+from . import codec
+
+
+def fsync_dir(path: str) -> None:
+    """Синхронизирует каталог, чтобы переименование файла пережило сбой питания"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # На Windows каталоги так не открываются - rename там и так журналируется ФС
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(file_name: str, payload: bytes) -> None:
+    """Атомарно заменяет файл: запись во временный файл, fsync, rename, fsync каталога
+
+    Читатель видит либо старое, либо новое содержимое целиком, но
+    никогда не обрезанный файл.
+    """
+    directory = os.path.dirname(os.path.abspath(file_name))
+    fd, tmp_name = tempfile.mkstemp(
+        prefix="." + os.path.basename(file_name) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, file_name)
+    except BaseException:
+        try:
+            os.remove(tmp_name)
+        except OSError:
+            pass
+        raise
+    fsync_dir(directory)
+
+
+def atomic_write_json(file_name: str, data: Any) -> None:
+    """Атомарно записывает JSON-файл (компактно, кодеком хранилища)"""
+    atomic_write_bytes(file_name, codec.dumps(data))
+
+
+class Journal:
+    """Redo-журнал для операций, меняющих несколько JSON-файлов
+
+    Новое содержимое всех файлов сначала атомарно записывается в
+    journal.json, затем файлы по очереди атомарно заменяются, после
+    чего журнал удаляется. Если процесс упал посередине, recover() при
+    следующем запуске доприменяет журнал: каждый шаг идемпотентен.
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.file_name = os.path.join(data_dir, "journal.json")
+
+    def write_files(self, files: Dict[str, Any]) -> None:
+        """Записывает несколько JSON-файлов как одну операцию
+
+        files - словарь: имя файла относительно каталога данных -> данные.
+        """
+        atomic_write_json(self.file_name, {"files": files})
+        self._apply(files)
+        self._clear()
+
+    def recover(self) -> int:
+        """Доприменяет незавершенную операцию; возвращает количество восстановленных файлов"""
+        if not os.path.exists(self.file_name):
+            return 0
+
+        try:
+            with open(self.file_name, 'rb') as f:
+                record = codec.loads(f.read())
+        except Exception as e:
+            # Журнал пишется атомарно, поэтому поврежденным он быть не должен
+            print(f"Ошибка чтения журнала: {e}")
+            self._clear()
+            return 0
+
+        files = record.get('files', {})
+        self._apply(files)
+        self._clear()
+        print(f"[OK] Journal recovered: {len(files)} file(s)")
+        return len(files)
+
+    def _apply(self, files: Dict[str, Any]) -> None:
+        """Атомарно заменяет каждый файл"""
+        for name, data in files.items():
+            atomic_write_json(os.path.join(self.data_dir, name), data)
+
+    def _clear(self) -> None:
+        """Удаляет журнал"""
+        try:
+            os.remove(self.file_name)
+        except FileNotFoundError:
+            return
+        fsync_dir(self.data_dir)
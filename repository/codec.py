@@ -0,0 +1,140 @@
+"""Кодеки JSON для хранилища и API
+
+Все места, где данные превращаются в JSON-байты и обратно (файлы
+хранилища, строки логов, ответы API), идут через один кодек. По
+умолчанию используется orjson, если он установлен: он написан на C и
+умеет кодировать dataclass-модели (Task, LogEntry) напрямую в байты,
+минуя to_dict. Без orjson работает компактный кодек на стандартном json.
+Выбор можно переопределить переменной окружения RLI_CODEC (json/orjson).
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость
+    orjson = None
+
+from domain.task import Task
+from domain.log import LogEntry
+
+
+def _default(obj: Any) -> Any:
+    """Преобразует модели и даты, которые не умеет кодировать json"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Объект типа {type(obj).__name__} не сериализуется в JSON")
+
+
+class JSONCodec:
+    """Компактный кодек на стандартном модуле json"""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """Кодирует объект в JSON-байты без пробелов"""
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+    def loads(self, data) -> Any:
+        """Декодирует JSON из байтов или строки"""
+        return json.loads(data)
+
+    def encode_task(self, task: Task) -> bytes:
+        """Кодирует задание"""
+        return self.dumps(task.to_dict())
+
+    def encode_log(self, entry: LogEntry) -> bytes:
+        """Кодирует запись лога"""
+        return self.dumps(entry.to_dict())
+
+    def encode_tasks(self, tasks: Iterable[Task]) -> bytes:
+        """Кодирует список заданий в JSON-массив"""
+        return self.dumps([task.to_dict() for task in tasks])
+
+    def encode_logs(self, entries: Iterable[LogEntry]) -> bytes:
+        """Кодирует список записей лога в JSON-массив"""
+        return self.dumps([entry.to_dict() for entry in entries])
+
+
+class OrjsonCodec(JSONCodec):
+    """Кодек на orjson: dataclass, datetime и Enum кодируются без промежуточных словарей
+
+    Даты без часового пояса orjson выводит так же, как datetime.isoformat(),
+    поэтому результат совпадает с JSONCodec.
+    """
+
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        """Кодирует объект в JSON-байты"""
+        return orjson.dumps(obj, default=_default)
+
+    def loads(self, data) -> Any:
+        """Декодирует JSON из байтов или строки"""
+        return orjson.loads(data)
+
+    def encode_task(self, task: Task) -> bytes:
+        """Кодирует задание"""
+        return orjson.dumps(task)
+
+    def encode_log(self, entry: LogEntry) -> bytes:
+        """Кодирует запись лога"""
+        return orjson.dumps(entry)
+
+    def encode_tasks(self, tasks: Iterable[Task]) -> bytes:
+        """Кодирует список заданий в JSON-массив"""
+        return orjson.dumps(list(tasks))
+
+    def encode_logs(self, entries: Iterable[LogEntry]) -> bytes:
+        """Кодирует список записей лога в JSON-массив"""
+        return orjson.dumps(list(entries))
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """Возвращает кодек по имени; без имени - самый быстрый из доступных"""
+    if name is None:
+        return OrjsonCodec() if orjson is not None else JSONCodec()
+    if name == JSONCodec.name:
+        return JSONCodec()
+    if name == OrjsonCodec.name:
+        if orjson is None:
+            raise ValueError("Кодек orjson недоступен: установите пакет orjson")
+        return OrjsonCodec()
+    raise ValueError(f"Неизвестный кодек: {name}")
+
+
+codec = get_codec(os.getenv('RLI_CODEC') or None)
+
+
+def dumps(obj: Any) -> bytes:
+    """Кодирует объект кодеком по умолчанию"""
+    return codec.dumps(obj)
+
+
+def loads(data) -> Any:
+    """Декодирует JSON кодеком по умолчанию"""
+    return codec.loads(data)
+
+
+def encode_task(task: Task) -> bytes:
+    """Кодирует задание кодеком по умолчанию"""
+    return codec.encode_task(task)
+
+
+def encode_log(entry: LogEntry) -> bytes:
+    """Кодирует запись лога кодеком по умолчанию"""
+    return codec.encode_log(entry)
+
+
+def encode_tasks(tasks: Iterable[Task]) -> bytes:
+    """Кодирует список заданий кодеком по умолчанию"""
+    return codec.encode_tasks(tasks)
+
+
+def encode_logs(entries: Iterable[LogEntry]) -> bytes:
+    """Кодирует список записей лога кодеком по умолчанию"""
+    return codec.encode_logs(entries)
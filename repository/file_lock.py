@@ -0,0 +1,125 @@
+"""Межпроцессные блокировки и счетчики изменений хранилища"""
+import mmap
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+COUNTER_FORMAT = "<Q"
+COUNTER_SIZE = struct.calcsize(COUNTER_FORMAT)
+
+
+class InterProcessLock:
+    """Эксклюзивная блокировка файла, общая для всех процессов (воркеров uvicorn/gunicorn)
+
+    На Unix используется fcntl.flock, на Windows - msvcrt.locking.
+    Блокировка реентерабельна внутри потока и одновременно исключает
+    другие потоки этого процесса. Файл открывается заново после fork,
+    чтобы дочерние процессы не делили один открытый дескриптор.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+        self._pid = None
+
+    def acquire(self) -> None:
+        """Захватывает блокировку"""
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._lock_file()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self) -> None:
+        """Освобождает блокировку"""
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_file()
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def _lock_file(self) -> None:
+        """Берет блокировку файла"""
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            while True:
+                try:
+                    msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK сдается примерно через 10 секунд - продолжаем ждать
+                    continue
+
+    def _unlock_file(self) -> None:
+        """Снимает блокировку файла"""
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+
+class ChangeCounter:
+    """Общий для процессов счетчик изменений хранилища
+
+    Счетчик - 8 байт в файле, отображенном в память, поэтому проверка
+    "изменилось ли хранилище" стоит одного чтения памяти без системных
+    вызовов. Увеличивать счетчик нужно под межпроцессной блокировкой
+    хранилища, после того как изменения записаны на диск.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = None
+
+    def value(self) -> int:
+        """Текущее значение счетчика"""
+        return struct.unpack_from(COUNTER_FORMAT, self._mapping())[0]
+
+    def increment(self) -> int:
+        """Увеличивает счетчик и возвращает новое значение (вызывается под блокировкой)"""
+        mapping = self._mapping()
+        value = struct.unpack_from(COUNTER_FORMAT, mapping)[0] + 1
+        struct.pack_into(COUNTER_FORMAT, mapping, 0, value)
+        return value
+
+    def _mapping(self) -> mmap.mmap:
+        """Отображает файл счетчика в память, создавая его при необходимости"""
+        if self._map is None:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size < COUNTER_SIZE:
+                    # Дописываем нули до нужного размера; значение, записанное другим процессом, не трогаем
+                    os.ftruncate(fd, COUNTER_SIZE)
+                self._map = mmap.mmap(fd, COUNTER_SIZE)
+            finally:
+                os.close(fd)
+        return self._map
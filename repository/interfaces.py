@@ -1,10 +1,13 @@
 """Интерфейсы репозиториев"""
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict
+from datetime import datetime
+from typing import Any, List, Optional, Dict, Tuple
 from domain.task import Task
-from domain.settings import Settings
-from domain.references import References, ReferenceItem, ReferenceType
-from domain.log import LogEntry, LogLevel
+from domain.settings import Settings, FrozenSettings
+from domain.references import References, ReferenceItem, ReferenceType, ReferenceIndex
+from domain.log import LogEntry, LogLevel, LogCategory
+from .ranking import plan_move
+from .unit_of_work import UnitOfWork, TaskChange, SAVE, DELETE, FIELDS, POSITIONS, MOVE
 
 
 class TaskRepository(ABC):
@@ -44,6 +47,111 @@ class TaskRepository(ABC):
     def get_active_tasks_in_order(self) -> List[Task]:
         """Получает активные задания в порядке выполнения"""
         pass
+    
+    def version(self) -> Optional[int]:
+        """Версия заданий: растет при каждом изменении; None, если хранилище не ведет версий"""
+        return None
+    
+    def save_many(self, tasks: List[Task]) -> None:
+        """Сохраняет несколько заданий
+        
+        Реализации сохраняют всю пачку за одну запись хранилища.
+        """
+        for task in tasks:
+            self.save(task)
+    
+    def update_fields_many(self, updates: Dict[str, Dict[str, Any]]) -> List[Task]:
+        """Обновляет поля нескольких заданий: ID задания -> {поле: значение}
+        
+        Если updated_at не передан, он выставляется в текущее время.
+        Несуществующие задания пропускаются; возвращает обновленные задания.
+        """
+        updated = []
+        for task_id, fields in updates.items():
+            task = self.get_by_id(task_id)
+            if task:
+                self._apply_fields(task, fields)
+                self.save(task)
+                updated.append(task)
+        return updated
+    
+    def apply_changes(self, changes: List[TaskChange]) -> None:
+        """Применяет пачку изменений заданий (см. UnitOfWork) в порядке следования
+        
+        Реализации применяют всю пачку за одну запись хранилища.
+        """
+        for kind, data in changes:
+            if kind == SAVE:
+                self.save(data)
+            elif kind == DELETE:
+                self.delete(data)
+            elif kind == FIELDS:
+                task_id, fields = data
+                self.update_fields_many({task_id: fields})
+            elif kind == POSITIONS:
+                self.update_positions(data)
+            elif kind == MOVE:
+                self.move_task(*data)
+            else:
+                raise ValueError(f"Неизвестное изменение задания: {kind}")
+    
+    def move_task(self, task_id: str, before_id: Optional[str] = None) -> Task:
+        """Перемещает задание перед before_id (в конец списка, если None)
+        
+        Как правило, меняется только позиция самого задания.
+        """
+        order = [(task.position, task.id) for task in self.get_all()]
+        order.sort()
+        positions = plan_move(order, task_id, before_id)
+        if positions:
+            self.update_positions(positions)
+        return self.get_by_id(task_id)
+    
+    def get_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[int, str]] = None,
+        status: Optional[str] = None,
+        date: Optional[str] = None,
+        in_work: Optional[bool] = None,
+        driver: Optional[str] = None
+    ) -> List[Task]:
+        """Страница заданий в порядке (позиция, ID), начиная строго после ключа after
+        
+        Фильтры со значением None не применяются. Ключ (позиция, ID)
+        последнего задания страницы служит курсором следующей страницы.
+        """
+        tasks = sorted(self.get_all(), key=lambda t: (t.position, t.id))
+        page = []
+        for task in tasks:
+            if after is not None and (task.position, task.id) <= after:
+                continue
+            if self._matches(task, status, date, in_work, driver):
+                page.append(task)
+                if len(page) >= limit:
+                    break
+        return page
+    
+    @staticmethod
+    def _matches(task: Task, status: Optional[str], date: Optional[str],
+                 in_work: Optional[bool], driver: Optional[str]) -> bool:
+        """Проверяет задание на соответствие фильтрам страницы"""
+        return (
+            (status is None or task.status == status) and
+            (date is None or task.date == date) and
+            (in_work is None or task.in_work == in_work) and
+            (driver is None or task.driver == driver)
+        )
+    
+    @staticmethod
+    def _apply_fields(task: Task, fields: Dict[str, Any]) -> None:
+        """Применяет изменения полей к заданию"""
+        for name, value in fields.items():
+            if name == "id" or name not in Task.__dataclass_fields__:
+                raise ValueError(f"Недопустимое поле задания: {name}")
+            setattr(task, name, value)
+        if "updated_at" not in fields:
+            task.updated_at = datetime.now()
 
 
 class SettingsRepository(ABC):
@@ -68,6 +176,19 @@ class SettingsRepository(ABC):
     def exists(self) -> bool:
         """Проверяет существование настроек"""
         pass
+    
+    def version(self) -> Optional[int]:
+        """Версия настроек: растет при каждом изменении; None, если хранилище не ведет версий"""
+        return None
+    
+    def get_snapshot(self) -> FrozenSettings:
+        """Снимок настроек только для чтения
+        
+        Реализация по умолчанию читает настройки при каждом вызове; хранилища,
+        ведущие версии, кешируют снимок до смены версии. Для изменения
+        настроек нужны get() и update().
+        """
+        return FrozenSettings.from_settings(self.get())
 
 
 class ReferencesRepository(ABC):
@@ -102,6 +223,20 @@ class ReferencesRepository(ABC):
     def get_active_items(self, ref_type: ReferenceType) -> List[ReferenceItem]:
         """Получает активные элементы справочника"""
         pass
+    
+    def version(self) -> Optional[int]:
+        """Версия справочников: растет при каждом изменении; None, если хранилище не ведет версий"""
+        return None
+    
+    def get_index(self) -> ReferenceIndex:
+        """Снимок справочников с индексом активных значений
+        
+        Реализация по умолчанию строит снимок при каждом вызове; хранилища,
+        ведущие версии, кешируют его до смены версии.
+        """
+        # Версия берется до чтения: снимок не может оказаться новее своей версии
+        version = self.version()
+        return ReferenceIndex(self.get(), version)
 
 
 class LogRepository(ABC):
@@ -112,6 +247,11 @@ class LogRepository(ABC):
         """Сохраняет запись лога"""
         pass
     
+    def save_many(self, entries: List[LogEntry]) -> None:
+        """Сохраняет пачку записей лога"""
+        for entry in entries:
+            self.save(entry)
+    
     @abstractmethod
     def get_all(self) -> List[LogEntry]:
         """Получает все логи"""
@@ -127,6 +267,11 @@ class LogRepository(ABC):
         """Получает логи по уровню"""
         pass
     
+    @abstractmethod
+    def get_by_category(self, category: LogCategory) -> List[LogEntry]:
+        """Получает логи по категории"""
+        pass
+    
     @abstractmethod
     def get_user_actions(self) -> List[LogEntry]:
         """Получает логи действий пользователя"""
@@ -151,6 +296,36 @@ class LogRepository(ABC):
     def search(self, query: str) -> List[LogEntry]:
         """Поиск в логах"""
         pass
+    
+    def version(self) -> Optional[int]:
+        """Версия логов: растет при каждом изменении; None, если хранилище не ведет версий"""
+        return None
+    
+    def get_cursor(self) -> str:
+        """Курсор конца хранилища: get_since с ним вернет только записи, добавленные позже
+        
+        Курсор непрозрачен для клиента. Реализация по умолчанию - число
+        записей, что подходит хранилищам, где записи только дописываются.
+        """
+        return str(len(self.get_all()))
+    
+    def get_since(self, cursor: str, limit: int) -> Tuple[List[LogEntry], str]:
+        """Записи, добавленные после курсора (не больше limit), и курсор после последней из них"""
+        try:
+            start = int(cursor)
+        except ValueError:
+            raise ValueError(f"Некорректный курсор логов: {cursor}")
+        entries = self.get_all()[start:start + limit]
+        return entries, str(start + len(entries))
+    
+    def sync_if_due(self) -> None:
+        """Сбрасывает на диск записи, ждущие fsync дольше интервала политики
+        
+        Вызывается периодически, в том числе когда новых записей нет, чтобы
+        последние записи перед простоем не оставались без fsync.
+        Реализация по умолчанию ничего не делает.
+        """
+        pass
 
 
 class DataManager(ABC):
@@ -200,4 +375,8 @@ class DataManager(ABC):
     def restore(self, backup_path: str) -> None:
         """Восстанавливает из резервной копии"""
         pass
+    
+    def unit_of_work(self) -> UnitOfWork:
+        """Единица работы над заданиями и логами: изменения применяются вместе в конце"""
+        return UnitOfWork(self.get_tasks(), self.get_logs())
 
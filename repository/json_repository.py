@@ -1,138 +1,475 @@
 """JSON реализация репозиториев"""
-import json
+import copy
 import os
 import shutil
+import time
+from contextlib import ExitStack
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 from threading import Lock
-from typing import List, Optional, Dict
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, List, Optional, Dict, Set, Tuple
 
 from domain.task import Task
-from domain.settings import Settings
-from domain.references import References, ReferenceItem, ReferenceType
-from domain.log import LogEntry, LogLevel
+from domain.settings import Settings, FrozenSettings
+from domain.references import References, ReferenceItem, ReferenceType, ReferenceIndex
+from domain.log import LogEntry
 from .interfaces import (
     TaskRepository, SettingsRepository, ReferencesRepository, 
     LogRepository, DataManager
 )
+from .jsonl_log_repository import JSONLLogRepository, FSYNC_INTERVAL, DEFAULT_BUFFER_SIZE, SEGMENT_SUFFIX
+from .log_writer import BackgroundLogWriter, DEFAULT_FLUSH_INTERVAL_MS, DEFAULT_BATCH_SIZE
+from . import codec
+from .atomic import atomic_write_bytes, atomic_write_json, Journal
+from .file_lock import InterProcessLock, ChangeCounter
+from .ranking import POSITION_GAP, plan_move
+from .unit_of_work import UnitOfWork, TaskChange, SAVE, DELETE, FIELDS, POSITIONS, MOVE
+
+
+# Как часто проверять файл заданий по stat, если счетчик изменений не менялся (секунды)
+STAT_RECHECK_INTERVAL = 1.0
+
+# Поля заданий с индексом значение -> ID заданий
+INDEXED_TASK_FIELDS = ("status", "date", "driver")
+
+# Файл справочника переписывается, когда мертвых строк не меньше этого числа и больше, чем живых
+REFERENCE_COMPACT_MIN_LINES = 100
 
 
 class JSONTaskRepository(TaskRepository):
-    """JSON репозиторий заданий"""
+    """JSON репозиторий заданий
+
+    Разобранные задания держатся в памяти в словаре по ID и обновляются
+    при каждой записи. Если файл изменен другим процессом (изменились
+    inode, время модификации или размер), кэш перечитывается.
+    Наружу всегда отдаются копии, чтобы изменения вызывающего кода
+    не попадали в кэш до явного save().
+    
+    Запись идет под межпроцессной блокировкой: кэш обновляется с диска,
+    изменяется и сохраняется, после чего увеличивается общий счетчик
+    изменений. Другие процессы сверяют кэш со счетчиком (чтение памяти),
+    а файл проверяют по stat не чаще раза в STAT_RECHECK_INTERVAL секунд -
+    на случай правки файла в обход приложения.
+    
+    Вместе с кэшем поддерживаются индексы: статус, дата и водитель -> ID
+    заданий и отсортированные по (позиции, ID) списки всех и активных
+    (in_work) заданий, так что выборки и страницы не перебирают и не
+    сортируют все задания.
+    """
     
     def __init__(self, data_dir: str):
         self.data_dir = data_dir
         self.file_name = os.path.join(data_dir, "tasks.json")
         self.lock = Lock()
+        self.file_lock = InterProcessLock(os.path.join(data_dir, ".tasks.lock"))
+        self.changes = ChangeCounter(os.path.join(data_dir, ".tasks.version"))
+        self._tasks: Dict[str, Task] = {}
+        self._by_field: Dict[str, Dict[str, Set[str]]] = {name: {} for name in INDEXED_TASK_FIELDS}
+        self._order: List[Tuple[int, str]] = []
+        self._in_work: List[Tuple[int, str]] = []
+        self._file_stamp = None
+        self._seen_version = None
+        self._stat_deadline = 0.0
     
     def initialize(self) -> None:
         """Инициализация"""
-        if not os.path.exists(self.file_name):
-            self._save_to_file([])
+        with self.lock, self.file_lock:
+            if not os.path.exists(self.file_name):
+                self._persist()
     
     def save(self, task: Task) -> None:
         """Сохраняет задание"""
-        with self.lock:
-            tasks = self._load_from_file()
-            found = False
+        with self.lock, self.file_lock:
+            self._refresh()
+            
+            if task.id not in self._tasks:
+                # Новое задание ставим в конец с промежутком для последующих перемещений
+                task.position = self._max_position() + POSITION_GAP
             
-            for i, existing_task in enumerate(tasks):
-                if existing_task.id == task.id:
-                    tasks[i] = task
-                    found = True
-                    break
+            self._put(copy.copy(task))
+            self._persist()
+    
+    def save_many(self, tasks: List[Task]) -> None:
+        """Сохраняет несколько заданий за одну запись файла"""
+        if not tasks:
+            return
+        with self.lock, self.file_lock:
+            self._refresh()
+            
+            max_position = self._max_position()
+            for task in tasks:
+                if task.id not in self._tasks:
+                    max_position += POSITION_GAP
+                    task.position = max_position
+                self._put(copy.copy(task))
+            self._persist()
+    
+    def update_fields_many(self, updates: Dict[str, Dict[str, Any]]) -> List[Task]:
+        """Обновляет поля нескольких заданий за одну запись файла"""
+        if not updates:
+            return []
+        with self.lock, self.file_lock:
+            self._refresh()
             
-            if not found:
-                # Определяем максимальную позицию
-                max_position = max([t.position for t in tasks], default=0)
-                task.position = max_position + 1
-                tasks.append(task)
+            updated = []
+            for task_id, fields in updates.items():
+                task = self._tasks.get(task_id)
+                if task:
+                    # Меняем копию, чтобы ошибка в полях не оставила кэш наполовину измененным
+                    task = copy.copy(task)
+                    self._apply_fields(task, fields)
+                    updated.append(task)
             
-            self._save_to_file(tasks)
+            if updated:
+                for task in updated:
+                    self._put(task)
+                self._persist()
+            return [copy.copy(task) for task in updated]
+    
+    def apply_changes(self, changes: List[TaskChange]) -> None:
+        """Применяет пачку изменений заданий за одну запись файла"""
+        if not changes:
+            return
+        with self.lock, self.file_lock:
+            self._refresh()
+            try:
+                changed = False
+                for kind, data in changes:
+                    changed = self._apply_change(kind, data) or changed
+            except BaseException:
+                # Кэш мог измениться частично - при следующем обращении он перечитается из файла
+                self._file_stamp = None
+                self._seen_version = None
+                raise
+            if changed:
+                self._persist()
+    
+    def _apply_change(self, kind: str, data: Any) -> bool:
+        """Применяет одно изменение к кэшу (вызывается под блокировкой); True, если что-то изменилось"""
+        if kind == SAVE:
+            if data.id not in self._tasks:
+                data.position = self._max_position() + POSITION_GAP
+            self._put(copy.copy(data))
+            return True
+        if kind == DELETE:
+            task = self._tasks.pop(data, None)
+            if task is not None:
+                self._unindex(task)
+            return task is not None
+        if kind == FIELDS:
+            task_id, fields = data
+            task = self._tasks.get(task_id)
+            if task is None:
+                return False
+            task = copy.copy(task)
+            self._apply_fields(task, fields)
+            self._put(task)
+            return True
+        if kind == POSITIONS:
+            return self._set_positions(data, touched=set(data))
+        if kind == MOVE:
+            task_id, before_id = data
+            positions = plan_move(self._order, task_id, before_id)
+            return self._set_positions(positions, touched={task_id})
+        raise ValueError(f"Неизвестное изменение задания: {kind}")
     
     def get_by_id(self, task_id: str) -> Optional[Task]:
         """Получает задание по ID"""
-        tasks = self._load_from_file()
-        for task in tasks:
-            if task.id == task_id:
-                return task
-        return None
+        with self.lock:
+            self._refresh()
+            task = self._tasks.get(task_id)
+            return copy.copy(task) if task else None
     
     def get_all(self) -> List[Task]:
         """Получает все задания"""
-        tasks = self._load_from_file()
-        tasks.sort(key=lambda t: t.position)
-        return tasks
+        with self.lock:
+            self._refresh()
+            return [copy.copy(self._tasks[task_id]) for _, task_id in self._order]
     
     def delete(self, task_id: str) -> None:
         """Удаляет задание"""
-        with self.lock:
-            tasks = self._load_from_file()
-            tasks = [t for t in tasks if t.id != task_id]
-            self._save_to_file(tasks)
+        with self.lock, self.file_lock:
+            self._refresh()
+            task = self._tasks.pop(task_id, None)
+            if task is not None:
+                self._unindex(task)
+                self._persist()
     
     def update_positions(self, task_positions: Dict[str, int]) -> None:
-        """Обновляет позиции заданий"""
-        with self.lock:
-            tasks = self._load_from_file()
-            for task in tasks:
-                if task.id in task_positions:
-                    task.position = task_positions[task.id]
-                    task.updated_at = datetime.now()
-            self._save_to_file(tasks)
+        """Обновляет позиции заданий; задания с неизменной позицией не трогаются"""
+        with self.lock, self.file_lock:
+            self._refresh()
+            if self._set_positions(task_positions, touched=set(task_positions)):
+                self._persist()
+    
+    def move_task(self, task_id: str, before_id: Optional[str] = None) -> Task:
+        """Перемещает задание перед before_id (в конец списка, если None)"""
+        with self.lock, self.file_lock:
+            self._refresh()
+            positions = plan_move(self._order, task_id, before_id)
+            # При перенумерации время изменения ставим только перемещенному заданию
+            if self._set_positions(positions, touched={task_id}):
+                self._persist()
+            return copy.copy(self._tasks[task_id])
     
     def get_by_status(self, status: str) -> List[Task]:
         """Получает задания по статусу"""
-        tasks = self.get_all()
-        return [t for t in tasks if t.status == status]
+        with self.lock:
+            self._refresh()
+            tasks = [copy.copy(self._tasks[task_id]) for task_id in self._by_field["status"].get(status, ())]
+        tasks.sort(key=lambda t: t.position)
+        return tasks
     
     def get_active_tasks_in_order(self) -> List[Task]:
         """Получает активные задания в порядке выполнения"""
-        tasks = self.get_all()
-        return [t for t in tasks if t.in_work]
+        with self.lock:
+            self._refresh()
+            return [copy.copy(self._tasks[task_id]) for _, task_id in self._in_work]
+    
+    def version(self) -> Optional[int]:
+        """Версия заданий - общий для процессов счетчик изменений
+        
+        Перед чтением счетчика кэш сверяется с файлом, чтобы правка файла
+        в обход приложения тоже сменила версию (и ETag).
+        """
+        with self.lock:
+            self._refresh()
+            return self.changes.value()
+    
+    def get_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[int, str]] = None,
+        status: Optional[str] = None,
+        date: Optional[str] = None,
+        in_work: Optional[bool] = None,
+        driver: Optional[str] = None
+    ) -> List[Task]:
+        """Страница заданий в порядке (позиция, ID), начиная строго после ключа after"""
+        with self.lock:
+            self._refresh()
+            keys = self._page_keys(status, date, in_work, driver)
+            start = bisect_right(keys, after) if after is not None else 0
+            page = []
+            for i in range(start, len(keys)):
+                task = self._tasks[keys[i][1]]
+                if self._matches(task, status, date, in_work, driver):
+                    page.append(copy.copy(task))
+                    if len(page) >= limit:
+                        break
+            return page
+    
+    def _page_keys(self, status: Optional[str], date: Optional[str],
+                   in_work: Optional[bool], driver: Optional[str]) -> List[Tuple[int, str]]:
+        """Отсортированные ключи самого узкого индекса под фильтры (вызывается под блокировкой)"""
+        keys = self._in_work if in_work else self._order
+        candidates = None
+        for name, value in (("status", status), ("date", date), ("driver", driver)):
+            if value is not None:
+                ids = self._by_field[name].get(value, ())
+                if candidates is None or len(ids) < len(candidates):
+                    candidates = ids
+        if candidates is not None and len(candidates) < len(keys):
+            keys = sorted((self._tasks[task_id].position, task_id) for task_id in candidates)
+        return keys
+    
+    def _set_positions(self, task_positions: Dict[str, int], touched: Set[str]) -> bool:
+        """Меняет позиции в кэше (вызывается под блокировкой); True, если что-то изменилось"""
+        now = datetime.now()
+        changed = False
+        for task_id, position in task_positions.items():
+            task = self._tasks.get(task_id)
+            if task is None or task.position == position:
+                continue
+            self._unindex(task)
+            task.position = position
+            if task_id in touched:
+                task.updated_at = now
+            self._index(task)
+            changed = True
+        return changed
+    
+    def _max_position(self) -> int:
+        """Наибольшая позиция среди заданий"""
+        return self._order[-1][0] if self._order else 0
+    
+    def _put(self, task: Task) -> None:
+        """Кладет задание в кэш и обновляет индексы (вызывается под блокировкой)"""
+        old = self._tasks.get(task.id)
+        if old is not None:
+            self._unindex(old)
+        self._tasks[task.id] = task
+        self._index(task)
+    
+    def _index(self, task: Task) -> None:
+        """Добавляет задание в индексы"""
+        for name in INDEXED_TASK_FIELDS:
+            self._by_field[name].setdefault(getattr(task, name), set()).add(task.id)
+        insort(self._order, (task.position, task.id))
+        if task.in_work:
+            insort(self._in_work, (task.position, task.id))
+    
+    def _unindex(self, task: Task) -> None:
+        """Убирает задание из индексов; task - объект, лежащий в кэше"""
+        for name in INDEXED_TASK_FIELDS:
+            index = self._by_field[name]
+            value = getattr(task, name)
+            ids = index.get(value)
+            if ids is not None:
+                ids.discard(task.id)
+                if not ids:
+                    del index[value]
+        key = (task.position, task.id)
+        self._remove_key(self._order, key)
+        if task.in_work:
+            self._remove_key(self._in_work, key)
+    
+    @staticmethod
+    def _remove_key(keys: List[Tuple[int, str]], key: Tuple[int, str]) -> None:
+        """Удаляет ключ из отсортированного списка"""
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+    
+    def _reindex(self) -> None:
+        """Перестраивает индексы по кэшу"""
+        self._by_field = {name: {} for name in INDEXED_TASK_FIELDS}
+        for task in self._tasks.values():
+            for name in INDEXED_TASK_FIELDS:
+                self._by_field[name].setdefault(getattr(task, name), set()).add(task.id)
+        self._order = sorted((t.position, t.id) for t in self._tasks.values())
+        self._in_work = [key for key in self._order if self._tasks[key[1]].in_work]
+    
+    def _refresh(self) -> None:
+        """Перечитывает файл, если он изменился с момента последнего чтения или записи
+        
+        Смена счетчика означает запись другим процессом - файл перечитывается
+        всегда: перезапись того же размера в пределах точности mtime не меняет
+        отметку stat. Отметка проверяется только при неизменном счетчике,
+        чтобы заметить правку файла в обход приложения. Вызывается под блокировкой.
+        """
+        version = self.changes.value()
+        now = time.monotonic()
+        if version == self._seen_version and now < self._stat_deadline:
+            return
+        self._stat_deadline = now + STAT_RECHECK_INTERVAL
+        
+        stamp = self._stat()
+        if version == self._seen_version and stamp == self._file_stamp:
+            return
+        
+        tasks = self._load_from_file()
+        if tasks is None:
+            # Файл поврежден или дописывается - оставляем прежний кэш
+            return
+        
+        self._tasks = {task.id: task for task in tasks}
+        self._reindex()
+        self._file_stamp = stamp
+        self._seen_version = self._bump_if_edited(version)
+    
+    def _bump_if_edited(self, version: int) -> int:
+        """Поднимает счетчик, если файл перечитан из-за правки в обход приложения
+        
+        Счетчик при этом не менялся, поэтому без увеличения версия и ETag
+        остались бы прежними для новых данных. Возвращает текущую версию.
+        """
+        if self._seen_version is None or version != self._seen_version:
+            return version
+        with self.file_lock:
+            return self.changes.increment()
+    
+    def _persist(self) -> None:
+        """Записывает кэш в файл и запоминает его отметку (вызывается под обеими блокировками)"""
+        self._save_to_file(list(self._tasks.values()))
+        self._file_stamp = self._stat()
+        self._seen_version = self.changes.increment()
+    
+    def _stat(self):
+        """Отметка файла для проверки изменений: inode, время модификации, размер"""
+        try:
+            st = os.stat(self.file_name)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
     
     def _save_to_file(self, tasks: List[Task]) -> None:
         """Сохраняет задания в файл"""
         data = [task.to_dict() for task in tasks]
-        with open(self.file_name, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write_json(self.file_name, data)
     
-    def _load_from_file(self) -> List[Task]:
-        """Загружает задания из файла"""
+    def _load_from_file(self) -> Optional[List[Task]]:
+        """Загружает задания из файла; None, если файл не удалось разобрать"""
         if not os.path.exists(self.file_name):
             return []
         
         try:
-            with open(self.file_name, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(self.file_name, 'rb') as f:
+                data = codec.loads(f.read())
                 return [Task.from_dict(item) for item in data]
         except Exception as e:
             print(f"Ошибка чтения файла заданий: {e}")
-            return []
+            return None
 
 
 class JSONSettingsRepository(SettingsRepository):
-    """JSON репозиторий настроек"""
+    """JSON репозиторий настроек
+    
+    Разобранные настройки держатся в памяти. Запись обновляет кэш сразу;
+    изменения из других процессов видны по общему счетчику изменений,
+    а правка файла в обход приложения - по stat не позже чем через
+    STAT_RECHECK_INTERVAL секунд.
+    """
     
     def __init__(self, data_dir: str):
         self.data_dir = data_dir
         self.file_name = os.path.join(data_dir, "settings.json")
         self.lock = Lock()
+        self.file_lock = InterProcessLock(os.path.join(data_dir, ".settings.lock"))
+        self.changes = ChangeCounter(os.path.join(data_dir, ".settings.version"))
+        self._snapshot: Optional[FrozenSettings] = None
+        self._file_stamp = None
+        self._seen_version = None
+        self._stat_deadline = 0.0
     
     def initialize(self) -> None:
         """Инициализация"""
-        if not os.path.exists(self.file_name):
-            default_settings = Settings()
-            self._save_to_file(default_settings)
+        with self.lock, self.file_lock:
+            if not os.path.exists(self.file_name):
+                default_settings = Settings()
+                self._save_to_file(default_settings)
     
     def save(self, settings: Settings) -> None:
         """Сохраняет настройки"""
-        with self.lock:
+        with self.lock, self.file_lock:
             self._save_to_file(settings)
     
     def get(self) -> Settings:
-        """Получает настройки"""
-        return self._load_from_file()
+        """Получает настройки (изменяемую копию)"""
+        return self.get_snapshot().thaw()
+    
+    def get_snapshot(self) -> FrozenSettings:
+        """Снимок настроек только для чтения, без чтения файла, если он не менялся"""
+        with self.lock:
+            version = self.changes.value()
+            now = time.monotonic()
+            if self._snapshot is not None and version == self._seen_version and now < self._stat_deadline:
+                return self._snapshot
+            self._stat_deadline = now + STAT_RECHECK_INTERVAL
+            
+            # Смена счетчика - запись другим процессом: перечитываем без сверки с stat,
+            # отметка нужна только для правки файла в обход приложения
+            stamp = self._stat()
+            if self._snapshot is None or version != self._seen_version or stamp != self._file_stamp:
+                self._snapshot = FrozenSettings.from_settings(self._load_from_file())
+                self._file_stamp = stamp
+                if self._seen_version is not None and version == self._seen_version:
+                    # Файл изменен в обход приложения - поднимаем версию, чтобы сменился ETag
+                    with self.file_lock:
+                        version = self.changes.increment()
+            self._seen_version = version
+            return self._snapshot
     
     def update(self, settings: Settings) -> None:
         """Обновляет настройки"""
@@ -142,11 +479,30 @@ class JSONSettingsRepository(SettingsRepository):
         """Проверяет существование настроек"""
         return os.path.exists(self.file_name)
     
+    def version(self) -> Optional[int]:
+        """Версия настроек - общий для процессов счетчик изменений
+        
+        Перед чтением счетчика снимок сверяется с файлом, чтобы правка файла
+        в обход приложения тоже сменила версию (и ETag).
+        """
+        self.get_snapshot()
+        return self.changes.value()
+    
     def _save_to_file(self, settings: Settings) -> None:
-        """Сохраняет настройки в файл"""
+        """Сохраняет настройки в файл и обновляет кэш (вызывается под обеими блокировками)"""
         data = settings.to_dict()
-        with open(self.file_name, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write_json(self.file_name, data)
+        self._snapshot = FrozenSettings.from_settings(settings)
+        self._file_stamp = self._stat()
+        self._seen_version = self.changes.increment()
+    
+    def _stat(self):
+        """Отметка файла для проверки изменений: inode, время модификации, размер"""
+        try:
+            st = os.stat(self.file_name)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
     
     def _load_from_file(self) -> Settings:
         """Загружает настройки из файла"""
@@ -154,8 +510,8 @@ class JSONSettingsRepository(SettingsRepository):
             return Settings()
         
         try:
-            with open(self.file_name, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(self.file_name, 'rb') as f:
+                data = codec.loads(f.read())
                 return Settings.from_dict(data)
         except Exception as e:
             print(f"Ошибка чтения файла настроек: {e}")
@@ -163,220 +519,430 @@ class JSONSettingsRepository(SettingsRepository):
 
 
 class JSONReferencesRepository(ReferencesRepository):
-    """JSON репозиторий справочников"""
+    """JSON репозиторий справочников
+
+    Каждый тип справочника хранится в своем файле references_<тип>.jsonl.
+    Файл - журнал изменений: строка с элементом добавляет элемент или
+    заменяет элемент с тем же ID, строка {"id": ..., "deleted": true}
+    удаляет его. add_item и remove_item дописывают одну строку в файл
+    своего типа, не трогая остальные. Когда удаленных и замененных строк
+    становится больше, чем живых, файл типа переписывается целиком.
+
+    В памяти справочники держатся словарями ID -> элемент. После смены
+    общего счетчика изменений процесс дочитывает только новые строки
+    файлов; если файл переписан (сменился inode), он читается заново.
+    Дата изменения справочников при полной записи хранится в
+    references_meta.json.
+    """
     
     def __init__(self, data_dir: str):
         self.data_dir = data_dir
+        # Файл прежнего формата: все справочники одним JSON, переносится при инициализации
         self.file_name = os.path.join(data_dir, "references.json")
+        self.meta_file_name = os.path.join(data_dir, "references_meta.json")
         self.lock = Lock()
+        self.file_lock = InterProcessLock(os.path.join(data_dir, ".references.lock"))
+        self.changes = ChangeCounter(os.path.join(data_dir, ".references.version"))
+        self._items: Dict[ReferenceType, Dict[str, ReferenceItem]] = {t: {} for t in ReferenceType}
+        # Прочитанная часть файла типа: (inode, смещение), число мертвых строк и время последнего изменения
+        self._positions: Dict[ReferenceType, Tuple[Optional[int], int]] = {t: (None, 0) for t in ReferenceType}
+        self._dead: Dict[ReferenceType, int] = {t: 0 for t in ReferenceType}
+        self._changed_at: Dict[ReferenceType, Optional[datetime]] = {t: None for t in ReferenceType}
+        self._meta_updated_at: Optional[datetime] = None
+        self._meta_stamp = None
+        self._index: Optional[ReferenceIndex] = None
+        self._seen_version = None
+        self._stat_deadline = 0.0
     
     def initialize(self) -> None:
-        """Инициализация"""
-        if not os.path.exists(self.file_name):
-            default_refs = References()
-            self._save_to_file(default_refs)
-        else:
-            self._migrate_references()
+        """Инициализация: перенос references.json и заполнение пустых справочников"""
+        with self.lock, self.file_lock:
+            if not any(os.path.exists(self._type_path(ref_type)) for ref_type in ReferenceType):
+                if os.path.exists(self.file_name):
+                    self._write_all(self._load_legacy_file())
+                    os.replace(self.file_name, self.file_name + ".migrated")
+                    print("[OK] References migrated to per-type files")
+                else:
+                    self._write_all(References())
+            else:
+                self._refresh(force=True)
+                self._fill_defaults()
     
     def save(self, references: References) -> None:
-        """Сохраняет справочники"""
-        with self.lock:
-            self._save_to_file(references)
+        """Сохраняет справочники: переписываются только изменившиеся типы"""
+        with self.lock, self.file_lock:
+            self._refresh(force=True)
+            for ref_type in ReferenceType:
+                items = getattr(references, ref_type.value)
+                current = self._items[ref_type]
+                if [item.to_dict() for item in items] != [item.to_dict() for item in current.values()]:
+                    self._rewrite(ref_type, items)
+            self._write_meta(references.updated_at)
+            self._changed()
     
     def get(self) -> References:
         """Получает справочники"""
-        return self._load_from_file()
+        with self.lock:
+            self._refresh()
+            return self._build(copies=True)
     
     def update(self, references: References) -> None:
         """Обновляет справочники"""
         self.save(references)
     
     def add_item(self, ref_type: ReferenceType, value: str, description: str = "") -> ReferenceItem:
-        """Добавляет элемент в справочник"""
-        with self.lock:
-            references = self._load_from_file()
-            item = references.add_item(ref_type, value, description)
-            self._save_to_file(references)
-            return item
+        """Добавляет элемент в справочник: одна строка в файл его типа"""
+        ref_type = ReferenceType(ref_type)
+        item = ReferenceItem(value=value, description=description)
+        with self.lock, self.file_lock:
+            self._refresh(force=True)
+            self._append(ref_type, item.to_dict())
+            self._changed()
+        return copy.copy(item)
     
     def remove_item(self, ref_type: ReferenceType, item_id: str) -> None:
-        """Удаляет элемент из справочника"""
-        with self.lock:
-            references = self._load_from_file()
-            if not references.remove_item(ref_type, item_id):
+        """Удаляет элемент из справочника: строка-отметка об удалении в файл его типа"""
+        ref_type = ReferenceType(ref_type)
+        with self.lock, self.file_lock:
+            self._refresh(force=True)
+            if item_id not in self._items[ref_type]:
                 raise ValueError(f"Элемент {item_id} не найден в справочнике {ref_type}")
-            self._save_to_file(references)
+            self._append(ref_type, {"id": item_id, "deleted": True, "deleted_at": datetime.now().isoformat()})
+            self._compact_if_needed(ref_type)
+            self._changed()
     
     def get_active_items(self, ref_type: ReferenceType) -> List[ReferenceItem]:
         """Получает активные элементы справочника"""
         references = self.get()
         return references.get_active_items(ref_type)
     
-    def _migrate_references(self) -> None:
-        """Миграция справочников"""
+    def version(self) -> Optional[int]:
+        """Версия справочников - общий для процессов счетчик изменений
+        
+        Перед чтением счетчика справочники сверяются с файлами, чтобы правка
+        файлов в обход приложения тоже сменила версию (и ETag).
+        """
+        with self.lock:
+            self._refresh()
+            return self.changes.value()
+    
+    def get_index(self) -> ReferenceIndex:
+        """Снимок справочников с индексом активных значений; строится заново после изменений"""
         with self.lock:
-            existing_refs = self._load_from_file()
-            default_refs = References()
-            updated = False
-            
-            # Проверяем и дополняем каждый справочник
-            if not existing_refs.operation_types and default_refs.operation_types:
-                existing_refs.operation_types = default_refs.operation_types
-                updated = True
-            
-            if not existing_refs.statuses and default_refs.statuses:
-                existing_refs.statuses = default_refs.statuses
-                updated = True
-            
-            if not existing_refs.car_numbers and default_refs.car_numbers:
-                existing_refs.car_numbers = default_refs.car_numbers
-                updated = True
-            
-            if not existing_refs.drivers and default_refs.drivers:
-                existing_refs.drivers = default_refs.drivers
-                updated = True
-            
-            if not existing_refs.terminal_contracts and default_refs.terminal_contracts:
-                existing_refs.terminal_contracts = default_refs.terminal_contracts
-                updated = True
-            
-            if not existing_refs.time_slots and default_refs.time_slots:
-                existing_refs.time_slots = default_refs.time_slots
-                updated = True
-            
-            if updated:
-                existing_refs.updated_at = datetime.now()
-                self._save_to_file(existing_refs)
+            self._refresh()
+            if self._index is None:
+                self._index = ReferenceIndex(self._build(copies=True), self._seen_version)
+            return self._index
     
-    def _save_to_file(self, references: References) -> None:
-        """Сохраняет справочники в файл"""
-        data = references.to_dict()
-        with open(self.file_name, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def type_files(self) -> List[str]:
+        """Пути файлов справочников по типам"""
+        return [self._type_path(ref_type) for ref_type in ReferenceType]
     
-    def _load_from_file(self) -> References:
-        """Загружает справочники из файла"""
-        if not os.path.exists(self.file_name):
-            return References()
+    def _type_path(self, ref_type: ReferenceType) -> str:
+        """Файл справочника одного типа"""
+        return os.path.join(self.data_dir, f"references_{ref_type.value}.jsonl")
+    
+    def _build(self, copies: bool) -> References:
+        """Собирает References из словарей в памяти
         
+        Пустые справочники заполняются значениями по умолчанию (__post_init__).
+        """
+        lists = {
+            ref_type.value: [copy.copy(item) if copies else item for item in self._items[ref_type].values()]
+            for ref_type in ReferenceType
+        }
+        references = References(**lists)
+        dates = [d for d in self._changed_at.values() if d is not None]
+        if self._meta_updated_at is not None:
+            dates.append(self._meta_updated_at)
+        if dates:
+            references.updated_at = max(dates)
+        return references
+    
+    def _refresh(self, force: bool = False) -> None:
+        """Дочитывает новые строки файлов, если справочники менялись (вызывается под блокировкой)
+        
+        Без force при неизменном счетчике файлы проверяются по stat не чаще
+        раза в STAT_RECHECK_INTERVAL секунд - на случай правки в обход приложения.
+        """
+        version = self.changes.value()
+        now = time.monotonic()
+        if not force and version == self._seen_version and now < self._stat_deadline:
+            return
+        self._stat_deadline = now + STAT_RECHECK_INTERVAL
+        
+        changed = False
+        for ref_type in ReferenceType:
+            changed = self._catch_up(ref_type) or changed
+        
+        stamp = self._stat(self.meta_file_name)
+        if stamp != self._meta_stamp:
+            self._meta_updated_at = self._load_meta()
+            self._meta_stamp = stamp
+            self._index = None
+            changed = True
+        if changed and self._seen_version is not None and version == self._seen_version:
+            # Файлы изменены в обход приложения - поднимаем версию, чтобы сменился ETag
+            with self.file_lock:
+                version = self.changes.increment()
+        self._seen_version = version
+    
+    def _catch_up(self, ref_type: ReferenceType) -> bool:
+        """Применяет строки файла типа, дописанные после прочитанной части; True, если что-то изменилось"""
+        path = self._type_path(ref_type)
+        inode, offset = self._positions[ref_type]
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if inode is not None or self._items[ref_type]:
+                self._reset(ref_type)
+                return True
+            return False
+        
+        reset = st.st_ino != inode or st.st_size < offset
+        if reset:
+            # Файл переписан (сжатие, восстановление из копии) - читаем его заново
+            self._reset(ref_type)
+            offset = 0
+        if st.st_size == offset:
+            self._positions[ref_type] = (st.st_ino, offset)
+            return reset
+        
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # Недописанная последняя строка будет прочитана при следующей проверке
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            self._apply(ref_type, line)
+        self._positions[ref_type] = (st.st_ino, offset + end)
+        self._index = None
+        return True
+    
+    def _reset(self, ref_type: ReferenceType) -> None:
+        """Забывает прочитанное состояние файла типа"""
+        self._items[ref_type] = {}
+        self._positions[ref_type] = (None, 0)
+        self._dead[ref_type] = 0
+        self._changed_at[ref_type] = None
+        self._index = None
+    
+    def _apply(self, ref_type: ReferenceType, line: bytes) -> None:
+        """Применяет одну строку журнала справочника к словарю в памяти"""
+        line = line.strip()
+        if not line:
+            return
+        try:
+            data = codec.loads(line)
+            items = self._items[ref_type]
+            if data.get("deleted"):
+                if items.pop(data["id"], None) is not None:
+                    self._dead[ref_type] += 1
+                # Сама строка-отметка тоже мертвая
+                self._dead[ref_type] += 1
+                changed_at = datetime.fromisoformat(data["deleted_at"]) if data.get("deleted_at") else None
+            else:
+                item = ReferenceItem.from_dict(data)
+                if item.id in items:
+                    self._dead[ref_type] += 1
+                items[item.id] = item
+                changed_at = item.updated_at
+        except Exception as e:
+            print(f"Ошибка разбора строки справочника {ref_type.value}: {e}")
+            return
+        if changed_at is not None and (self._changed_at[ref_type] is None or changed_at > self._changed_at[ref_type]):
+            self._changed_at[ref_type] = changed_at
+    
+    def _append(self, ref_type: ReferenceType, data: dict) -> None:
+        """Дописывает строку в файл типа и применяет ее (вызывается под обеими блокировками)"""
+        line = codec.dumps(data) + b"\n"
+        path = self._type_path(ref_type)
+        with open(path, 'ab') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            inode = os.fstat(f.fileno()).st_ino
+        self._apply(ref_type, line)
+        _, offset = self._positions[ref_type]
+        self._positions[ref_type] = (inode, offset + len(line))
+        self._index = None
+    
+    def _compact_if_needed(self, ref_type: ReferenceType) -> None:
+        """Переписывает файл типа, если мертвых строк больше, чем живых"""
+        dead = self._dead[ref_type]
+        if dead >= REFERENCE_COMPACT_MIN_LINES and dead > len(self._items[ref_type]):
+            self._rewrite(ref_type, list(self._items[ref_type].values()))
+    
+    def _rewrite(self, ref_type: ReferenceType, items: List[ReferenceItem]) -> None:
+        """Атомарно записывает файл типа заново (вызывается под обеими блокировками)"""
+        changed_at = self._changed_at[ref_type]
+        payload = b"".join(codec.dumps(item.to_dict()) + b"\n" for item in items)
+        path = self._type_path(ref_type)
+        atomic_write_bytes(path, payload)
+        self._reset(ref_type)
+        for line in payload.splitlines():
+            self._apply(ref_type, line)
+        # Удаления в прошлом файле тоже считаются изменением справочника
+        if changed_at is not None and (self._changed_at[ref_type] is None or changed_at > self._changed_at[ref_type]):
+            self._changed_at[ref_type] = changed_at
+        self._positions[ref_type] = (os.stat(path).st_ino, len(payload))
+    
+    def _write_all(self, references: References) -> None:
+        """Записывает все типы и дату изменения (вызывается под обеими блокировками)"""
+        for ref_type in ReferenceType:
+            self._rewrite(ref_type, getattr(references, ref_type.value))
+        self._write_meta(references.updated_at)
+        self._changed()
+    
+    def _fill_defaults(self) -> None:
+        """Заполняет пустые справочники значениями по умолчанию (вызывается под обеими блокировками)"""
+        defaults = References()
+        updated = False
+        for ref_type in ReferenceType:
+            if not self._items[ref_type]:
+                self._rewrite(ref_type, getattr(defaults, ref_type.value))
+                updated = True
+        if updated:
+            self._write_meta(datetime.now())
+            self._changed()
+    
+    def _changed(self) -> None:
+        """Отмечает изменение справочников для всех процессов"""
+        self._seen_version = self.changes.increment()
+        self._index = None
+    
+    def _write_meta(self, updated_at: datetime) -> None:
+        """Записывает дату изменения справочников"""
+        atomic_write_json(self.meta_file_name, {"updated_at": updated_at.isoformat()})
+        self._meta_updated_at = updated_at
+        self._meta_stamp = self._stat(self.meta_file_name)
+    
+    def _load_meta(self) -> Optional[datetime]:
+        """Читает дату изменения справочников"""
+        try:
+            with open(self.meta_file_name, 'rb') as f:
+                return datetime.fromisoformat(codec.loads(f.read())["updated_at"])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ошибка чтения файла справочников: {e}")
+            return None
+    
+    @staticmethod
+    def _stat(file_name: str):
+        """Отметка файла для проверки изменений: inode, время модификации, размер"""
+        try:
+            st = os.stat(file_name)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def _load_legacy_file(self) -> References:
+        """Загружает справочники из файла прежнего формата (references.json)"""
         try:
-            with open(self.file_name, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(self.file_name, 'rb') as f:
+                data = codec.loads(f.read())
                 return References.from_dict(data)
         except Exception as e:
             print(f"Ошибка чтения файла справочников: {e}")
             return References()
 
 
-class JSONLogRepository(LogRepository):
-    """JSON репозиторий логов"""
-    
-    def __init__(self, data_dir: str):
-        self.data_dir = data_dir
-        self.file_name = os.path.join(data_dir, "logs.json")
-        self.lock = Lock()
+def read_json_storage(data_dir: str) -> Dict[str, Any]:
+    """Читает данные JSON хранилища только для чтения, без миграций и блокировок
     
-    def initialize(self) -> None:
-        """Инициализация"""
-        if not os.path.exists(self.file_name):
-            self._save_to_file([])
+    Понимает и текущий формат (справочники по типам, посуточные сегменты
+    логов), и прежний (references.json, logs.json, logs.jsonl). Файлы не
+    переименовываются и не переписываются. Возвращает словарь с ключами
+    tasks, settings, references, logs; settings и references - None, если
+    их файлов нет.
+    """
+    def load(file_name: str):
+        with open(file_name, 'rb') as f:
+            return codec.loads(f.read())
     
-    def save(self, entry: LogEntry) -> None:
-        """Сохраняет запись лога"""
-        with self.lock:
-            logs = self._load_from_file()
-            logs.append(entry)
-            self._save_to_file(logs)
-    
-    def get_all(self) -> List[LogEntry]:
-        """Получает все логи"""
-        logs = self._load_from_file()
-        logs.sort(key=lambda l: l.timestamp)
-        return logs
-    
-    def get_by_date_range(self, from_date: str, to_date: str) -> List[LogEntry]:
-        """Получает логи за период"""
-        logs = self.get_all()
-        from_dt = datetime.fromisoformat(from_date)
-        to_dt = datetime.fromisoformat(to_date) + timedelta(days=1)
-        
-        return [log for log in logs if from_dt <= log.timestamp < to_dt]
+    tasks_file = os.path.join(data_dir, "tasks.json")
+    tasks = [Task.from_dict(item) for item in load(tasks_file)] if os.path.exists(tasks_file) else []
     
-    def get_by_level(self, level: LogLevel) -> List[LogEntry]:
-        """Получает логи по уровню"""
-        logs = self.get_all()
-        return [log for log in logs if log.level == level]
+    settings_file = os.path.join(data_dir, "settings.json")
+    settings = Settings.from_dict(load(settings_file)) if os.path.exists(settings_file) else None
     
-    def get_user_actions(self) -> List[LogEntry]:
-        """Получает логи действий пользователя"""
-        logs = self.get_all()
-        return [log for log in logs if log.user_action]
+    references = None
+    type_files = {t: os.path.join(data_dir, f"references_{t.value}.jsonl") for t in ReferenceType}
+    if any(os.path.exists(path) for path in type_files.values()):
+        lists = {}
+        for ref_type, path in type_files.items():
+            items: Dict[str, ReferenceItem] = {}
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        data = codec.loads(line)
+                        if data.get("deleted"):
+                            items.pop(data["id"], None)
+                        else:
+                            item = ReferenceItem.from_dict(data)
+                            items[item.id] = item
+            lists[ref_type.value] = list(items.values())
+        references = References(**lists)
+        meta_file = os.path.join(data_dir, "references_meta.json")
+        if os.path.exists(meta_file):
+            references.updated_at = datetime.fromisoformat(load(meta_file)["updated_at"])
+    elif os.path.exists(os.path.join(data_dir, "references.json")):
+        references = References.from_dict(load(os.path.join(data_dir, "references.json")))
     
-    def get_task_logs(self, task_id: str) -> List[LogEntry]:
-        """Получает логи задания"""
-        logs = self.get_all()
-        return [log for log in logs if log.task_id == task_id]
+    logs: List[LogEntry] = []
+    legacy_logs = os.path.join(data_dir, "logs.json")
+    if os.path.exists(legacy_logs):
+        logs.extend(LogEntry.from_dict(item) for item in load(legacy_logs))
+    log_files = [os.path.join(data_dir, "logs.jsonl")]
+    logs_dir = os.path.join(data_dir, "logs")
+    if os.path.isdir(logs_dir):
+        log_files.extend(
+            os.path.join(logs_dir, name) for name in sorted(os.listdir(logs_dir))
+            if name.endswith(SEGMENT_SUFFIX) and JSONLLogRepository._is_day(name[:-len(SEGMENT_SUFFIX)])
+        )
+    for file_name in log_files:
+        if os.path.exists(file_name):
+            with open(file_name, 'rb') as f:
+                logs.extend(entry for entry in map(JSONLLogRepository._parse_line, f) if entry is not None)
+    logs.sort(key=lambda l: l.timestamp)
     
-    def delete_old_logs(self, days_to_keep: int) -> None:
-        """Удаляет старые логи"""
-        with self.lock:
-            logs = self._load_from_file()
-            cutoff_time = datetime.now() - timedelta(days=days_to_keep)
-            logs = [log for log in logs if log.timestamp > cutoff_time]
-            self._save_to_file(logs)
-    
-    def get_latest(self, count: int) -> List[LogEntry]:
-        """Получает последние N записей"""
-        logs = self.get_all()
-        return logs[-count:] if len(logs) > count else logs
-    
-    def search(self, query: str) -> List[LogEntry]:
-        """Поиск в логах"""
-        logs = self.get_all()
-        query_lower = query.lower()
-        
-        return [
-            log for log in logs
-            if query_lower in log.message.lower() or
-               query_lower in log.details.lower() or
-               query_lower in log.error.lower()
-        ]
-    
-    def _save_to_file(self, logs: List[LogEntry]) -> None:
-        """Сохраняет логи в файл"""
-        data = [log.to_dict() for log in logs]
-        with open(self.file_name, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    def _load_from_file(self) -> List[LogEntry]:
-        """Загружает логи из файла"""
-        if not os.path.exists(self.file_name):
-            return []
-        
-        try:
-            with open(self.file_name, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return [LogEntry.from_dict(item) for item in data]
-        except Exception as e:
-            print(f"Ошибка чтения файла логов: {e}")
-            return []
+    return {"tasks": tasks, "settings": settings, "references": references, "logs": logs}
 
 
 class JSONDataManager(DataManager):
     """Менеджер данных с JSON хранилищем"""
     
-    def __init__(self, data_dir: str):
+    def __init__(
+        self,
+        data_dir: str,
+        log_fsync_policy: str = FSYNC_INTERVAL,
+        log_buffer_size: int = DEFAULT_BUFFER_SIZE,
+        log_flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        log_batch_size: int = DEFAULT_BATCH_SIZE
+    ):
         self.data_dir = data_dir
+        self.journal = Journal(data_dir)
         self.tasks_repo = JSONTaskRepository(data_dir)
         self.settings_repo = JSONSettingsRepository(data_dir)
         self.references_repo = JSONReferencesRepository(data_dir)
-        self.logs_repo = JSONLogRepository(data_dir)
+        self.logs_repo = BackgroundLogWriter(
+            JSONLLogRepository(data_dir, fsync_policy=log_fsync_policy, buffer_size=log_buffer_size),
+            flush_interval_ms=log_flush_interval_ms,
+            batch_size=log_batch_size
+        )
     
     def initialize(self) -> None:
         """Инициализирует хранилище"""
         # Создаем директорию если не существует
         Path(self.data_dir).mkdir(parents=True, exist_ok=True)
         
+        # Доприменяем операцию, прерванную сбоем
+        self.journal.recover()
+        
         # Инициализируем репозитории
         self.tasks_repo.initialize()
         self.settings_repo.initialize()
@@ -401,9 +967,14 @@ class JSONDataManager(DataManager):
         """Возвращает репозиторий логов"""
         return self.logs_repo
     
+    def unit_of_work(self) -> UnitOfWork:
+        """Единица работы: логи пишутся в хранилище сразу при commit(), мимо фоновой очереди"""
+        return UnitOfWork(self.tasks_repo, self.logs_repo.repo)
+    
     def close(self) -> None:
         """Закрывает соединение с хранилищем"""
-        pass  # JSON не требует закрытия
+        # Сбрасывает очередь логов на диск
+        self.logs_repo.close()
     
     def is_healthy(self) -> bool:
         """Проверяет здоровье хранилища"""
@@ -427,13 +998,21 @@ class JSONDataManager(DataManager):
         
         Path(backup_dir).mkdir(parents=True, exist_ok=True)
         
-        # Копируем все JSON файлы
+        # Дожидаемся записи логов из очереди
+        self.logs_repo.flush()
+        
+        # Копируем все JSON и JSONL файлы
         for filename in os.listdir(self.data_dir):
-            if filename.endswith('.json'):
+            if filename.endswith(('.json', '.jsonl')) and filename != os.path.basename(self.journal.file_name):
                 src = os.path.join(self.data_dir, filename)
                 dst = os.path.join(backup_dir, filename)
                 shutil.copy2(src, dst)
         
+        # Копируем сегменты логов
+        logs_dir = os.path.join(self.data_dir, "logs")
+        if os.path.isdir(logs_dir):
+            shutil.copytree(logs_dir, os.path.join(backup_dir, "logs"))
+        
         print(f"[OK] Backup created: {backup_dir}")
     
     def restore(self, backup_path: str) -> None:
@@ -441,12 +1020,45 @@ class JSONDataManager(DataManager):
         if not os.path.exists(backup_path):
             raise FileNotFoundError(f"Backup directory not found: {backup_path}")
         
-        # Копируем все JSON файлы обратно
-        for filename in os.listdir(backup_path):
-            if filename.endswith('.json'):
-                src = os.path.join(backup_path, filename)
-                dst = os.path.join(self.data_dir, filename)
-                shutil.copy2(src, dst)
+        self.logs_repo.close()
+        
+        # Остальные процессы не должны писать, пока файлы подменяются
+        repos = (self.tasks_repo, self.settings_repo, self.references_repo, self.logs_repo.repo)
+        with ExitStack() as stack:
+            for repo in repos:
+                stack.enter_context(repo.file_lock)
+            
+            # JSON файлы восстанавливаем одной операцией через журнал
+            files = {}
+            for filename in os.listdir(backup_path):
+                if filename.endswith('.json') and filename != os.path.basename(self.journal.file_name):
+                    with open(os.path.join(backup_path, filename), 'rb') as f:
+                        files[filename] = codec.loads(f.read())
+            self.journal.write_files(files)
+            
+            # Справочники из копии прежнего формата (references.json) переносятся заново при initialize
+            for file_name in self.references_repo.type_files():
+                if os.path.exists(file_name):
+                    os.remove(file_name)
+            
+            for filename in os.listdir(backup_path):
+                if filename.endswith('.jsonl'):
+                    src = os.path.join(backup_path, filename)
+                    dst = os.path.join(self.data_dir, filename)
+                    shutil.copy2(src, dst)
+            
+            # Восстанавливаем сегменты логов
+            backup_logs_dir = os.path.join(backup_path, "logs")
+            if os.path.isdir(backup_logs_dir):
+                logs_dir = os.path.join(self.data_dir, "logs")
+                shutil.rmtree(logs_dir, ignore_errors=True)
+                shutil.copytree(backup_logs_dir, logs_dir)
+            
+            # Кэши всех процессов должны перечитать данные
+            for repo in repos:
+                repo.changes.increment()
+        self.references_repo.initialize()
+        self.logs_repo.initialize()
         
         print(f"[OK] Data restored from: {backup_path}")
 
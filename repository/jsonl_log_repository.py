@@ -0,0 +1,766 @@
+"""JSONL реализация репозитория логов (append-only, посуточные сегменты)"""
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta, date
+from threading import Lock
+from typing import List, Iterator, Optional, Dict, Callable, Tuple
+
+from domain.log import LogEntry, LogLevel, LogCategory
+from domain.compact import CompactLogEntry, compact_sizeof
+from .interfaces import LogRepository
+from .log_index import SegmentIndex, load_segment_index, INDEX_SUFFIX
+from .log_search import InvertedIndex, tokenize
+from . import codec
+from .atomic import atomic_write_json
+from .file_lock import InterProcessLock, ChangeCounter
+
+
+# Политики синхронизации файла логов с диском
+FSYNC_ALWAYS = "always"      # fsync после каждой записи
+FSYNC_INTERVAL = "interval"  # fsync не чаще одного раза за интервал
+FSYNC_NEVER = "never"        # только flush, fsync делает ОС
+
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER)
+
+SEGMENT_SUFFIX = ".jsonl"
+MANIFEST_VERSION = 1
+
+DEFAULT_BUFFER_SIZE = 1000
+
+
+class JSONLLogRepository(LogRepository):
+    """Репозиторий логов: одна JSON-строка на запись, отдельный файл на каждые сутки
+
+    Сегменты лежат в каталоге logs/ под именами вида 2026-10-17.jsonl,
+    список сегментов хранится в logs/manifest.json. Последние записи
+    дополнительно держатся в кольцевом буфере в памяти, из которого
+    get_latest отвечает без обращения к диску. Для выборок по заданию,
+    уровню, категории и действиям пользователя рядом с каждым
+    сегментом ведется индекс смещений (2026-10-17.idx). Полнотекстовый
+    поиск идет по инвертированному индексу сегмента, который строится в
+    памяти при первом поиске и далее поддерживается при дозаписи.
+
+    Несколько процессов могут писать в одно хранилище: запись идет под
+    межпроцессной блокировкой и увеличивает общий счетчик изменений.
+    Увидев новое значение счетчика, процесс перечитывает манифест и
+    дочитывает хвосты сегментов в свои индексы и буфер.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        fsync_policy: str = FSYNC_INTERVAL,
+        fsync_interval: float = 1.0,
+        buffer_size: int = DEFAULT_BUFFER_SIZE
+    ):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Неизвестная политика fsync: {fsync_policy}")
+        if buffer_size < 0:
+            raise ValueError(f"Размер буфера логов не может быть отрицательным: {buffer_size}")
+
+        self.data_dir = data_dir
+        self.logs_dir = os.path.join(data_dir, "logs")
+        self.manifest_file = os.path.join(self.logs_dir, "manifest.json")
+        self.legacy_file_name = os.path.join(data_dir, "logs.json")
+        self.legacy_jsonl_file_name = os.path.join(data_dir, "logs.jsonl")
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.lock = Lock()
+        self.file_lock = InterProcessLock(os.path.join(data_dir, ".logs.lock"))
+        self.changes = ChangeCounter(os.path.join(data_dir, ".logs.version"))
+        self._seen_version = None
+        self._segments: List[str] = []
+        self._indexes: Dict[str, SegmentIndex] = {}
+        self._search_indexes: Dict[str, InvertedIndex] = {}
+        self._file = None
+        self._index_file = None
+        self._file_day: Optional[str] = None
+        self._last_fsync = 0.0
+        # Есть записи, сброшенные в файл, но еще не синхронизированные с диском
+        self._unsynced = False
+        # Последние записи хранятся в компактном виде (__slots__, ленивый разбор дат)
+        self._recent: deque = deque(maxlen=buffer_size)
+
+    def initialize(self) -> None:
+        """Инициализация"""
+        os.makedirs(self.logs_dir, exist_ok=True)
+        with self.lock, self.file_lock:
+            self._indexes.clear()
+            self._search_indexes.clear()
+            self._seen_version = self.changes.value()
+            self._load_manifest()
+        self.migrate_legacy_logs()
+        self._seed_buffer()
+
+        with self.lock:
+            # Индекс последнего сегмента нужен, чтобы дочитывать записи других процессов
+            if self._segments:
+                self._index(self._segments[-1])
+
+    def save(self, entry: LogEntry) -> None:
+        """Сохраняет запись лога"""
+        data = entry.to_dict()
+        line = codec.dumps(data) + b"\n"
+        with self.lock, self.file_lock:
+            self._catch_up()
+            day = self._day_of(entry)
+            f = self._open_segment(day)
+            self._append_line(day, f, line, data)
+            f.flush()
+            self._index_file.flush()
+            self._sync(f)
+            self._recent.append(CompactLogEntry.from_dict(data))
+            self._seen_version = self.changes.increment()
+
+    def save_many(self, entries: List[LogEntry]) -> None:
+        """Сохраняет пачку записей лога с одним сбросом на диск на сегмент"""
+        if not entries:
+            return
+
+        encoded = []
+        for entry in entries:
+            data = entry.to_dict()
+            encoded.append((self._day_of(entry), codec.dumps(data) + b"\n", data))
+
+        with self.lock, self.file_lock:
+            self._catch_up()
+            for day, line, data in encoded:
+                f = self._open_segment(day)
+                self._append_line(day, f, line, data)
+            self._file.flush()
+            self._index_file.flush()
+            self._sync(self._file)
+            self._recent.extend(CompactLogEntry.from_dict(data) for _, _, data in encoded)
+            self._seen_version = self.changes.increment()
+
+    def get_all(self) -> List[LogEntry]:
+        """Получает все логи"""
+        with self.lock:
+            self._catch_up()
+            segments = list(self._segments)
+        return self._read_segments(segments)
+
+    def get_by_date_range(self, from_date: str, to_date: str) -> List[LogEntry]:
+        """Получает логи за период"""
+        from_dt = datetime.fromisoformat(from_date)
+        to_dt = datetime.fromisoformat(to_date) + timedelta(days=1)
+        first_day = from_dt.date().isoformat()
+        last_day = to_dt.date().isoformat()
+
+        # Открываем только сегменты, пересекающиеся с периодом
+        with self.lock:
+            self._catch_up()
+            segments = [day for day in self._segments if first_day <= day <= last_day]
+
+        return [log for log in self._read_segments(segments) if from_dt <= log.timestamp < to_dt]
+
+    def get_by_level(self, level: LogLevel) -> List[LogEntry]:
+        """Получает логи по уровню"""
+        return self._query(lambda day: self._index(day).by_level.get(LogLevel(level).value, []))
+
+    def get_by_category(self, category: LogCategory) -> List[LogEntry]:
+        """Получает логи по категории"""
+        return self._query(lambda day: self._index(day).by_category.get(LogCategory(category).value, []))
+
+    def get_user_actions(self) -> List[LogEntry]:
+        """Получает логи действий пользователя"""
+        return self._query(lambda day: self._index(day).user_actions)
+
+    def get_task_logs(self, task_id: str) -> List[LogEntry]:
+        """Получает логи задания"""
+        return self._query(lambda day: self._index(day).by_task_id.get(task_id, []))
+
+    def delete_old_logs(self, days_to_keep: int) -> None:
+        """Удаляет старые логи
+
+        Удаление выполняется целыми сегментами: сегмент удаляется, если
+        все его сутки старше границы хранения. Сегмент, на который
+        приходится граница, сохраняется целиком.
+        """
+        cutoff_day = (datetime.now() - timedelta(days=days_to_keep)).date().isoformat()
+
+        with self.lock, self.file_lock:
+            self._catch_up()
+            expired = [day for day in self._segments if day < cutoff_day]
+            if not expired:
+                return
+
+            if self._file_day in expired:
+                self._close()
+
+            self._segments = [day for day in self._segments if day >= cutoff_day]
+            self._write_manifest()
+
+            while self._recent and self._recent[0].day() < cutoff_day:
+                self._recent.popleft()
+
+            for day in expired:
+                self._indexes.pop(day, None)
+                self._search_indexes.pop(day, None)
+                for path in (self._segment_path(day), self._index_path(day)):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+            self._seen_version = self.changes.increment()
+
+    def get_latest(self, count: int) -> List[LogEntry]:
+        """Получает последние N записей"""
+        with self.lock:
+            self._catch_up()
+            if count <= self._recent.maxlen:
+                recent = list(self._recent)
+                recent = recent[-count:] if len(recent) > count else recent
+                return [entry.to_model() for entry in recent]
+            segments = list(self._segments)
+
+        # Читаем сегменты с конца, пока не наберем нужное количество
+        logs: List[LogEntry] = []
+        for day in reversed(segments):
+            logs = self._read_segments([day]) + logs
+            if len(logs) >= count:
+                break
+
+        return logs[-count:] if len(logs) > count else logs
+
+    def search(self, query: str) -> List[LogEntry]:
+        """Поиск в логах
+
+        Запрос разбивается на термины; запись подходит, если каждый термин
+        входит подстрокой в слово из message, details или error
+        ("1234567" найдет "MSKU1234567").
+        """
+        terms = tokenize(query)
+        if not terms:
+            return self.get_all()
+
+        return self._query(lambda day: self._search_index(day).search(terms))
+
+    def version(self) -> Optional[int]:
+        """Версия логов - общий для процессов счетчик изменений"""
+        return self.changes.value()
+
+    def get_cursor(self) -> str:
+        """Курсор конца хранилища: день последнего сегмента и конец его проиндексированной части"""
+        with self.lock:
+            self._catch_up()
+            if not self._segments:
+                return self._format_cursor("", 0)
+            day = self._segments[-1]
+            return self._format_cursor(day, self._index(day).end_offset)
+
+    def get_since(self, cursor: str, limit: int) -> Tuple[List[LogEntry], str]:
+        """Записи, дописанные после курсора, и курсор после последней из них
+
+        Чтение начинается с байтового смещения курсора (seek), без
+        просмотра предыдущих записей; записи читаются только до конца
+        проиндексированной части сегмента, недописанные строки не попадают.
+        """
+        day, offset = self._parse_cursor(cursor)
+        with self.lock:
+            self._catch_up()
+            plan = []
+            for segment in self._segments:
+                if segment < day:
+                    continue
+                end = self._index(segment).end_offset
+                start = offset if segment == day else 0
+                if start > end:
+                    # Сегмент подменен (восстановление из копии) - читаем его заново
+                    start = 0
+                if start < end:
+                    plan.append((segment, start, end))
+
+        entries: List[LogEntry] = []
+        for segment, start, end in plan:
+            try:
+                with open(self._segment_path(segment), 'rb') as f:
+                    f.seek(start)
+                    position = start
+                    while position < end and len(entries) < limit:
+                        line = f.readline()
+                        if not line:
+                            break
+                        position += len(line)
+                        entry = self._parse_line(line)
+                        if entry is not None:
+                            entries.append(entry)
+            except FileNotFoundError:
+                # Сегмент удален политикой хранения во время чтения
+                continue
+            cursor = self._format_cursor(segment, position)
+            if len(entries) >= limit:
+                break
+
+        return entries, cursor
+
+    @staticmethod
+    def _format_cursor(day: str, offset: int) -> str:
+        """Курсор вида день:смещение"""
+        return f"{day}:{offset}"
+
+    @staticmethod
+    def _parse_cursor(cursor: str) -> Tuple[str, int]:
+        """Разбирает курсор вида день:смещение"""
+        day, sep, offset = cursor.rpartition(":")
+        try:
+            if not sep or int(offset) < 0:
+                raise ValueError(cursor)
+            if day:
+                date.fromisoformat(day)
+            return day, int(offset)
+        except ValueError:
+            raise ValueError(f"Некорректный курсор логов: {cursor}")
+
+    def get_segments(self) -> List[str]:
+        """Возвращает список сегментов (дни в формате YYYY-MM-DD)"""
+        with self.lock:
+            self._catch_up()
+            return list(self._segments)
+
+    def get_buffer_stats(self) -> Dict[str, int]:
+        """Возвращает заполненность кольцевого буфера и оценку занимаемой им памяти"""
+        with self.lock:
+            entries = list(self._recent)
+            capacity = self._recent.maxlen
+
+        memory = sys.getsizeof(self._recent)
+        for entry in entries:
+            memory += compact_sizeof(entry)
+
+        return {"capacity": capacity, "size": len(entries), "memory_bytes": memory}
+
+    def close(self) -> None:
+        """Сбрасывает буферы на диск и закрывает файл"""
+        with self.lock:
+            self._close()
+
+    def migrate_legacy_logs(self) -> int:
+        """Однократно переносит логи из logs.json и logs.jsonl в посуточные сегменты
+
+        Возвращает количество перенесенных записей. Перенос целиком
+        выполняется под межпроцессной блокировкой, поэтому воркеры,
+        стартующие одновременно, переносят файл один раз. Переименование
+        старого файла с суффиксом .migrated завершает перенос: если сбой
+        случился раньше, при следующем запуске уже записанные записи
+        (по id) пропускаются.
+        """
+        migrated = 0
+
+        with self.lock, self.file_lock:
+            self._catch_up()
+            for path in (self.legacy_file_name, self.legacy_jsonl_file_name):
+                if not os.path.exists(path):
+                    # Нет файла или его уже перенес другой процесс
+                    continue
+                if os.path.exists(path + ".migrated"):
+                    print(f"Ошибка переноса логов: {path} уже перенесен ранее ({path}.migrated), файл пропущен")
+                    continue
+
+                try:
+                    entries = self._read_legacy(path)
+                except Exception as e:
+                    print(f"Ошибка чтения старого файла логов: {e}")
+                    continue
+                entries = self._not_migrated(entries)
+                self._append_batch(entries)
+                os.replace(path, path + ".migrated")
+                migrated += len(entries)
+
+        if migrated:
+            print(f"[OK] Migrated {migrated} log entries to {self.logs_dir}")
+        return migrated
+
+    def _read_legacy(self, path: str) -> List[LogEntry]:
+        """Читает записи старого файла логов: массив JSON (logs.json) или JSONL (logs.jsonl)"""
+        if path == self.legacy_file_name:
+            with open(path, 'rb') as f:
+                return [LogEntry.from_dict(item) for item in codec.loads(f.read())]
+        return list(self._iter_file(path))
+
+    def _not_migrated(self, entries: List[LogEntry]) -> List[LogEntry]:
+        """Отбрасывает записи, уже попавшие в сегменты при прерванном переносе (вызывается под блокировкой)"""
+        days = sorted({self._day_of(entry) for entry in entries} & set(self._segments))
+        if not days:
+            return entries
+        existing = {entry.id for entry in self._read_segments(days)}
+        return [entry for entry in entries if entry.id not in existing]
+
+    def _append_batch(self, entries: List[LogEntry]) -> None:
+        """Дописывает пачку записей в сегменты с одним fsync на сегмент (вызывается под блокировкой)"""
+        if not entries:
+            return
+
+        by_day = {}
+        for entry in entries:
+            by_day.setdefault(self._day_of(entry), []).append(entry)
+
+        for day in sorted(by_day):
+            f = self._open_segment(day)
+            for entry in by_day[day]:
+                data = entry.to_dict()
+                line = codec.dumps(data) + b"\n"
+                self._append_line(day, f, line, data)
+            f.flush()
+            self._index_file.flush()
+            os.fsync(f.fileno())
+        self._seen_version = self.changes.increment()
+
+    def _append_line(self, day: str, f, line: bytes, data: dict) -> None:
+        """Дописывает строку в сегмент и отражает ее в индексах (вызывается под блокировкой)"""
+        offset = f.tell()
+        f.write(line)
+        record = SegmentIndex.record(offset, len(line), data)
+        self._indexes[day].add(*record)
+        self._index_file.write(SegmentIndex.encode(record))
+
+        search_index = self._search_indexes.get(day)
+        if search_index is not None:
+            search_index.add(offset, data['message'], data['details'], data['error'])
+
+    def _query(self, select: Callable[[str], List[int]]) -> List[LogEntry]:
+        """Читает записи по смещениям, выбранным select для каждого сегмента"""
+        with self.lock:
+            self._catch_up()
+            plan = [(day, list(select(day))) for day in self._segments]
+
+        logs: List[LogEntry] = []
+        for day, offsets in plan:
+            if offsets:
+                logs.extend(self._read_at(day, offsets))
+        logs.sort(key=lambda l: l.timestamp)
+        return logs
+
+    def _index(self, day: str) -> SegmentIndex:
+        """Возвращает индекс сегмента, загружая или перестраивая его при первом обращении"""
+        index = self._indexes.get(day)
+        if index is None:
+            if day == self._file_day:
+                # Файл индекса может быть перезаписан - закрываем открытый дескриптор
+                self._close()
+            with self.file_lock:
+                index, rebuilt = load_segment_index(self._segment_path(day), self._index_path(day))
+                if rebuilt:
+                    # Файл индекса заменен новым: другие процессы увидят изменение
+                    # счетчика и переоткроют индекс перед следующей дозаписью
+                    self.changes.increment()
+            if rebuilt and index.end_offset:
+                print(f"[OK] Log index rebuilt: {day}")
+            self._indexes[day] = index
+        return index
+
+    def _catch_up(self) -> None:
+        """Подхватывает записи и изменения сегментов, сделанные другими процессами
+
+        Вызывается под блокировкой потоков; если счетчик изменений не
+        менялся, стоит одного чтения памяти.
+        """
+        if self.changes.value() == self._seen_version:
+            return
+
+        with self.file_lock:
+            version = self.changes.value()
+            known_last = self._segments[-1] if self._segments else ""
+            self._load_manifest()
+
+            # Сегменты, удаленные политикой хранения в другом процессе
+            for day in [day for day in self._indexes if day not in self._segments]:
+                del self._indexes[day]
+            for day in [day for day in self._search_indexes if day not in self._segments]:
+                del self._search_indexes[day]
+            if self._file_day is not None and self._file_day not in self._segments:
+                self._close()
+            if self._segments:
+                while self._recent and self._recent[0].day() < self._segments[0]:
+                    self._recent.popleft()
+
+            if self._file is not None:
+                if self._replaced(self._file, self._segment_path(self._file_day)) or \
+                        self._replaced(self._index_file, self._index_path(self._file_day)):
+                    # Сегмент восстановлен из копии или индекс перестроен другим процессом
+                    self._close()
+                else:
+                    # Дописываем после записей других процессов: смещения берутся из tell()
+                    self._file.seek(0, os.SEEK_END)
+
+            for day in self._segments:
+                index = self._indexes.get(day)
+                if index is None:
+                    if day <= known_last:
+                        continue
+                    # Новый сегмент другого процесса читаем целиком
+                    index = self._indexes[day] = SegmentIndex()
+                elif self._segment_size(day) < index.end_offset:
+                    # Сегмент подменен (восстановление из копии) - индекс загрузится заново
+                    del self._indexes[day]
+                    self._search_indexes.pop(day, None)
+                    continue
+                self._read_tail(day, index)
+
+            self._seen_version = version
+
+    @staticmethod
+    def _replaced(f, path: str) -> bool:
+        """Проверяет, что открытый файл больше не является файлом по пути path"""
+        try:
+            return os.fstat(f.fileno()).st_ino != os.stat(path).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _segment_size(self, day: str) -> int:
+        """Размер файла сегмента"""
+        try:
+            return os.path.getsize(self._segment_path(day))
+        except FileNotFoundError:
+            return 0
+
+    def _read_tail(self, day: str, index: SegmentIndex) -> None:
+        """Дочитывает в индексы и буфер записи сегмента после конца индекса"""
+        search_index = self._search_indexes.get(day)
+        try:
+            with open(self._segment_path(day), 'rb') as f:
+                f.seek(index.end_offset)
+                offset = index.end_offset
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Строка еще дописывается
+                        break
+                    try:
+                        data = codec.loads(line)
+                    except ValueError:
+                        data = None
+                    if isinstance(data, dict):
+                        index.add(*SegmentIndex.record(offset, len(line), data))
+                        if search_index is not None:
+                            search_index.add(offset, data.get('message', ''), data.get('details', ''), data.get('error', ''))
+                        self._recent.append(CompactLogEntry.from_dict(data))
+                    else:
+                        index.add(offset, len(line), '', '', '', False)
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+
+    def _search_index(self, day: str) -> InvertedIndex:
+        """Возвращает полнотекстовый индекс сегмента, строя его при первом обращении"""
+        index = self._search_indexes.get(day)
+        if index is None:
+            index = InvertedIndex()
+            if day == self._file_day:
+                self._file.flush()
+            try:
+                with open(self._segment_path(day), 'rb') as f:
+                    offset = 0
+                    for line in f:
+                        if line.endswith(b"\n"):
+                            try:
+                                data = codec.loads(line)
+                            except ValueError:
+                                data = None
+                            if isinstance(data, dict):
+                                index.add(
+                                    offset,
+                                    data.get('message', ''),
+                                    data.get('details', ''),
+                                    data.get('error', '')
+                                )
+                        offset += len(line)
+            except FileNotFoundError:
+                pass
+            self._search_indexes[day] = index
+        return index
+
+    def _read_at(self, day: str, offsets: List[int]) -> List[LogEntry]:
+        """Читает записи сегмента по байтовым смещениям"""
+        logs = []
+        try:
+            with open(self._segment_path(day), 'rb') as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    entry = self._parse_line(f.readline())
+                    if entry is not None:
+                        logs.append(entry)
+        except FileNotFoundError:
+            # Сегмент удален политикой хранения во время чтения
+            pass
+        return logs
+
+    def _seed_buffer(self) -> None:
+        """Заполняет кольцевой буфер хвостом хранилища"""
+        capacity = self._recent.maxlen
+        if not capacity:
+            return
+
+        with self.lock:
+            segments = list(self._segments)
+
+        tail: List[LogEntry] = []
+        for day in reversed(segments):
+            tail = self._read_segments([day]) + tail
+            if len(tail) >= capacity:
+                break
+
+        with self.lock:
+            self._recent.clear()
+            self._recent.extend(CompactLogEntry.from_model(entry) for entry in tail[-capacity:])
+
+    def _segment_path(self, day: str) -> str:
+        """Путь к файлу сегмента"""
+        return os.path.join(self.logs_dir, day + SEGMENT_SUFFIX)
+
+    def _index_path(self, day: str) -> str:
+        """Путь к файлу индекса сегмента"""
+        return os.path.join(self.logs_dir, day + INDEX_SUFFIX)
+
+    @staticmethod
+    def _day_of(entry: LogEntry) -> str:
+        """Сегмент, к которому относится запись"""
+        return entry.timestamp.date().isoformat()
+
+    def _open_segment(self, day: str):
+        """Открывает сегмент дня и его индекс на дозапись (вызывается под блокировкой)"""
+        if self._file is not None and self._file_day == day:
+            return self._file
+
+        self._close()
+        if day not in self._segments:
+            self._segments.append(day)
+            self._segments.sort()
+            self._write_manifest()
+
+        path = self._segment_path(day)
+        if self._ends_with_partial_line(path):
+            # Завершаем оборванную при сбое строку, чтобы новая запись не склеилась с ней
+            with open(path, 'ab') as f:
+                f.write(b"\n")
+            self._indexes.pop(day, None)
+
+        self._index(day)
+        self._file = open(path, 'ab')
+        self._index_file = open(self._index_path(day), 'ab')
+        self._file_day = day
+        return self._file
+
+    @staticmethod
+    def _ends_with_partial_line(path: str) -> bool:
+        """Проверяет, что файл не заканчивается переводом строки"""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except FileNotFoundError:
+            return False
+
+    def _close(self) -> None:
+        """Закрывает текущий сегмент и его индекс (вызывается под блокировкой)"""
+        if self._file is not None:
+            self._file.flush()
+            if self.fsync_policy != FSYNC_NEVER:
+                os.fsync(self._file.fileno())
+                self._unsynced = False
+            self._file.close()
+            self._file = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+        self._file_day = None
+
+    def _sync(self, f) -> None:
+        """Синхронизирует файл с диском согласно политике"""
+        if self.fsync_policy == FSYNC_ALWAYS:
+            os.fsync(f.fileno())
+        elif self.fsync_policy == FSYNC_INTERVAL:
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(f.fileno())
+                self._last_fsync = now
+                self._unsynced = False
+            else:
+                # Досинхронизирует sync_if_due, если новых записей не будет
+                self._unsynced = True
+
+    def sync_if_due(self) -> None:
+        """Синхронизирует с диском записи, ждущие fsync дольше интервала (политика interval)"""
+        if not self._unsynced:
+            return
+        with self.lock:
+            if not self._unsynced or self._file is None:
+                return
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+                self._unsynced = False
+
+    def _load_manifest(self) -> None:
+        """Загружает манифест; при отсутствии или повреждении строит его по файлам каталога"""
+        try:
+            with open(self.manifest_file, 'rb') as f:
+                data = codec.loads(f.read())
+            segments = data.get('segments', [])
+        except FileNotFoundError:
+            segments = None
+        except Exception as e:
+            print(f"Ошибка чтения манифеста логов: {e}")
+            segments = None
+
+        if segments is None:
+            segments = [
+                name[:-len(SEGMENT_SUFFIX)] for name in os.listdir(self.logs_dir)
+                if name.endswith(SEGMENT_SUFFIX) and self._is_day(name[:-len(SEGMENT_SUFFIX)])
+            ]
+            self._segments = sorted(segments)
+            self._write_manifest()
+        else:
+            self._segments = sorted(segments)
+
+    def _write_manifest(self) -> None:
+        """Атомарно записывает манифест (вызывается под блокировкой)"""
+        atomic_write_json(self.manifest_file, {"version": MANIFEST_VERSION, "segments": self._segments})
+
+    @staticmethod
+    def _is_day(name: str) -> bool:
+        """Проверяет, что имя файла является датой YYYY-MM-DD"""
+        try:
+            date.fromisoformat(name)
+            return True
+        except ValueError:
+            return False
+
+    def _read_segments(self, days: List[str]) -> List[LogEntry]:
+        """Читает сегменты по порядку; записи внутри сегмента сортируются по времени"""
+        logs: List[LogEntry] = []
+        for day in days:
+            segment = list(self._iter_file(self._segment_path(day)))
+            segment.sort(key=lambda l: l.timestamp)
+            logs.extend(segment)
+        return logs
+
+    def _iter_file(self, file_name: str) -> Iterator[LogEntry]:
+        """Построчно читает записи из файла"""
+        if not os.path.exists(file_name):
+            return
+
+        with open(file_name, 'rb') as f:
+            for line in f:
+                entry = self._parse_line(line)
+                if entry is not None:
+                    yield entry
+
+    @staticmethod
+    def _parse_line(line: bytes) -> Optional[LogEntry]:
+        """Разбирает строку JSONL, пропуская пустые и оборванные строки"""
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return LogEntry.from_dict(codec.loads(line))
+        except Exception as e:
+            # Недописанная строка после сбоя не должна ломать чтение остальных
+            print(f"Ошибка разбора строки лога: {e}")
+            return None
@@ -0,0 +1,159 @@
+"""Вторичные индексы сегментов логов"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+from . import codec
+from .atomic import atomic_write_bytes
+
+
+INDEX_SUFFIX = ".idx"
+
+
+class SegmentIndex:
+    """Индексы одного сегмента: значение поля -> байтовые смещения записей
+
+    На диске индекс хранится рядом с сегментом (2026-10-17.idx) в виде
+    JSON-строк [offset, length, task_id, level, category, user_action],
+    по одной на запись сегмента, в порядке следования записей.
+    """
+
+    def __init__(self):
+        self.by_task_id: Dict[str, List[int]] = {}
+        self.by_level: Dict[str, List[int]] = {}
+        self.by_category: Dict[str, List[int]] = {}
+        self.user_actions: List[int] = []
+        self.end_offset = 0
+
+    def add(self, offset: int, length: int, task_id: str, level: str, category: str, user_action: bool) -> None:
+        """Добавляет запись в индексы"""
+        self.end_offset = offset + length
+        if not level:
+            # Поврежденная строка сегмента: занимает место, но не индексируется
+            return
+        if task_id:
+            self.by_task_id.setdefault(task_id, []).append(offset)
+        self.by_level.setdefault(level, []).append(offset)
+        self.by_category.setdefault(category, []).append(offset)
+        if user_action:
+            self.user_actions.append(offset)
+
+    @staticmethod
+    def record(offset: int, length: int, data: dict) -> list:
+        """Строка индекса для записи лога в виде словаря"""
+        return [
+            offset,
+            length,
+            data.get('task_id', ''),
+            data.get('level', 'INFO'),
+            data.get('category', 'SYSTEM'),
+            bool(data.get('user_action', False))
+        ]
+
+    @staticmethod
+    def encode(record: list) -> bytes:
+        """Сериализует строку индекса"""
+        return codec.dumps(record) + b"\n"
+
+
+def load_segment_index(segment_path: str, index_path: str) -> Tuple[SegmentIndex, bool]:
+    """Загружает индекс сегмента, при необходимости достраивая его по сегменту
+
+    Возвращает индекс и признак того, что файл индекса был перестроен.
+    Вызывается под межпроцессной блокировкой логов; после перестроения
+    вызывающий должен увеличить счетчик изменений, иначе процессы с
+    открытым старым файлом индекса продолжат дописывать в него.
+    Если файла нет или он не согласован с сегментом, индекс строится
+    заново; если индексирована только часть сегмента (сбой между
+    записью сегмента и индекса), дочитывается хвост сегмента.
+    """
+    index = SegmentIndex()
+    records = _read_records(index_path)
+
+    if records is None:
+        records = []
+        rebuilt = True
+    else:
+        rebuilt = False
+
+    for record in records:
+        index.add(*record)
+
+    try:
+        segment_size = os.path.getsize(segment_path)
+    except FileNotFoundError:
+        segment_size = 0
+
+    if index.end_offset > segment_size:
+        # Индекс ссылается за конец сегмента - строим заново
+        index = SegmentIndex()
+        records = []
+        rebuilt = True
+
+    if index.end_offset < segment_size:
+        tail = _scan_segment(segment_path, index.end_offset)
+        for record in tail:
+            index.add(*record)
+        records.extend(tail)
+        rebuilt = True
+
+    if rebuilt:
+        _write_records(index_path, records)
+
+    return index, rebuilt
+
+
+def _read_records(index_path: str) -> Optional[List[list]]:
+    """Читает строки индекса; None, если файла нет или он поврежден"""
+    if not os.path.exists(index_path):
+        return None
+
+    records = []
+    expected_offset = 0
+    try:
+        with open(index_path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = codec.loads(line)
+                except ValueError:
+                    # Оборванная последняя строка - хвост будет дочитан из сегмента
+                    break
+                if len(record) != 6 or record[0] != expected_offset:
+                    return None
+                expected_offset = record[0] + record[1]
+                records.append(record)
+    except OSError as e:
+        print(f"Ошибка чтения индекса логов: {e}")
+        return None
+
+    return records
+
+
+def _scan_segment(segment_path: str, start_offset: int) -> List[list]:
+    """Строит строки индекса по сегменту начиная со смещения"""
+    records = []
+    with open(segment_path, 'rb') as f:
+        f.seek(start_offset)
+        offset = start_offset
+        for line in f:
+            length = len(line)
+            if not line.endswith(b"\n"):
+                # Недописанная строка после сбоя
+                break
+            try:
+                data = codec.loads(line)
+            except ValueError:
+                data = None
+            if isinstance(data, dict):
+                records.append(SegmentIndex.record(offset, length, data))
+            else:
+                # Пустая или поврежденная строка: учитываем ее длину, но не индексируем
+                records.append([offset, length, '', '', '', False])
+            offset += length
+    return records
+
+
+def _write_records(index_path: str, records: List[list]) -> None:
+    """Атомарно перезаписывает файл индекса (заменяет его новым файлом)"""
+    atomic_write_bytes(index_path, b"".join(SegmentIndex.encode(record) for record in records))
@@ -0,0 +1,84 @@
+"""Инвертированный полнотекстовый индекс логов"""
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set
+
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Приводит текст к виду для поиска: casefold и замена ё на е"""
+    return text.casefold().replace('ё', 'е')
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на нормализованные токены (буквы, в т.ч. кириллица, и цифры)"""
+    return TOKEN_RE.findall(normalize(text))
+
+
+def contains_all(terms: List[str], *texts: str) -> bool:
+    """Проверяет, что каждый термин входит подстрокой в слово одного из текстов
+
+    Поиск перебором с теми же правилами, что и у индекса: термин состоит
+    из букв и цифр, поэтому подстрока текста с ним лежит внутри слова.
+    """
+    text = normalize("\n".join(texts))
+    return all(term in text for term in terms)
+
+
+class InvertedIndex:
+    """Инвертированный индекс одного сегмента: токен -> смещения записей
+
+    Индекс строится по полям message, details и error и хранит все
+    суффиксы токенов, поэтому префикс суффикса - это любая подстрока слова:
+    "1234567" находит "MSKU1234567". Записи должны содержать все термины
+    запроса (пересечение списков смещений).
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, List[int]] = {}
+        self._sorted_tokens: Optional[List[str]] = None
+
+    def add(self, offset: int, *texts: str) -> None:
+        """Добавляет запись в индекс"""
+        tokens = set()
+        for text in texts:
+            if text:
+                for token in tokenize(text):
+                    tokens.update(token[i:] for i in range(len(token)))
+
+        for token in tokens:
+            postings = self.postings.get(token)
+            if postings is None:
+                self.postings[token] = [offset]
+                self._sorted_tokens = None
+            else:
+                postings.append(offset)
+
+    def lookup_substring(self, term: str) -> Set[int]:
+        """Смещения записей, в словах которых есть подстрока term"""
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self.postings)
+
+        tokens = self._sorted_tokens
+        result: Set[int] = set()
+        i = bisect_left(tokens, term)
+        while i < len(tokens) and tokens[i].startswith(term):
+            result.update(self.postings[tokens[i]])
+            i += 1
+        return result
+
+    def search(self, terms: List[str]) -> List[int]:
+        """Смещения записей, содержащих все термины"""
+        if not terms:
+            return []
+
+        # Начинаем с самого короткого списка, чтобы пересечение было дешевле
+        candidates = sorted((self.lookup_substring(term) for term in set(terms)), key=len)
+        result = candidates[0]
+        for postings in candidates[1:]:
+            if not result:
+                break
+            result = result & postings
+        return sorted(result)
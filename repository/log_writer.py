@@ -0,0 +1,315 @@
+"""Фоновая пакетная запись логов"""
+import atexit
+import queue
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from domain.log import LogEntry, LogLevel, LogCategory
+from .interfaces import LogRepository
+from . import codec
+
+
+DEFAULT_FLUSH_INTERVAL_MS = 200
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_QUEUE_SIZE = 10000
+
+# Попытки записи пачки и пауза перед первым повтором (удваивается)
+WRITE_ATTEMPTS = 3
+RETRY_DELAY = 0.1
+# Сколько раз отложенная запись повторяется, прежде чем ее отбросить,
+# и наибольшая пауза между повторами отложенных записей (секунды)
+MAX_PENDING_ROUNDS = 5
+PENDING_RETRY_MAX = 30.0
+
+
+class BackgroundLogWriter(LogRepository):
+    """Репозиторий логов с асинхронной записью поверх другого репозитория
+
+    save() только кладет запись в ограниченную очередь; фоновый поток
+    забирает записи пачками (каждые flush_interval_ms или по batch_size
+    записей) и сохраняет пачку одним вызовом save_many. Пока очередь пуста,
+    поток раз в flush_interval_ms вызывает sync_if_due внутреннего
+    репозитория, чтобы записи перед простоем попали на диск в пределах
+    интервала fsync. Пачка, которую не удалось записать, повторяется, а
+    затем пишется по одной записи. Если часть записей сохранилась, а часть
+    нет, несохраненные считаются неисправимыми: они выводятся в stderr и
+    отбрасываются. Если не сохранилась ни одна (хранилище недоступно),
+    записи откладываются и повторяются с растущей паузой, но не больше
+    MAX_PENDING_ROUNDS раз; пока они отложены, flush() сообщает об ошибке. Если очередь
+    заполнена, save() ждет освобождения места. Чтение делегируется
+    внутреннему репозиторию: запись становится видна после сброса пачки.
+    """
+
+    def __init__(
+        self,
+        repo: LogRepository,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        queue_size: int = DEFAULT_QUEUE_SIZE
+    ):
+        if batch_size <= 0:
+            raise ValueError(f"Размер пачки логов должен быть положительным: {batch_size}")
+
+        self.repo = repo
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+        # Отложенные записи с числом неудачных попыток, время следующего
+        # повтора, последняя ошибка записи и число отброшенных записей
+        self._pending: List[Tuple[LogEntry, int]] = []
+        self._pending_lock = threading.Lock()
+        self._retry_delay = self.flush_interval
+        self._retry_at = 0.0
+        self.last_error: Optional[Exception] = None
+        self.dropped = 0
+
+    def initialize(self) -> None:
+        """Инициализирует внутренний репозиторий и запускает фоновый поток"""
+        if hasattr(self.repo, 'initialize'):
+            self.repo.initialize()
+        self.start()
+
+    def start(self) -> None:
+        """Запускает фоновый поток записи"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def save(self, entry: LogEntry) -> None:
+        """Ставит запись в очередь на сохранение"""
+        if self._thread is None or not self._thread.is_alive():
+            # Поток остановлен (например, после close) - пишем синхронно
+            self.repo.save(entry)
+            return
+        self._queue.put(entry)
+
+    def save_many(self, entries: List[LogEntry]) -> None:
+        """Ставит пачку записей в очередь на сохранение"""
+        for entry in entries:
+            self.save(entry)
+
+    def flush(self) -> None:
+        """Дожидается записи всех поставленных в очередь записей
+        
+        Поднимает OSError, если хранилище недоступно и часть записей
+        отложена: они будут записаны при следующем повторе.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+        else:
+            self._drain()
+        with self._pending_lock:
+            pending = len(self._pending)
+        if pending:
+            raise OSError(f"Не удалось записать {pending} записей лога: {self.last_error}")
+
+    def close(self) -> None:
+        """Сбрасывает очередь на диск, останавливает поток и закрывает хранилище"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.close)
+        # Записи, поставленные после остановки потока
+        self._drain()
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        # Хранилище недоступно до самого завершения: записи остаются хотя бы в выводе процесса
+        for entry, _ in pending:
+            self._dead_letter(entry)
+        if hasattr(self.repo, 'close'):
+            self.repo.close()
+
+    def get_all(self) -> List[LogEntry]:
+        """Получает все логи"""
+        return self.repo.get_all()
+
+    def get_by_date_range(self, from_date: str, to_date: str) -> List[LogEntry]:
+        """Получает логи за период"""
+        return self.repo.get_by_date_range(from_date, to_date)
+
+    def get_by_level(self, level: LogLevel) -> List[LogEntry]:
+        """Получает логи по уровню"""
+        return self.repo.get_by_level(level)
+
+    def get_by_category(self, category: LogCategory) -> List[LogEntry]:
+        """Получает логи по категории"""
+        return self.repo.get_by_category(category)
+
+    def get_user_actions(self) -> List[LogEntry]:
+        """Получает логи действий пользователя"""
+        return self.repo.get_user_actions()
+
+    def get_task_logs(self, task_id: str) -> List[LogEntry]:
+        """Получает логи задания"""
+        return self.repo.get_task_logs(task_id)
+
+    def delete_old_logs(self, days_to_keep: int) -> None:
+        """Удаляет старые логи"""
+        self.repo.delete_old_logs(days_to_keep)
+
+    def get_latest(self, count: int) -> List[LogEntry]:
+        """Получает последние N записей"""
+        return self.repo.get_latest(count)
+
+    def search(self, query: str) -> List[LogEntry]:
+        """Поиск в логах"""
+        return self.repo.search(query)
+
+    def version(self) -> Optional[int]:
+        """Версия логов хранилища; записи из очереди учитываются после сброса на диск"""
+        return self.repo.version()
+
+    def get_cursor(self) -> str:
+        """Курсор конца хранилища; записи из очереди попадут в get_since после сброса на диск"""
+        return self.repo.get_cursor()
+
+    def get_since(self, cursor: str, limit: int) -> Tuple[List[LogEntry], str]:
+        """Записи хранилища после курсора"""
+        return self.repo.get_since(cursor, limit)
+
+    def sync_if_due(self) -> None:
+        """Досинхронизирует внутренний репозиторий с диском (фоновый поток делает это сам)"""
+        self.repo.sync_if_due()
+
+    def __getattr__(self, name):
+        """Дополнительные методы конкретного хранилища (статистика буфера и т.п.)"""
+        if name == 'repo':
+            raise AttributeError(name)
+        return getattr(self.repo, name)
+
+    def _run(self) -> None:
+        """Цикл фонового потока: собирает пачку и сохраняет ее"""
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._pending and self._retry_due():
+                    self._write([])
+                self._sync_if_due()
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            self._write(batch, retry_pending=self._retry_due())
+
+        self._drain()
+
+    def _sync_if_due(self) -> None:
+        """Досинхронизирует с диском записанные пачки, пока новых записей нет"""
+        try:
+            self.repo.sync_if_due()
+        except Exception as e:
+            print(f"Ошибка синхронизации логов с диском: {e}")
+
+    def _drain(self) -> None:
+        """Сохраняет все, что осталось в очереди"""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch and not self._pending:
+                return
+            if not self._write(batch):
+                # Хранилище недоступно - не крутимся в цикле, оставшиеся записи ждут в очереди
+                return
+
+    def _retry_due(self) -> bool:
+        """Пора ли повторять отложенные записи"""
+        return time.monotonic() >= self._retry_at
+
+    def _write(self, batch: List[LogEntry], retry_pending: bool = True) -> bool:
+        """Сохраняет пачку записей во внутренний репозиторий; False, если часть записей отложена
+
+        С retry_pending отложенные записи пишутся первыми. Несохраненные
+        записи откладываются снова с удвоенной паузой до повтора; запись,
+        не сохраненная MAX_PENDING_ROUNDS раз, отбрасывается.
+        """
+        with self._pending_lock:
+            pending = self._pending if retry_pending else []
+            if retry_pending:
+                self._pending = []
+        try:
+            failed = self._save_with_retry(pending + [(entry, 0) for entry in batch])
+            if not failed:
+                if pending:
+                    self._retry_delay = self.flush_interval
+                return True
+
+            kept = []
+            for entry, rounds in failed:
+                if rounds + 1 >= MAX_PENDING_ROUNDS:
+                    self._dead_letter(entry)
+                else:
+                    kept.append((entry, rounds + 1))
+            with self._pending_lock:
+                self._pending = kept + self._pending
+            self._retry_at = time.monotonic() + self._retry_delay
+            self._retry_delay = min(self._retry_delay * 2, PENDING_RETRY_MAX)
+            return False
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _save_with_retry(self, entries: List[Tuple[LogEntry, int]]) -> List[Tuple[LogEntry, int]]:
+        """Пишет записи пачкой с повторами, затем по одной; возвращает отложенные
+
+        Записи, не сохраненные по одной, когда остальные сохранились,
+        отбрасываются сразу: повтор их не исправит.
+        """
+        delay = RETRY_DELAY
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                self.repo.save_many([entry for entry, _ in entries])
+                return []
+            except Exception as e:
+                self.last_error = e
+                print(f"Ошибка записи пачки логов ({len(entries)} записей, попытка {attempt + 1}): {e}")
+            if attempt + 1 < WRITE_ATTEMPTS:
+                time.sleep(delay)
+                delay *= 2
+
+        # Пачка не записывается целиком - пишем по одной, чтобы одна плохая запись не держала остальные
+        failed = []
+        for item in entries:
+            try:
+                self.repo.save(item[0])
+            except Exception as e:
+                self.last_error = e
+                failed.append(item)
+        if failed and len(failed) < len(entries):
+            # Хранилище принимает другие записи - эти не сохранятся и при повторе
+            for entry, _ in failed:
+                self._dead_letter(entry)
+            return []
+        if failed:
+            print(f"Ошибка записи логов: {len(failed)} записей отложены до следующей попытки ({self.last_error})")
+        return failed
+
+    def _dead_letter(self, entry: LogEntry) -> None:
+        """Выводит несохраненную запись в stderr и отбрасывает ее"""
+        self.dropped += 1
+        try:
+            line = codec.dumps(entry.to_dict()).decode('utf-8')
+        except Exception:
+            line = repr(entry)
+        print(f"Ошибка записи лога, запись отброшена ({self.last_error}): {line}", file=sys.stderr)
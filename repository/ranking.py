@@ -0,0 +1,56 @@
+"""Порядок заданий: целочисленные ранги с промежутками"""
+from typing import Dict, List, Optional, Tuple
+
+
+# Шаг между соседними заданиями: между ними можно вставить ~10 заданий подряд без перенумерации
+POSITION_GAP = 1024
+
+
+def rank_between(prev: Optional[int], following: Optional[int]) -> Optional[int]:
+    """Позиция между двумя соседними; None, если свободного места между ними нет"""
+    if prev is None and following is None:
+        return POSITION_GAP
+    if prev is None:
+        return following - POSITION_GAP
+    if following is None:
+        return prev + POSITION_GAP
+    if following - prev < 2:
+        return None
+    return (prev + following) // 2
+
+
+def rebalance(task_ids: List[str]) -> Dict[str, int]:
+    """Равномерно перенумеровывает задания с шагом POSITION_GAP"""
+    return {task_id: (i + 1) * POSITION_GAP for i, task_id in enumerate(task_ids)}
+
+
+def plan_move(order: List[Tuple[int, str]], task_id: str, before_id: Optional[str] = None) -> Dict[str, int]:
+    """Новые позиции для перемещения задания перед before_id (в конец, если None)
+
+    order - все задания как пары (позиция, ID), отсортированные по позиции.
+    Обычно меняется только позиция перемещаемого задания; если между
+    соседями не осталось места, перенумеровываются все задания.
+    """
+    ids = [key[1] for key in order]
+    if task_id not in ids:
+        raise ValueError(f"Задание не найдено: {task_id}")
+    if before_id is not None and before_id not in ids:
+        raise ValueError(f"Задание не найдено: {before_id}")
+    if before_id == task_id:
+        return {}
+
+    rest = [key for key in order if key[1] != task_id]
+    if before_id is None:
+        i = len(rest)
+    else:
+        i = next(j for j, key in enumerate(rest) if key[1] == before_id)
+
+    prev = rest[i - 1][0] if i > 0 else None
+    following = rest[i][0] if i < len(rest) else None
+    position = rank_between(prev, following)
+    if position is not None:
+        return {task_id: position}
+
+    ids = [key[1] for key in rest]
+    ids.insert(i, task_id)
+    return rebalance(ids)
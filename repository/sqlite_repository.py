@@ -0,0 +1,924 @@
+"""SQLite реализация репозиториев (WAL, отдельное соединение на поток)"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, List, Optional, Dict, Iterator, Tuple
+
+from domain.task import Task
+from domain.settings import Settings, FrozenSettings
+from domain.references import References, ReferenceItem, ReferenceType, ReferenceIndex
+from domain.log import LogEntry, LogLevel, LogCategory
+from .interfaces import (
+    TaskRepository, SettingsRepository, ReferencesRepository,
+    LogRepository, DataManager
+)
+from . import codec
+from .log_search import contains_all, normalize, tokenize
+from .log_writer import BackgroundLogWriter, DEFAULT_FLUSH_INTERVAL_MS, DEFAULT_BATCH_SIZE
+from .ranking import POSITION_GAP, plan_move
+from .unit_of_work import UnitOfWork, TaskChange, SAVE, DELETE, FIELDS, POSITIONS, MOVE
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    in_work INTEGER NOT NULL DEFAULT 0,
+    type_task TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    time_slot TEXT NOT NULL DEFAULT '',
+    time_cancel INTEGER NOT NULL DEFAULT 30,
+    count_try INTEGER NOT NULL DEFAULT 60,
+    delay_try INTEGER NOT NULL DEFAULT 60,
+    num_auto TEXT NOT NULL DEFAULT '',
+    driver TEXT NOT NULL DEFAULT '',
+    place TEXT NOT NULL DEFAULT '',
+    index_container TEXT NOT NULL DEFAULT '',
+    number_container TEXT NOT NULL DEFAULT '',
+    release_order TEXT NOT NULL DEFAULT '',
+    contract_terminal TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_position ON tasks (position);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_in_work ON tasks (in_work, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_order ON tasks (position, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_date ON tasks (date, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_driver ON tasks (driver, position);
+
+CREATE TABLE IF NOT EXISTS settings (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS reference_items (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ref_type TEXT NOT NULL,
+    id TEXT NOT NULL,
+    value TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (ref_type, id)
+);
+CREATE INDEX IF NOT EXISTS idx_reference_items_active ON reference_items (ref_type, is_active);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS logs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    level TEXT NOT NULL,
+    category TEXT NOT NULL,
+    message TEXT NOT NULL DEFAULT '',
+    details TEXT NOT NULL DEFAULT '',
+    task_id TEXT NOT NULL DEFAULT '',
+    user_action INTEGER NOT NULL DEFAULT 0,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_task_id ON logs (task_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_level ON logs (level, timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_category ON logs (category, timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_user_action ON logs (user_action, timestamp) WHERE user_action = 1;
+"""
+
+# Версии данных для ETag: триггеры увеличивают счетчик в той же транзакции, что и изменение
+VERSIONED_TABLES = {
+    "tasks": ("tasks",),
+    "settings": ("settings",),
+    "references": ("reference_items", "meta"),
+    "logs": ("logs",),
+}
+
+VERSIONS_SCHEMA = "CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, value INTEGER NOT NULL DEFAULT 0);\n" + "".join(
+    f"INSERT OR IGNORE INTO versions (name) VALUES ('{name}');\n" + "".join(
+        f"CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version AFTER {event} ON {table} "
+        f"BEGIN UPDATE versions SET value = value + 1 WHERE name = '{name}'; END;\n"
+        for table in tables for event in ("INSERT", "UPDATE", "DELETE")
+    )
+    for name, tables in VERSIONED_TABLES.items()
+)
+
+# Полнотекстовый индекс: нормализованный текст (casefold, ё -> е), rowid = logs.seq.
+# Токенизатор trigram ищет подстроки; термины короче трех символов проверяются через instr
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(text, tokenize = 'trigram')"
+FTS_MIN_TERM = 3
+
+TASK_COLUMNS = (
+    "id", "in_work", "type_task", "status", "date", "time_slot", "time_cancel",
+    "count_try", "delay_try", "num_auto", "driver", "place", "index_container",
+    "number_container", "release_order", "contract_terminal", "created_at",
+    "updated_at", "position"
+)
+
+# Отметка переноса данных JSON хранилища в meta: pending - перенос еще не выполнен, done - выполнен или не нужен
+JSON_IMPORT_KEY = "json_import"
+JSON_IMPORT_PENDING = "pending"
+JSON_IMPORT_DONE = "done"
+
+LOG_COLUMNS = (
+    "id", "timestamp", "level", "category", "message", "details",
+    "task_id", "user_action", "error"
+)
+
+
+class SQLiteDatabase:
+    """Файл базы SQLite с отдельным соединением на каждый поток"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.has_fts = False
+
+    def connection(self) -> sqlite3.Connection:
+        """Возвращает соединение текущего потока"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Транзакция записи: BEGIN IMMEDIATE сразу берет блокировку писателя"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def initialize(self) -> None:
+        """Создает схему"""
+        conn = self.connection()
+        conn.executescript(SCHEMA)
+        conn.executescript(VERSIONS_SCHEMA)
+        try:
+            with self.write() as conn:
+                row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'logs_fts'").fetchone()
+                rebuild = row is not None and "trigram" not in row[0]
+                if rebuild:
+                    # Индекс прежнего формата (по началу слов) перестраивается под поиск подстрок
+                    conn.execute("DROP TABLE logs_fts")
+                conn.execute(FTS_SCHEMA)
+                if rebuild:
+                    rows = conn.execute("SELECT seq, message, details, error FROM logs").fetchall()
+                    conn.executemany(
+                        "INSERT INTO logs_fts (rowid, text) VALUES (?, ?)",
+                        ((row[0], normalize(" ".join(row[1:]))) for row in rows)
+                    )
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite собран без FTS5 или без trigram (до 3.34) - поиск будет выполняться перебором
+            self.has_fts = False
+
+    def version(self, name: str) -> int:
+        """Текущая версия данных (tasks, settings, references, logs)"""
+        row = self.connection().execute("SELECT value FROM versions WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def versions(self) -> Dict[str, int]:
+        """Версии всех данных"""
+        return {row[0]: row[1] for row in self.connection().execute("SELECT name, value FROM versions")}
+
+    def advance_versions(self, previous: Dict[str, int]) -> None:
+        """Поднимает версии выше прежних значений (после восстановления из копии)
+
+        Версии копии могут быть меньше текущих; если не поднять их, клиент
+        с ETag, совпавшим со старой версией, получит 304 на другие данные.
+        """
+        with self.write() as conn:
+            for name, value in previous.items():
+                conn.execute("UPDATE versions SET value = MAX(value, ?) + 1 WHERE name = ?", (value, name))
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Значение служебной записи meta; None, если ее нет"""
+        row = self.connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+        """Записывает служебную запись meta в открытой транзакции"""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def close(self) -> None:
+        """Закрывает соединения всех потоков"""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class SQLiteTaskRepository(TaskRepository):
+    """SQLite репозиторий заданий"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def save(self, task: Task) -> None:
+        """Сохраняет задание"""
+        with self.db.write() as conn:
+            self._save(conn, task)
+
+    def save_many(self, tasks: List[Task]) -> None:
+        """Сохраняет несколько заданий одной транзакцией"""
+        if not tasks:
+            return
+        with self.db.write() as conn:
+            max_position = conn.execute("SELECT COALESCE(MAX(position), 0) FROM tasks").fetchone()[0]
+            for task in tasks:
+                if not conn.execute("SELECT 1 FROM tasks WHERE id = ?", (task.id,)).fetchone():
+                    max_position += POSITION_GAP
+                    task.position = max_position
+                self._upsert(conn, task)
+
+    def update_fields_many(self, updates: Dict[str, Dict[str, Any]]) -> List[Task]:
+        """Обновляет поля нескольких заданий одной транзакцией"""
+        if not updates:
+            return []
+        updated = []
+        with self.db.write() as conn:
+            for task_id, fields in updates.items():
+                task = self._update_fields(conn, task_id, fields)
+                if task:
+                    updated.append(task)
+        return updated
+
+    def apply_changes(self, changes: List[TaskChange]) -> None:
+        """Применяет пачку изменений заданий одной транзакцией"""
+        if not changes:
+            return
+        with self.db.write() as conn:
+            self._apply_changes(conn, changes)
+
+    def _apply_changes(self, conn: sqlite3.Connection, changes: List[TaskChange]) -> None:
+        """Применяет изменения заданий в открытой транзакции"""
+        for kind, data in changes:
+            if kind == SAVE:
+                self._save(conn, data)
+            elif kind == DELETE:
+                conn.execute("DELETE FROM tasks WHERE id = ?", (data,))
+            elif kind == FIELDS:
+                self._update_fields(conn, *data)
+            elif kind == POSITIONS:
+                self._update_positions(conn, data)
+            elif kind == MOVE:
+                self._move(conn, *data)
+            else:
+                raise ValueError(f"Неизвестное изменение задания: {kind}")
+
+    def get_by_id(self, task_id: str) -> Optional[Task]:
+        """Получает задание по ID"""
+        row = self.db.connection().execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._row_to_task(row) if row else None
+
+    def get_all(self) -> List[Task]:
+        """Получает все задания"""
+        rows = self.db.connection().execute("SELECT * FROM tasks ORDER BY position").fetchall()
+        return [self._row_to_task(row) for row in rows]
+
+    def delete(self, task_id: str) -> None:
+        """Удаляет задание"""
+        with self.db.write() as conn:
+            conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def update_positions(self, task_positions: Dict[str, int]) -> None:
+        """Обновляет позиции заданий; задания с неизменной позицией не трогаются"""
+        with self.db.write() as conn:
+            self._update_positions(conn, task_positions)
+
+    def move_task(self, task_id: str, before_id: Optional[str] = None) -> Task:
+        """Перемещает задание перед before_id (в конец списка, если None)"""
+        with self.db.write() as conn:
+            self._move(conn, task_id, before_id)
+            row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._row_to_task(row)
+
+    def get_by_status(self, status: str) -> List[Task]:
+        """Получает задания по статусу"""
+        rows = self.db.connection().execute(
+            "SELECT * FROM tasks WHERE status = ? ORDER BY position", (status,)
+        ).fetchall()
+        return [self._row_to_task(row) for row in rows]
+
+    def get_active_tasks_in_order(self) -> List[Task]:
+        """Получает активные задания в порядке выполнения"""
+        rows = self.db.connection().execute(
+            "SELECT * FROM tasks WHERE in_work = 1 ORDER BY position"
+        ).fetchall()
+        return [self._row_to_task(row) for row in rows]
+
+    def version(self) -> Optional[int]:
+        """Версия заданий"""
+        return self.db.version("tasks")
+
+    def get_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[int, str]] = None,
+        status: Optional[str] = None,
+        date: Optional[str] = None,
+        in_work: Optional[bool] = None,
+        driver: Optional[str] = None
+    ) -> List[Task]:
+        """Страница заданий в порядке (позиция, ID), начиная строго после ключа after"""
+        conditions = []
+        params: list = []
+        if after is not None:
+            conditions.append("(position > ? OR (position = ? AND id > ?))")
+            params.extend([after[0], after[0], after[1]])
+        for column, value in (("status", status), ("date", date), ("driver", driver)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if in_work is not None:
+            conditions.append("in_work = ?")
+            params.append(1 if in_work else 0)
+
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        rows = self.db.connection().execute(
+            f"SELECT * FROM tasks {where}ORDER BY position, id LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [self._row_to_task(row) for row in rows]
+
+    def _save(self, conn: sqlite3.Connection, task: Task) -> None:
+        """Сохраняет задание в открытой транзакции; новое ставится в конец"""
+        exists = conn.execute("SELECT 1 FROM tasks WHERE id = ?", (task.id,)).fetchone()
+        if not exists:
+            row = conn.execute("SELECT COALESCE(MAX(position), 0) FROM tasks").fetchone()
+            task.position = row[0] + POSITION_GAP
+        self._upsert(conn, task)
+
+    def _update_fields(self, conn: sqlite3.Connection, task_id: str, fields: Dict[str, Any]) -> Optional[Task]:
+        """Обновляет поля задания в открытой транзакции; None, если задания нет"""
+        row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if not row:
+            return None
+        task = self._row_to_task(row)
+        self._apply_fields(task, fields)
+        self._upsert(conn, task)
+        return task
+
+    @staticmethod
+    def _update_positions(conn: sqlite3.Connection, task_positions: Dict[str, int]) -> None:
+        """Обновляет позиции заданий в открытой транзакции"""
+        now = datetime.now().isoformat()
+        conn.executemany(
+            "UPDATE tasks SET position = ?, updated_at = ? WHERE id = ? AND position != ?",
+            [(position, now, task_id, position) for task_id, position in task_positions.items()]
+        )
+
+    @staticmethod
+    def _move(conn: sqlite3.Connection, task_id: str, before_id: Optional[str]) -> None:
+        """Перемещает задание в открытой транзакции"""
+        now = datetime.now().isoformat()
+        order = [tuple(row) for row in conn.execute("SELECT position, id FROM tasks ORDER BY position, id")]
+        positions = plan_move(order, task_id, before_id)
+        conn.executemany(
+            "UPDATE tasks SET position = ? WHERE id = ? AND position != ?",
+            [(position, moved_id, position) for moved_id, position in positions.items()]
+        )
+        if positions:
+            conn.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (now, task_id))
+
+    def _upsert(self, conn: sqlite3.Connection, task: Task) -> None:
+        """Вставляет или заменяет строку задания"""
+        data = task.to_dict()
+        data["in_work"] = int(data["in_work"])
+        placeholders = ", ".join("?" for _ in TASK_COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in TASK_COLUMNS[1:])
+        conn.execute(
+            f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}",
+            [data[column] for column in TASK_COLUMNS]
+        )
+
+    @staticmethod
+    def _row_to_task(row: sqlite3.Row) -> Task:
+        """Преобразует строку таблицы в задание"""
+        data = dict(row)
+        data["in_work"] = bool(data["in_work"])
+        return Task.from_dict(data)
+
+
+class SQLiteSettingsRepository(SettingsRepository):
+    """SQLite репозиторий настроек (одна строка с JSON)"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+        # Снимок настроек и версия, из которой он построен
+        self._snapshot: Optional[Tuple[int, FrozenSettings]] = None
+
+    def initialize(self) -> None:
+        """Инициализация"""
+        if not self.exists():
+            self.save(Settings())
+
+    def save(self, settings: Settings) -> None:
+        """Сохраняет настройки"""
+        with self.db.write() as conn:
+            self._write(conn, settings)
+
+    def get(self) -> Settings:
+        """Получает настройки"""
+        row = self.db.connection().execute("SELECT data FROM settings WHERE id = 1").fetchone()
+        if not row:
+            return Settings()
+        return Settings.from_dict(codec.loads(row["data"]))
+
+    def update(self, settings: Settings) -> None:
+        """Обновляет настройки"""
+        self.save(settings)
+
+    def exists(self) -> bool:
+        """Проверяет существование настроек"""
+        return self.db.connection().execute("SELECT 1 FROM settings WHERE id = 1").fetchone() is not None
+
+    def version(self) -> Optional[int]:
+        """Версия настроек"""
+        return self.db.version("settings")
+
+    def get_snapshot(self) -> FrozenSettings:
+        """Снимок настроек только для чтения; строится заново при смене версии в базе"""
+        # Версия берется до чтения: снимок не может оказаться новее своей версии
+        version = self.version()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot[0] != version:
+            snapshot = self._snapshot = (version, FrozenSettings.from_settings(self.get()))
+        return snapshot[1]
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, settings: Settings) -> None:
+        """Записывает настройки в открытой транзакции"""
+        payload = codec.dumps(settings.to_dict()).decode('utf-8')
+        conn.execute(
+            "INSERT INTO settings (id, data) VALUES (1, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+            (payload,)
+        )
+
+
+class SQLiteReferencesRepository(ReferencesRepository):
+    """SQLite репозиторий справочников"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+        self._index: Optional[ReferenceIndex] = None
+
+    def initialize(self) -> None:
+        """Инициализация: дополняет пустые справочники значениями по умолчанию"""
+        defaults = References()
+        with self.db.write() as conn:
+            for ref_type in ReferenceType:
+                count = conn.execute(
+                    "SELECT COUNT(*) FROM reference_items WHERE ref_type = ?", (ref_type.value,)
+                ).fetchone()[0]
+                if count == 0:
+                    for item in getattr(defaults, ref_type.value):
+                        self._insert(conn, ref_type, item)
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'references_updated_at'").fetchone() is None:
+                self._touch(conn, defaults.updated_at)
+
+    def save(self, references: References) -> None:
+        """Сохраняет справочники"""
+        with self.db.write() as conn:
+            self._replace(conn, references)
+
+    def get(self) -> References:
+        """Получает справочники"""
+        conn = self.db.connection()
+        items: Dict[str, List[ReferenceItem]] = {ref_type.value: [] for ref_type in ReferenceType}
+        for row in conn.execute("SELECT * FROM reference_items ORDER BY seq"):
+            items.setdefault(row["ref_type"], []).append(self._row_to_item(row))
+
+        references = References(**items)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'references_updated_at'").fetchone()
+        if row:
+            references.updated_at = datetime.fromisoformat(row["value"])
+        return references
+
+    def update(self, references: References) -> None:
+        """Обновляет справочники"""
+        self.save(references)
+
+    def add_item(self, ref_type: ReferenceType, value: str, description: str = "") -> ReferenceItem:
+        """Добавляет элемент в справочник"""
+        item = ReferenceItem(value=value, description=description)
+        with self.db.write() as conn:
+            self._insert(conn, ref_type, item)
+            self._touch(conn, datetime.now())
+        return item
+
+    def remove_item(self, ref_type: ReferenceType, item_id: str) -> None:
+        """Удаляет элемент из справочника"""
+        with self.db.write() as conn:
+            cursor = conn.execute(
+                "DELETE FROM reference_items WHERE ref_type = ? AND id = ?", (ref_type.value, item_id)
+            )
+            if cursor.rowcount == 0:
+                raise ValueError(f"Элемент {item_id} не найден в справочнике {ref_type}")
+            self._touch(conn, datetime.now())
+
+    def get_active_items(self, ref_type: ReferenceType) -> List[ReferenceItem]:
+        """Получает активные элементы справочника"""
+        rows = self.db.connection().execute(
+            "SELECT * FROM reference_items WHERE ref_type = ? ORDER BY seq", (ref_type.value,)
+        ).fetchall()
+        if not rows:
+            # Как и в JSON хранилище, пустой справочник заполняется значениями по умолчанию
+            return References().get_active_items(ref_type)
+        return [self._row_to_item(row) for row in rows if row["is_active"]]
+
+    def version(self) -> Optional[int]:
+        """Версия справочников"""
+        return self.db.version("references")
+
+    def get_index(self) -> ReferenceIndex:
+        """Снимок справочников с индексом; строится заново при смене версии в базе"""
+        # Версия берется до чтения: снимок не может оказаться новее своей версии
+        version = self.version()
+        index = self._index
+        if index is None or index.version != version:
+            index = self._index = ReferenceIndex(self.get(), version)
+        return index
+
+    def _replace(self, conn: sqlite3.Connection, references: References) -> None:
+        """Заменяет все справочники в открытой транзакции"""
+        conn.execute("DELETE FROM reference_items")
+        for ref_type in ReferenceType:
+            for item in getattr(references, ref_type.value):
+                self._insert(conn, ref_type, item)
+        self._touch(conn, references.updated_at)
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, ref_type: ReferenceType, item: ReferenceItem) -> None:
+        """Вставляет элемент справочника"""
+        conn.execute(
+            "INSERT OR REPLACE INTO reference_items "
+            "(ref_type, id, value, description, is_active, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                ref_type.value, item.id, item.value, item.description, int(item.is_active),
+                item.created_at.isoformat(), item.updated_at.isoformat()
+            )
+        )
+
+    @staticmethod
+    def _touch(conn: sqlite3.Connection, updated_at: datetime) -> None:
+        """Обновляет время изменения справочников"""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('references_updated_at', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (updated_at.isoformat(),)
+        )
+
+    @staticmethod
+    def _row_to_item(row: sqlite3.Row) -> ReferenceItem:
+        """Преобразует строку таблицы в элемент справочника"""
+        data = dict(row)
+        data["is_active"] = bool(data["is_active"])
+        return ReferenceItem.from_dict(data)
+
+
+class SQLiteLogRepository(LogRepository):
+    """SQLite репозиторий логов"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def save(self, entry: LogEntry) -> None:
+        """Сохраняет запись лога"""
+        self.save_many([entry])
+
+    def save_many(self, entries: List[LogEntry]) -> None:
+        """Сохраняет пачку записей лога одной транзакцией"""
+        if not entries:
+            return
+        with self.db.write() as conn:
+            self._insert_many(conn, entries)
+
+    def _insert_many(self, conn: sqlite3.Connection, entries: List[LogEntry]) -> None:
+        """Вставляет записи лога в открытой транзакции"""
+        placeholders = ", ".join("?" for _ in LOG_COLUMNS)
+        for entry in entries:
+            data = entry.to_dict()
+            data["user_action"] = int(data["user_action"])
+            cursor = conn.execute(
+                f"INSERT INTO logs ({', '.join(LOG_COLUMNS)}) VALUES ({placeholders})",
+                [data[column] for column in LOG_COLUMNS]
+            )
+            if self.db.has_fts:
+                conn.execute(
+                    "INSERT INTO logs_fts (rowid, text) VALUES (?, ?)",
+                    (cursor.lastrowid, normalize(" ".join((entry.message, entry.details, entry.error))))
+                )
+
+    def get_all(self) -> List[LogEntry]:
+        """Получает все логи"""
+        return self._select("1 = 1", ())
+
+    def get_by_date_range(self, from_date: str, to_date: str) -> List[LogEntry]:
+        """Получает логи за период"""
+        from_dt = datetime.fromisoformat(from_date)
+        to_dt = datetime.fromisoformat(to_date) + timedelta(days=1)
+        return self._select("timestamp >= ? AND timestamp < ?", (from_dt.isoformat(), to_dt.isoformat()))
+
+    def get_by_level(self, level: LogLevel) -> List[LogEntry]:
+        """Получает логи по уровню"""
+        return self._select("level = ?", (LogLevel(level).value,))
+
+    def get_by_category(self, category: LogCategory) -> List[LogEntry]:
+        """Получает логи по категории"""
+        return self._select("category = ?", (LogCategory(category).value,))
+
+    def get_user_actions(self) -> List[LogEntry]:
+        """Получает логи действий пользователя"""
+        return self._select("user_action = 1", ())
+
+    def get_task_logs(self, task_id: str) -> List[LogEntry]:
+        """Получает логи задания"""
+        return self._select("task_id = ?", (task_id,))
+
+    def delete_old_logs(self, days_to_keep: int) -> None:
+        """Удаляет старые логи
+
+        Граница - начало суток, как у посуточных сегментов JSONL хранилища:
+        записи суток, на которые приходится граница, сохраняются целиком.
+        """
+        cutoff_day = (datetime.now() - timedelta(days=days_to_keep)).date()
+        cutoff = datetime.combine(cutoff_day, datetime.min.time()).isoformat()
+        with self.db.write() as conn:
+            if self.db.has_fts:
+                conn.execute(
+                    "DELETE FROM logs_fts WHERE rowid IN (SELECT seq FROM logs WHERE timestamp < ?)", (cutoff,)
+                )
+            conn.execute("DELETE FROM logs WHERE timestamp < ?", (cutoff,))
+
+    def get_latest(self, count: int) -> List[LogEntry]:
+        """Получает последние N записей"""
+        rows = self.db.connection().execute(
+            "SELECT * FROM logs ORDER BY seq DESC LIMIT ?", (count,)
+        ).fetchall()
+        return [self._row_to_entry(row) for row in reversed(rows)]
+
+    def get_cursor(self) -> str:
+        """Курсор конца хранилища - последний seq (AUTOINCREMENT, только растет)"""
+        row = self.db.connection().execute("SELECT MAX(seq) FROM logs").fetchone()
+        return str(row[0] or 0)
+
+    def get_since(self, cursor: str, limit: int) -> Tuple[List[LogEntry], str]:
+        """Записи с seq больше курсора - выборка по первичному ключу"""
+        try:
+            seq = int(cursor)
+        except ValueError:
+            raise ValueError(f"Некорректный курсор логов: {cursor}")
+        if seq < 0:
+            raise ValueError(f"Некорректный курсор логов: {cursor}")
+
+        conn = self.db.connection()
+        if seq > int(self.get_cursor()):
+            # База восстановлена из копии с меньшим seq - читаем записи заново
+            seq = 0
+        rows = conn.execute("SELECT * FROM logs WHERE seq > ? ORDER BY seq LIMIT ?", (seq, limit)).fetchall()
+        if rows:
+            seq = rows[-1]["seq"]
+        return [self._row_to_entry(row) for row in rows], str(seq)
+
+    def search(self, query: str) -> List[LogEntry]:
+        """Поиск в логах: каждый термин должен входить подстрокой в слово ("1234567" найдет "MSKU1234567")"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return self.get_all()
+
+        if not self.db.has_fts:
+            return [log for log in self.get_all() if contains_all(terms, log.message, log.details, log.error)]
+
+        conditions, params = [], []
+        long_terms = [term for term in terms if len(term) >= FTS_MIN_TERM]
+        if long_terms:
+            conditions.append("logs_fts MATCH ?")
+            params.append(" AND ".join(f'"{term}"' for term in long_terms))
+        for term in terms:
+            if len(term) < FTS_MIN_TERM:
+                conditions.append("instr(text, ?) > 0")
+                params.append(term)
+        return self._select(
+            f"seq IN (SELECT rowid FROM logs_fts WHERE {' AND '.join(conditions)})", tuple(params)
+        )
+
+    def version(self) -> Optional[int]:
+        """Версия логов"""
+        return self.db.version("logs")
+
+    def get_buffer_stats(self) -> Dict[str, int]:
+        """SQLite отдает последние записи по индексу, буфера в памяти нет"""
+        return {"capacity": 0, "size": 0, "memory_bytes": 0}
+
+    def _select(self, where: str, params: tuple) -> List[LogEntry]:
+        """Выбирает записи по условию в порядке времени"""
+        rows = self.db.connection().execute(
+            f"SELECT * FROM logs WHERE {where} ORDER BY timestamp, seq", params
+        ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    @staticmethod
+    def _row_to_entry(row: sqlite3.Row) -> LogEntry:
+        """Преобразует строку таблицы в запись лога"""
+        data = dict(row)
+        data["user_action"] = bool(data["user_action"])
+        return LogEntry.from_dict(data)
+
+
+class SQLiteUnitOfWork(UnitOfWork):
+    """Единица работы SQLite: задания и логи записываются одной транзакцией"""
+
+    def __init__(self, db: SQLiteDatabase, task_repo: SQLiteTaskRepository, log_repo: SQLiteLogRepository):
+        super().__init__(task_repo, log_repo)
+        self.db = db
+
+    def _apply(self, task_changes: List[TaskChange], log_entries: List[LogEntry]) -> None:
+        """Записывает изменения заданий и логи одной транзакцией"""
+        if not task_changes and not log_entries:
+            return
+        with self.db.write() as conn:
+            self.task_repo._apply_changes(conn, task_changes)
+            self.log_repo._insert_many(conn, log_entries)
+
+
+class SQLiteDataManager(DataManager):
+    """Менеджер данных с хранилищем SQLite
+
+    База работает в режиме WAL: читатели не блокируют писателя и друг
+    друга, поэтому несколько воркеров uvicorn могут работать с одним
+    файлом базы.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        log_flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        log_batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        self.data_dir = data_dir
+        self.db_path = os.path.join(data_dir, "rli.db")
+        self.db = SQLiteDatabase(self.db_path)
+        self.tasks_repo = SQLiteTaskRepository(self.db)
+        self.settings_repo = SQLiteSettingsRepository(self.db)
+        self.references_repo = SQLiteReferencesRepository(self.db)
+        self.logs_repo = BackgroundLogWriter(
+            SQLiteLogRepository(self.db),
+            flush_interval_ms=log_flush_interval_ms,
+            batch_size=log_batch_size
+        )
+
+    def initialize(self) -> None:
+        """Инициализирует хранилище"""
+        Path(self.data_dir).mkdir(parents=True, exist_ok=True)
+
+        self.db.initialize()
+        if self.db.get_meta(JSON_IMPORT_KEY) is None:
+            # Новая база (еще без настроек): данные JSON хранилища из того же каталога переносятся в нее.
+            # В базе с настройками, но без отметки, перенос уже выполнялся при ее создании
+            pending = not self.settings_repo.exists() and os.path.exists(os.path.join(self.data_dir, "tasks.json"))
+            with self.db.write() as conn:
+                self.db.set_meta(conn, JSON_IMPORT_KEY, JSON_IMPORT_PENDING if pending else JSON_IMPORT_DONE)
+        self.settings_repo.initialize()
+        self.references_repo.initialize()
+        self.logs_repo.start()
+
+        # Перенос повторяется при каждом запуске, пока не завершится успешно
+        if self.db.get_meta(JSON_IMPORT_KEY) == JSON_IMPORT_PENDING:
+            self.import_from_json(self.data_dir)
+
+        print(f"[OK] SQLite storage initialized: {self.db_path}")
+
+    def get_tasks(self) -> TaskRepository:
+        """Возвращает репозиторий заданий"""
+        return self.tasks_repo
+
+    def get_settings(self) -> SettingsRepository:
+        """Возвращает репозиторий настроек"""
+        return self.settings_repo
+
+    def get_references(self) -> ReferencesRepository:
+        """Возвращает репозиторий справочников"""
+        return self.references_repo
+
+    def get_logs(self) -> LogRepository:
+        """Возвращает репозиторий логов"""
+        return self.logs_repo
+
+    def unit_of_work(self) -> UnitOfWork:
+        """Единица работы: задания и логи одной транзакцией, мимо фоновой очереди логов"""
+        return SQLiteUnitOfWork(self.db, self.tasks_repo, self.logs_repo.repo)
+
+    def close(self) -> None:
+        """Закрывает соединение с хранилищем"""
+        # Сбрасывает очередь логов в базу
+        self.logs_repo.close()
+        self.db.close()
+
+    def is_healthy(self) -> bool:
+        """Проверяет здоровье хранилища"""
+        try:
+            return self.db.connection().execute("PRAGMA quick_check").fetchone()[0] == "ok"
+        except sqlite3.Error:
+            return False
+
+    def backup(self, backup_path: str) -> None:
+        """Создает резервную копию"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_dir = os.path.join(backup_path, f"backup_{timestamp}")
+        Path(backup_dir).mkdir(parents=True, exist_ok=True)
+
+        self.logs_repo.flush()
+        target = sqlite3.connect(os.path.join(backup_dir, "rli.db"))
+        try:
+            self.db.connection().backup(target)
+        finally:
+            target.close()
+
+        print(f"[OK] Backup created: {backup_dir}")
+
+    def restore(self, backup_path: str) -> None:
+        """Восстанавливает из резервной копии"""
+        source_path = os.path.join(backup_path, "rli.db")
+        if not os.path.exists(source_path):
+            raise FileNotFoundError(f"Backup database not found: {source_path}")
+
+        self.logs_repo.flush()
+        versions = self.db.versions()
+        source = sqlite3.connect(source_path)
+        try:
+            source.backup(self.db.connection())
+        finally:
+            source.close()
+        # Копия могла быть сделана до появления таблицы версий
+        self.db.initialize()
+        self.db.advance_versions(versions)
+
+        print(f"[OK] Data restored from: {backup_path}")
+
+    def import_from_json(self, json_data_dir: str) -> Dict[str, int]:
+        """Импортирует данные из JSON хранилища (задания, настройки, справочники, логи)
+
+        Файлы JSON только читаются: миграции JSON хранилища не запускаются.
+        Существующие задания, справочники и логи заменяются одной транзакцией
+        вместе с отметкой о завершении переноса, поэтому сбой посередине не
+        оставляет базу заполненной наполовину. Возвращает количество
+        импортированных записей по видам данных.
+        """
+        from .json_repository import read_json_storage
+
+        data = read_json_storage(json_data_dir)
+        tasks, settings, references, logs = data["tasks"], data["settings"], data["references"], data["logs"]
+
+        self.logs_repo.flush()
+        with self.db.write() as conn:
+            conn.execute("DELETE FROM tasks")
+            for task in tasks:
+                self.tasks_repo._upsert(conn, task)
+            if settings is not None:
+                self.settings_repo._write(conn, settings)
+            if references is not None:
+                self.references_repo._replace(conn, references)
+            if self.db.has_fts:
+                conn.execute("DELETE FROM logs_fts")
+            conn.execute("DELETE FROM logs")
+            self.logs_repo.repo._insert_many(conn, logs)
+            self.db.set_meta(conn, JSON_IMPORT_KEY, JSON_IMPORT_DONE)
+
+        counts = {"tasks": len(tasks), "references": sum(
+            len(getattr(references, ref_type.value)) for ref_type in ReferenceType
+        ) if references is not None else 0, "logs": len(logs)}
+        print(f"[OK] Imported from JSON storage: {counts}")
+        return counts
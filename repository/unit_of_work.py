@@ -0,0 +1,91 @@
+"""Единица работы: изменения заданий и записи лога, применяемые вместе"""
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from domain.task import Task
+from domain.log import LogEntry
+
+if TYPE_CHECKING:
+    from .interfaces import TaskRepository, LogRepository
+
+
+# Виды изменений заданий в пачке TaskRepository.apply_changes
+SAVE = "save"
+DELETE = "delete"
+FIELDS = "fields"
+POSITIONS = "positions"
+MOVE = "move"
+
+# Изменение задания: (вид, данные)
+TaskChange = Tuple[str, Any]
+
+
+class UnitOfWork:
+    """Накапливает изменения заданий и записи лога и применяет их в commit()
+
+    Изменения заданий применяются одной записью хранилища заданий
+    (apply_changes), записи лога - одной пачкой (save_many), в порядке
+    добавления. Когда commit() возвращается, записи лога уже сохранены:
+    репозиторий логов с фоновой очередью (есть flush) сбрасывается до
+    возврата. Используется как контекстный менеджер: при выходе без
+    исключения изменения применяются, при исключении - отбрасываются.
+    """
+
+    def __init__(self, task_repo: 'TaskRepository', log_repo: 'LogRepository'):
+        self.task_repo = task_repo
+        self.log_repo = log_repo
+        self._task_changes: List[TaskChange] = []
+        self._log_entries: List[LogEntry] = []
+
+    def __enter__(self) -> 'UnitOfWork':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def save_task(self, task: Task) -> None:
+        """Сохраняет задание (новому заданию позиция назначается при применении)"""
+        self._task_changes.append((SAVE, task))
+
+    def delete_task(self, task_id: str) -> None:
+        """Удаляет задание"""
+        self._task_changes.append((DELETE, task_id))
+
+    def update_task_fields(self, task_id: str, fields: Dict[str, Any]) -> None:
+        """Обновляет поля задания (как update_fields_many)"""
+        self._task_changes.append((FIELDS, (task_id, fields)))
+
+    def update_positions(self, task_positions: Dict[str, int]) -> None:
+        """Обновляет позиции заданий"""
+        self._task_changes.append((POSITIONS, task_positions))
+
+    def move_task(self, task_id: str, before_id: Optional[str] = None) -> None:
+        """Перемещает задание перед before_id (в конец списка, если None)"""
+        self._task_changes.append((MOVE, (task_id, before_id)))
+
+    def add_log(self, entry: LogEntry) -> None:
+        """Добавляет запись лога"""
+        self._log_entries.append(entry)
+
+    def commit(self) -> None:
+        """Применяет накопленные изменения: задания, затем логи"""
+        task_changes, log_entries = self._task_changes, self._log_entries
+        self._task_changes, self._log_entries = [], []
+        self._apply(task_changes, log_entries)
+
+    def rollback(self) -> None:
+        """Отбрасывает накопленные изменения"""
+        self._task_changes, self._log_entries = [], []
+
+    def _apply(self, task_changes: List[TaskChange], log_entries: List[LogEntry]) -> None:
+        """Записывает изменения: одна запись на хранилище"""
+        if task_changes:
+            self.task_repo.apply_changes(task_changes)
+        if log_entries:
+            self.log_repo.save_many(log_entries)
+            # Фоновая запись логов: дожидаемся, пока пачка попадет в хранилище
+            if hasattr(self.log_repo, 'flush'):
+                self.log_repo.flush()
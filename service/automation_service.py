@@ -202,7 +202,7 @@ class AutomationService:
             raise Exception("Выполнение задания остановлено пользователем")
         
         self.current_task = task
-        settings = self.settings_repo.get()
+        settings = self.settings_repo.get_snapshot()
         
         # Этап 1: Инициализация браузера
         self._log_task_info("🌐 Этап 1: Инициализация браузера", "Настройка Selenium WebDriver...")
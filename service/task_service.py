@@ -1,11 +1,29 @@
 """Сервис управления заданиями"""
-from typing import List, Optional, Dict
+import base64
+import binascii
+from typing import Callable, List, Optional, Dict, Tuple
 from datetime import datetime
 
 from domain.task import Task, TaskStatus
 from domain.log import LogEntry, LogLevel, LogCategory, create_user_action_log, create_error_log
 from repository.interfaces import TaskRepository, LogRepository, ReferencesRepository, SettingsRepository
-from domain.references import ReferenceType
+from repository.unit_of_work import UnitOfWork
+from domain.references import ReferenceType, ReferenceIndex
+from domain.settings import Settings
+
+
+def encode_cursor(task: Task) -> str:
+    """Курсор страницы: ключ (позиция, ID) последнего задания в base64url"""
+    return base64.urlsafe_b64encode(f"{task.position}:{task.id}".encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """Разбирает курсор страницы в ключ (позиция, ID)"""
+    try:
+        position, task_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split(":", 1)
+        return int(position), task_id
+    except (ValueError, binascii.Error, UnicodeError):
+        raise ValueError(f"Некорректный курсор: {cursor}")
 
 
 class TaskService:
@@ -16,12 +34,15 @@ class TaskService:
         task_repo: TaskRepository,
         log_repo: LogRepository,
         ref_repo: ReferencesRepository,
-        settings_repo: SettingsRepository
+        settings_repo: SettingsRepository,
+        unit_of_work: Optional[Callable[[], UnitOfWork]] = None
     ):
         self.task_repo = task_repo
         self.log_repo = log_repo
         self.ref_repo = ref_repo
         self.settings_repo = settings_repo
+        # Фабрика единиц работы (DataManager.unit_of_work): изменение задания и его лог пишутся вместе
+        self.unit_of_work = unit_of_work
     
     def create_task(self, task: Task) -> None:
         """Создает новое задание"""
@@ -33,19 +54,16 @@ class TaskService:
         
         # Устанавливаем значения по умолчанию если нужно
         if task.count_try == 0 or task.delay_try == 0:
-            settings = self.settings_repo.get()
-            if task.count_try == 0:
-                task.count_try = settings.default_execution_attempts
-            if task.delay_try == 0:
-                task.delay_try = settings.default_delay_try
+            self._apply_defaults(task, self.settings_repo.get_snapshot())
         
         # Сохраняем
-        self.task_repo.save(task)
-        
-        self._log_user_action(
-            f"Создано новое задание: {task.type_task}",
-            f"ID: {task.id}, Дата: {task.date}, Слот: {task.time_slot}"
-        )
+        with self._unit_of_work() as uow:
+            uow.save_task(task)
+            self._log_user_action(
+                f"Создано новое задание: {task.type_task}",
+                f"ID: {task.id}, Дата: {task.date}, Слот: {task.time_slot}",
+                uow
+            )
     
     def update_task(self, task: Task) -> None:
         """Обновляет задание"""
@@ -62,12 +80,13 @@ class TaskService:
         task.created_at = existing_task.created_at
         task.updated_at = datetime.now()
         
-        self.task_repo.save(task)
-        
-        self._log_user_action(
-            f"Обновлено задание: {task.type_task}",
-            f"ID: {task.id}"
-        )
+        with self._unit_of_work() as uow:
+            uow.save_task(task)
+            self._log_user_action(
+                f"Обновлено задание: {task.type_task}",
+                f"ID: {task.id}",
+                uow
+            )
     
     def delete_task(self, task_id: str) -> None:
         """Удаляет задание"""
@@ -75,12 +94,17 @@ class TaskService:
         if not task:
             raise ValueError(f"Задание не найдено: {task_id}")
         
-        self.task_repo.delete(task_id)
-        
-        self._log_user_action(
-            f"Удалено задание: {task.type_task}",
-            f"ID: {task_id}"
-        )
+        with self._unit_of_work() as uow:
+            uow.delete_task(task_id)
+            self._log_user_action(
+                f"Удалено задание: {task.type_task}",
+                f"ID: {task_id}",
+                uow
+            )
+    
+    def begin_import(self) -> 'TaskImport':
+        """Начинает пакетный импорт заданий"""
+        return TaskImport(self)
     
     def get_task(self, task_id: str) -> Optional[Task]:
         """Получает задание по ID"""
@@ -97,6 +121,29 @@ class TaskService:
             self._log_error("Ошибка получения списка заданий", e)
             raise ValueError(f"Не удалось получить список заданий: {e}")
     
+    def get_tasks_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        date: Optional[str] = None,
+        in_work: Optional[bool] = None,
+        driver: Optional[str] = None
+    ) -> Tuple[List[Task], Optional[str]]:
+        """Получает страницу заданий и курсор следующей страницы (None, если это последняя)"""
+        after = decode_cursor(cursor) if cursor else None
+        try:
+            # Лишнее задание показывает, есть ли следующая страница
+            tasks = self.task_repo.get_page(limit + 1, after, status=status, date=date,
+                                            in_work=in_work, driver=driver)
+        except Exception as e:
+            self._log_error("Ошибка получения страницы заданий", e)
+            raise ValueError(f"Не удалось получить список заданий: {e}")
+        
+        if len(tasks) > limit:
+            return tasks[:limit], encode_cursor(tasks[limit - 1])
+        return tasks, None
+    
     def get_active_tasks_in_order(self) -> List[Task]:
         """Получает активные задания в порядке выполнения"""
         try:
@@ -114,26 +161,45 @@ class TaskService:
         task.in_work = not task.in_work
         task.updated_at = datetime.now()
         
-        self.task_repo.save(task)
-        
         status = "активировано" if task.in_work else "деактивировано"
-        self._log_user_action(
-            f"Задание {status}",
-            f"ID: {task_id}, Тип: {task.type_task}"
-        )
+        with self._unit_of_work() as uow:
+            uow.save_task(task)
+            self._log_user_action(
+                f"Задание {status}",
+                f"ID: {task_id}, Тип: {task.type_task}",
+                uow
+            )
     
     def reorder_tasks(self, task_positions: Dict[str, int]) -> None:
         """Изменяет порядок заданий"""
         try:
-            self.task_repo.update_positions(task_positions)
-            self._log_user_action(
-                "Изменен порядок выполнения заданий",
-                f"Обновлено позиций: {len(task_positions)}"
-            )
+            with self._unit_of_work() as uow:
+                uow.update_positions(task_positions)
+                self._log_user_action(
+                    "Изменен порядок выполнения заданий",
+                    f"Обновлено позиций: {len(task_positions)}",
+                    uow
+                )
         except Exception as e:
             self._log_error("Ошибка изменения порядка заданий", e)
             raise ValueError(f"Не удалось изменить порядок заданий: {e}")
     
+    def move_task(self, task_id: str, before_id: Optional[str] = None) -> Task:
+        """Перемещает задание перед другим заданием (в конец списка, если before_id не указан)"""
+        try:
+            with self._unit_of_work() as uow:
+                uow.move_task(task_id, before_id)
+                self._log_user_action(
+                    "Изменен порядок выполнения заданий",
+                    f"ID: {task_id}, перед: {before_id or 'в конец'}",
+                    uow
+                )
+        except Exception as e:
+            self._log_error("Ошибка перемещения задания", e)
+            raise ValueError(f"Не удалось переместить задание: {e}")
+        
+        return self.task_repo.get_by_id(task_id)
+    
     def get_tasks_by_status(self, status: str) -> List[Task]:
         """Получает задания по статусу"""
         try:
@@ -149,42 +215,51 @@ class TaskService:
             self._log_info("Нет активных заданий для выполнения", "")
             return []
         
+        # Все ожидающие задания переводим в работу одной записью хранилища вместе с логом
+        now = datetime.now()
+        uow = self._unit_of_work()
+        updated = 0
         for task in active_tasks:
             if task.status == TaskStatus.WAITING:
                 task.status = TaskStatus.IN_WORK
-                task.updated_at = datetime.now()
-                
-                try:
-                    self.task_repo.save(task)
-                except Exception as e:
-                    self._log_error(f"Ошибка обновления статуса задания {task.id}", e)
-                    continue
+                task.updated_at = now
+                uow.update_task_fields(task.id, {"status": task.status, "updated_at": now})
+                updated += 1
         
         self._log_user_action(
             "Запущено выполнение заданий",
-            f"Активных заданий: {len(active_tasks)}"
+            f"Активных заданий: {len(active_tasks)}",
+            uow
         )
         
+        try:
+            uow.commit()
+        except Exception as e:
+            self._log_error(f"Ошибка обновления статуса заданий ({updated} шт.)", e)
+            raise ValueError(f"Не удалось запустить выполнение заданий: {e}")
+        
         return active_tasks
     
     def stop_task_execution(self) -> None:
         """Останавливает выполнение заданий"""
         working_tasks = self.get_tasks_by_status(TaskStatus.IN_WORK)
         
+        now = datetime.now()
+        uow = self._unit_of_work()
         for task in working_tasks:
-            task.status = TaskStatus.WAITING
-            task.updated_at = datetime.now()
-            
-            try:
-                self.task_repo.save(task)
-            except Exception as e:
-                self._log_error(f"Ошибка остановки задания {task.id}", e)
-                continue
+            uow.update_task_fields(task.id, {"status": TaskStatus.WAITING, "updated_at": now})
         
         self._log_user_action(
             "Остановлено выполнение заданий",
-            f"Остановлено заданий: {len(working_tasks)}"
+            f"Остановлено заданий: {len(working_tasks)}",
+            uow
         )
+        
+        try:
+            uow.commit()
+        except Exception as e:
+            self._log_error(f"Ошибка остановки заданий ({len(working_tasks)} шт.)", e)
+            raise ValueError(f"Не удалось остановить выполнение заданий: {e}")
     
     def update_task_status(self, task_id: str, status: str) -> None:
         """Обновляет статус задания"""
@@ -196,8 +271,9 @@ class TaskService:
         task.set_status(status)
         
         try:
-            self.task_repo.save(task)
-            self._log_info(f"Статус задания изменен: {old_status} -> {status}", task_id)
+            with self._unit_of_work() as uow:
+                uow.save_task(task)
+                self._log_info(f"Статус задания изменен: {old_status} -> {status}", task_id, uow)
         except Exception as e:
             self._log_error("Ошибка обновления статуса задания", e)
             raise ValueError(f"Не удалось обновить статус задания: {e}")
@@ -211,14 +287,23 @@ class TaskService:
         task.decrement_tries()
         
         try:
-            self.task_repo.save(task)
-            self._log_info(f"Осталось попыток: {task.count_try}", task_id)
+            with self._unit_of_work() as uow:
+                uow.save_task(task)
+                self._log_info(f"Осталось попыток: {task.count_try}", task_id, uow)
         except Exception as e:
             self._log_error("Ошибка обновления количества попыток", e)
             raise ValueError(f"Не удалось обновить количество попыток: {e}")
     
-    def _validate_task(self, task: Task) -> Optional[str]:
-        """Валидирует задание"""
+    @staticmethod
+    def _apply_defaults(task: Task, settings: Settings) -> None:
+        """Подставляет число попыток и задержку из настроек, если они не заданы"""
+        if task.count_try == 0:
+            task.count_try = settings.default_execution_attempts
+        if task.delay_try == 0:
+            task.delay_try = settings.default_delay_try
+    
+    def _validate_task(self, task: Task, index: Optional[ReferenceIndex] = None) -> Optional[str]:
+        """Валидирует задание (по переданному снимку справочников или по текущему)"""
         if not task:
             return "Задание не может быть пустым"
         
@@ -237,64 +322,124 @@ class TaskService:
         if not task.driver:
             return "Водитель обязателен"
         
-        # Валидация через справочники
-        error = self._validate_reference_value(ReferenceType.CAR_NUMBER, task.num_auto)
+        # Валидация через справочники: один снимок на все проверки
+        if index is None:
+            try:
+                index = self.ref_repo.get_index()
+            except Exception as e:
+                return f"Ошибка получения справочников: {e}"
+        
+        error = self._validate_reference_value(index, ReferenceType.CAR_NUMBER, task.num_auto)
         if error:
             return f"Неверный номер автомобиля: {error}"
         
-        error = self._validate_reference_value(ReferenceType.DRIVER, task.driver)
+        error = self._validate_reference_value(index, ReferenceType.DRIVER, task.driver)
         if error:
             return f"Неверный водитель: {error}"
         
-        error = self._validate_reference_value(ReferenceType.TIME_SLOT, task.time_slot)
+        error = self._validate_reference_value(index, ReferenceType.TIME_SLOT, task.time_slot)
         if error:
             return f"Неверный временной слот: {error}"
         
-        error = self._validate_reference_value(ReferenceType.OPERATION, task.type_task)
+        error = self._validate_reference_value(index, ReferenceType.OPERATION, task.type_task)
         if error:
             return f"Неверный тип операции: {error}"
         
         if task.status:
-            error = self._validate_reference_value(ReferenceType.STATUS, task.status)
+            error = self._validate_reference_value(index, ReferenceType.STATUS, task.status)
             if error:
                 return f"Неверный статус: {error}"
         
         return None
     
-    def _validate_reference_value(self, ref_type: ReferenceType, value: str) -> Optional[str]:
+    def _validate_reference_value(self, index: ReferenceIndex, ref_type: ReferenceType, value: str) -> Optional[str]:
         """Валидирует значение через справочник"""
-        try:
-            items = self.ref_repo.get_active_items(ref_type)
-        except Exception as e:
-            return f"Ошибка получения справочника {ref_type}: {e}"
+        if index.contains(ref_type, value):
+            return None
         
-        if not items:
+        values = index.get_active_values(ref_type)
+        if not values:
             return f"Справочник {ref_type} пуст, добавьте значения через интерфейс"
         
-        for item in items:
-            if item.value == value:
-                return None
-        
-        available_values = ", ".join([f"'{item.value}'" for item in items])
+        available_values = ", ".join([f"'{v}'" for v in values])
         return f"Значение '{value}' не найдено в справочнике {ref_type}. Доступные значения: {available_values}"
     
-    def _log_user_action(self, message: str, details: str = ""):
-        """Логирует действие пользователя"""
+    def _unit_of_work(self) -> UnitOfWork:
+        """Новая единица работы над заданиями и логами"""
+        if self.unit_of_work is not None:
+            return self.unit_of_work()
+        return UnitOfWork(self.task_repo, self.log_repo)
+    
+    def _log_user_action(self, message: str, details: str = "", uow: Optional[UnitOfWork] = None):
+        """Логирует действие пользователя (в составе единицы работы, если она передана)"""
         entry = create_user_action_log(message, details)
-        self.log_repo.save(entry)
+        self._write_log(entry, uow)
     
-    def _log_info(self, message: str, task_id: str = ""):
-        """Логирует информационное сообщение"""
+    def _log_info(self, message: str, task_id: str = "", uow: Optional[UnitOfWork] = None):
+        """Логирует информационное сообщение (в составе единицы работы, если она передана)"""
         entry = LogEntry(
             level=LogLevel.INFO,
             category=LogCategory.TASK_EXECUTION,
             message=message,
             task_id=task_id
         )
-        self.log_repo.save(entry)
+        self._write_log(entry, uow)
+    
+    def _write_log(self, entry: LogEntry, uow: Optional[UnitOfWork]):
+        """Пишет запись лога сразу или откладывает до commit() единицы работы"""
+        if uow is not None:
+            uow.add_log(entry)
+        else:
+            self.log_repo.save(entry)
     
     def _log_error(self, message: str, error: Exception):
         """Логирует ошибку"""
         entry = create_error_log(LogCategory.TASK_EXECUTION, message, error)
         self.log_repo.save(entry)
 
+
+class TaskImport:
+    """Пакетный импорт заданий
+    
+    Строки проверяются по одному снимку справочников и настроек по мере
+    поступления, а принятые задания записываются в commit() одной единицей
+    работы вместе с одной итоговой записью лога.
+    """
+    
+    def __init__(self, service: TaskService):
+        self.service = service
+        self.index = service.ref_repo.get_index()
+        self.settings = service.settings_repo.get_snapshot()
+        self.rows = 0
+        self.tasks: List[Task] = []
+        self.errors: List[Tuple[int, str]] = []
+    
+    def add(self, line: int, task: Task) -> None:
+        """Проверяет задание из строки line и принимает его или запоминает ошибку"""
+        self.rows += 1
+        error = self.service._validate_task(task, self.index)
+        if error:
+            self.errors.append((line, error))
+            return
+        self.service._apply_defaults(task, self.settings)
+        self.tasks.append(task)
+    
+    def add_error(self, line: int, error: str) -> None:
+        """Запоминает строку, которую не удалось разобрать"""
+        self.rows += 1
+        self.errors.append((line, error))
+    
+    def commit(self) -> List[Task]:
+        """Записывает принятые задания одной записью хранилища и возвращает их"""
+        if not self.rows:
+            return []
+        with self.service._unit_of_work() as uow:
+            for task in self.tasks:
+                uow.save_task(task)
+            self.service._log_user_action(
+                f"Импортировано заданий: {len(self.tasks)}",
+                f"Строк: {self.rows}, с ошибками: {len(self.errors)}",
+                uow
+            )
+        return self.tasks
+
@@ -0,0 +1,28 @@
+"""Общие фикстуры тестов хранилища"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from repository.jsonl_log_repository import JSONLLogRepository
+from repository.sqlite_repository import SQLiteDatabase, SQLiteLogRepository
+
+
+@pytest.fixture
+def jsonl_repo(tmp_path):
+    """Репозиторий логов JSONL во временном каталоге"""
+    repo = JSONLLogRepository(str(tmp_path))
+    repo.initialize()
+    yield repo
+    repo.close()
+
+
+@pytest.fixture
+def sqlite_repo(tmp_path):
+    """Репозиторий логов SQLite во временной базе"""
+    db = SQLiteDatabase(str(tmp_path / "rli.db"))
+    db.initialize()
+    yield SQLiteLogRepository(db)
+    db.close()
@@ -0,0 +1,149 @@
+"""Тесты посуточного JSONL хранилища логов"""
+import json
+import os
+from datetime import datetime, timedelta
+
+from domain.log import LogEntry, LogLevel
+from repository.jsonl_log_repository import JSONLLogRepository
+from repository.log_index import load_segment_index
+
+
+def day_start(days_ago: int) -> datetime:
+    """Начало суток days_ago дней назад"""
+    return datetime.combine((datetime.now() - timedelta(days=days_ago)).date(), datetime.min.time())
+
+
+def entries_for_days(days, per_day=3):
+    """Записи по per_day на каждые сутки из days (дней назад)"""
+    return [
+        LogEntry(message=f"d{days_ago}-{i}", timestamp=day_start(days_ago) + timedelta(hours=i))
+        for days_ago in days for i in range(per_day)
+    ]
+
+
+def messages(entries):
+    return [entry.message for entry in entries]
+
+
+def test_save_and_save_many_split_by_day(jsonl_repo):
+    entries = entries_for_days([2, 1, 0])
+    jsonl_repo.save(entries[0])
+    jsonl_repo.save_many(entries[1:])
+
+    assert messages(jsonl_repo.get_all()) == messages(entries)
+    assert jsonl_repo.get_segments() == sorted({e.timestamp.date().isoformat() for e in entries})
+    assert messages(jsonl_repo.get_latest(2)) == messages(entries[-2:])
+
+
+def test_index_queries(jsonl_repo):
+    jsonl_repo.save_many([
+        LogEntry(message="a", level=LogLevel.ERROR, task_id="t1"),
+        LogEntry(message="b", user_action=True, task_id="t2"),
+        LogEntry(message="c", task_id="t1"),
+    ])
+    assert messages(jsonl_repo.get_by_level(LogLevel.ERROR)) == ["a"]
+    assert messages(jsonl_repo.get_user_actions()) == ["b"]
+    assert messages(jsonl_repo.get_task_logs("t1")) == ["a", "c"]
+
+
+def test_entries_visible_to_other_instance(tmp_path, jsonl_repo):
+    other = JSONLLogRepository(str(tmp_path))
+    other.initialize()
+    try:
+        jsonl_repo.save(LogEntry(message="first"))
+        assert messages(other.get_all()) == ["first"]
+        other.save(LogEntry(message="second"))
+        assert messages(jsonl_repo.get_all()) == ["first", "second"]
+    finally:
+        other.close()
+
+
+def test_index_file_stays_consistent_after_rebuild_by_other_instance(tmp_path, jsonl_repo):
+    jsonl_repo.save(LogEntry(message="a1"))
+    day = jsonl_repo.get_segments()[-1]
+    other = JSONLLogRepository(str(tmp_path))
+    other.initialize()
+    try:
+        # Поврежденный индекс перестраивается другим экземпляром
+        with open(jsonl_repo._index_path(day), 'wb') as f:
+            f.write(b"garbage\n")
+        other._indexes.pop(day, None)
+        other._index(day)
+
+        jsonl_repo.save(LogEntry(message="a2"))
+        index, rebuilt = load_segment_index(jsonl_repo._segment_path(day), jsonl_repo._index_path(day))
+        assert not rebuilt
+        assert sum(len(offsets) for offsets in index.by_level.values()) == 2
+    finally:
+        other.close()
+
+
+def test_migrate_legacy_files(tmp_path):
+    legacy = entries_for_days([1], per_day=2)
+    jsonl = entries_for_days([0], per_day=2)
+    with open(tmp_path / "logs.json", 'w', encoding='utf-8') as f:
+        json.dump([entry.to_dict() for entry in legacy], f)
+    with open(tmp_path / "logs.jsonl", 'w', encoding='utf-8') as f:
+        for entry in jsonl:
+            f.write(json.dumps(entry.to_dict()) + "\n")
+
+    repo = JSONLLogRepository(str(tmp_path))
+    repo.initialize()
+    try:
+        assert messages(repo.get_all()) == messages(legacy + jsonl)
+        assert not os.path.exists(tmp_path / "logs.json")
+        assert os.path.exists(tmp_path / "logs.json.migrated")
+        assert os.path.exists(tmp_path / "logs.jsonl.migrated")
+        # Повторный запуск ничего не переносит
+        assert repo.migrate_legacy_logs() == 0
+    finally:
+        repo.close()
+
+
+def test_interrupted_migration_does_not_duplicate(tmp_path):
+    entries = entries_for_days([0], per_day=5)
+    repo = JSONLLogRepository(str(tmp_path))
+    repo.initialize()
+    # Сбой между дозаписью и переименованием: часть записей уже в сегментах
+    repo.save_many(entries[:3])
+    repo.close()
+    with open(tmp_path / "logs.json", 'w', encoding='utf-8') as f:
+        json.dump([entry.to_dict() for entry in entries], f)
+
+    repo = JSONLLogRepository(str(tmp_path))
+    repo.initialize()
+    try:
+        assert messages(repo.get_all()) == messages(entries)
+        assert os.path.exists(tmp_path / "logs.json.migrated")
+    finally:
+        repo.close()
+
+
+def test_retention_drops_whole_days(jsonl_repo):
+    jsonl_repo.save_many(entries_for_days([5, 4, 3, 2, 0]))
+    jsonl_repo.delete_old_logs(3)
+
+    kept = jsonl_repo.get_all()
+    assert messages(kept) == messages(entries_for_days([3, 2, 0]))
+    assert jsonl_repo.get_segments()[0] == day_start(3).date().isoformat()
+
+
+def test_cursor_reads_only_new_entries(jsonl_repo):
+    jsonl_repo.save_many(entries_for_days([1]))
+    cursor = jsonl_repo.get_cursor()
+    assert jsonl_repo.get_since(cursor, 100) == ([], cursor)
+
+    new = entries_for_days([1, 0], per_day=2)
+    jsonl_repo.save_many(new)
+    read, cursor = jsonl_repo.get_since(cursor, 3)
+    assert messages(read) == messages(new[:3])
+    read, cursor = jsonl_repo.get_since(cursor, 100)
+    assert messages(read) == messages(new[3:])
+    assert jsonl_repo.get_since(cursor, 100)[0] == []
+
+
+def test_cursor_from_start(jsonl_repo):
+    entries = entries_for_days([2, 0])
+    jsonl_repo.save_many(entries)
+    read, _ = jsonl_repo.get_since(":0", 100)
+    assert messages(read) == messages(entries)
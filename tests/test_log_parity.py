@@ -0,0 +1,82 @@
+"""Одинаковое поведение поиска, курсоров и хранения логов в JSONL и SQLite"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from domain.log import LogEntry
+
+
+BASE = datetime.now().replace(microsecond=0) - timedelta(hours=1)
+
+ENTRIES = [
+    LogEntry(message="Контейнер MSKU1234567 принят", timestamp=BASE),
+    LogEntry(message="Другое", details="Ошибка сети: Ёлка", timestamp=BASE + timedelta(seconds=1)),
+    LogEntry(message="1234567 отдельно", error="Timeout", timestamp=BASE + timedelta(seconds=2)),
+    LogEntry(message="Водитель Иванов", details="рейс 12", timestamp=BASE + timedelta(seconds=3)),
+]
+
+
+@pytest.fixture(params=["jsonl", "sqlite"])
+def repo(request):
+    """Оба хранилища логов с одинаковыми записями"""
+    repo = request.getfixturevalue(f"{request.param}_repo")
+    repo.save_many(ENTRIES)
+    return repo
+
+
+def messages(entries):
+    return sorted(entry.message for entry in entries)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("1234567", ["1234567 отдельно", "Контейнер MSKU1234567 принят"]),
+    ("msku", ["Контейнер MSKU1234567 принят"]),
+    ("ку12", []),
+    ("сет", ["Другое"]),
+    ("елка", ["Другое"]),
+    ("ЁЛКА", ["Другое"]),
+    ("timeout", ["1234567 отдельно"]),
+    ("12", ["1234567 отдельно", "Водитель Иванов", "Контейнер MSKU1234567 принят"]),
+    ("иванов 12", ["Водитель Иванов"]),
+    ("контейнер 4567", ["Контейнер MSKU1234567 принят"]),
+    ("xyz", []),
+])
+def test_search(repo, query, expected):
+    assert messages(repo.search(query)) == expected
+
+
+def test_empty_search_returns_all(repo):
+    assert messages(repo.search("  ")) == messages(ENTRIES)
+
+
+def test_get_since_pages_through_new_entries(repo):
+    read, cursor = repo.get_since(repo.get_cursor(), 10)
+    assert read == []
+
+    new = [LogEntry(message=f"new{i}", timestamp=BASE + timedelta(minutes=i)) for i in range(5)]
+    repo.save_many(new)
+    pages = []
+    while True:
+        read, cursor = repo.get_since(cursor, 2)
+        if not read:
+            break
+        pages.append([entry.message for entry in read])
+    assert pages == [["new0", "new1"], ["new2", "new3"], ["new4"]]
+
+
+def test_get_since_rejects_bad_cursor(repo):
+    with pytest.raises(ValueError):
+        repo.get_since("not-a-cursor", 10)
+
+
+def test_retention_keeps_the_cutoff_day(repo):
+    cutoff_day = datetime.combine((datetime.now() - timedelta(days=3)).date(), datetime.min.time())
+    repo.save_many([
+        LogEntry(message="old", timestamp=cutoff_day - timedelta(seconds=1)),
+        LogEntry(message="cutoff-start", timestamp=cutoff_day),
+        LogEntry(message="cutoff-end", timestamp=cutoff_day + timedelta(hours=23)),
+    ])
+    repo.delete_old_logs(3)
+    kept = messages(repo.get_all())
+    assert "old" not in kept
+    assert "cutoff-start" in kept and "cutoff-end" in kept
@@ -0,0 +1,138 @@
+"""Тесты фоновой записи логов при сбоях хранилища"""
+import time
+
+import pytest
+
+from domain.log import LogEntry
+from repository import log_writer
+from repository.interfaces import LogRepository
+from repository.log_writer import BackgroundLogWriter
+
+
+class FlakyRepository(LogRepository):
+    """Репозиторий в памяти: отклоняет записи с сообщением "bad" и все записи, пока down"""
+
+    def __init__(self):
+        self.entries = []
+        self.down = False
+
+    def _check(self, entry):
+        if self.down or entry.message == "bad":
+            raise OSError("write failed")
+
+    def save(self, entry):
+        self._check(entry)
+        self.entries.append(entry)
+
+    def save_many(self, entries):
+        for entry in entries:
+            self._check(entry)
+        self.entries.extend(entries)
+
+    def get_all(self):
+        return list(self.entries)
+
+    def get_by_date_range(self, from_date, to_date):
+        return []
+
+    def get_by_level(self, level):
+        return []
+
+    def get_by_category(self, category):
+        return []
+
+    def get_user_actions(self):
+        return []
+
+    def get_task_logs(self, task_id):
+        return []
+
+    def delete_old_logs(self, days_to_keep):
+        pass
+
+    def get_latest(self, count):
+        return self.entries[-count:]
+
+    def search(self, query):
+        return []
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    """Короткие паузы между повторами"""
+    monkeypatch.setattr(log_writer, "RETRY_DELAY", 0.001)
+    monkeypatch.setattr(log_writer, "PENDING_RETRY_MAX", 0.05)
+
+
+@pytest.fixture
+def store():
+    return FlakyRepository()
+
+
+@pytest.fixture
+def writer(store):
+    writer = BackgroundLogWriter(store, flush_interval_ms=10)
+    writer.start()
+    yield writer
+    writer.close()
+
+
+def wait_for(condition, timeout=5.0):
+    """Ждет выполнения условия"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "условие не выполнилось"
+        time.sleep(0.01)
+
+
+def test_entries_are_written_in_batches(writer, store):
+    writer.save_many([LogEntry(message=f"m{i}") for i in range(50)])
+    writer.flush()
+    assert [entry.message for entry in store.entries] == [f"m{i}" for i in range(50)]
+
+
+def test_permanently_failing_entry_is_dropped(writer, store, capsys):
+    writer.save_many([LogEntry(message="ok1"), LogEntry(message="bad"), LogEntry(message="ok2")])
+    writer.flush()
+
+    assert [entry.message for entry in store.entries] == ["ok1", "ok2"]
+    assert writer.dropped == 1
+    assert '"message":"bad"' in capsys.readouterr().err.replace(" ", "")
+
+    # Отброшенная запись не задерживает следующие пачки
+    writer.save(LogEntry(message="ok3"))
+    writer.flush()
+    assert store.entries[-1].message == "ok3"
+
+
+def test_unavailable_store_keeps_entries_until_recovery(writer, store):
+    store.down = True
+    writer.save(LogEntry(message="later"))
+    with pytest.raises(OSError):
+        writer.flush()
+
+    store.down = False
+    wait_for(lambda: store.entries)
+    writer.flush()
+    assert [entry.message for entry in store.entries] == ["later"]
+    assert writer.dropped == 0
+
+
+def test_pending_entries_are_dropped_after_max_rounds(writer, store):
+    store.down = True
+    writer.save(LogEntry(message="lost"))
+    wait_for(lambda: writer.dropped == 1)
+    writer.flush()
+    assert store.entries == []
+
+
+def test_close_writes_queue_synchronously(store):
+    writer = BackgroundLogWriter(store, flush_interval_ms=10)
+    writer.start()
+    writer.save(LogEntry(message="queued"))
+    writer.close()
+    assert [entry.message for entry in store.entries] == ["queued"]
+
+    # После закрытия запись идет напрямую во внутренний репозиторий
+    writer.save(LogEntry(message="direct"))
+    assert store.entries[-1].message == "direct"
@@ -0,0 +1,71 @@
+"""Тесты порядка заданий: ранги с промежутками и перемещение"""
+import pytest
+
+from repository.ranking import POSITION_GAP, plan_move, rank_between, rebalance
+
+
+def order_of(positions):
+    """Пары (позиция, ID), отсортированные по позиции"""
+    return sorted((position, task_id) for task_id, position in positions.items())
+
+
+def apply(positions, changes):
+    """Применяет новые позиции и возвращает ID в новом порядке"""
+    positions = {**positions, **changes}
+    return [task_id for _, task_id in order_of(positions)]
+
+
+def test_rank_between():
+    assert rank_between(None, None) == POSITION_GAP
+    assert rank_between(None, 1024) == 0
+    assert rank_between(1024, None) == 2048
+    assert rank_between(1024, 2048) == 1536
+    assert rank_between(5, 6) is None
+
+
+def test_rebalance():
+    assert rebalance(["a", "b", "c"]) == {"a": POSITION_GAP, "b": 2 * POSITION_GAP, "c": 3 * POSITION_GAP}
+
+
+def test_plan_move_changes_only_moved_task():
+    positions = rebalance(["a", "b", "c", "d"])
+    changes = plan_move(order_of(positions), "d", "b")
+    assert list(changes) == ["d"]
+    assert apply(positions, changes) == ["a", "d", "b", "c"]
+
+
+def test_plan_move_to_start_and_end():
+    positions = rebalance(["a", "b", "c"])
+    assert apply(positions, plan_move(order_of(positions), "c", "a")) == ["c", "a", "b"]
+    assert apply(positions, plan_move(order_of(positions), "a", None)) == ["b", "c", "a"]
+
+
+def test_plan_move_before_itself_is_noop():
+    positions = rebalance(["a", "b"])
+    assert plan_move(order_of(positions), "a", "a") == {}
+
+
+def test_plan_move_rebalances_when_gap_is_exhausted():
+    positions = {"a": 10, "b": 11, "c": 12}
+    changes = plan_move(order_of(positions), "c", "b")
+    assert changes == {"a": POSITION_GAP, "c": 2 * POSITION_GAP, "b": 3 * POSITION_GAP}
+
+
+def test_repeated_moves_into_same_gap_keep_order():
+    positions = rebalance(["a", "b"])
+    expected = ["a", "b"]
+    for i in range(20):
+        task_id = f"n{i}"
+        positions[task_id] = 10 ** 6 + i
+        changes = plan_move(order_of(positions), task_id, "b")
+        positions.update(changes)
+        expected.insert(len(expected) - 1, task_id)
+        assert apply(positions, {}) == expected
+
+
+def test_plan_move_unknown_task():
+    positions = rebalance(["a"])
+    with pytest.raises(ValueError):
+        plan_move(order_of(positions), "x")
+    with pytest.raises(ValueError):
+        plan_move(order_of(positions), "a", "x")
@@ -50,10 +50,14 @@ pip install -r requirements.txt --quiet || {
     exit 1
 }
 
-echo "[5/6] Проверка установки uvicorn..."
+echo "[5/6] Проверка установки uvicorn и сборка статики..."
 pip show uvicorn >/dev/null 2>&1 || {
     echo "⚠️  Предупреждение: uvicorn не найден, но должен быть в requirements.txt"
 }
+python -m web.assets || {
+    echo "❌ Ошибка: не удалось собрать статические файлы"
+    exit 1
+}
 
 echo "[6/6] Обновление завершено успешно!"
 echo ""
@@ -0,0 +1,133 @@
+"""Сборка статических файлов: имена с хешем содержимого и заранее сжатые копии
+
+python -m web.assets копирует файлы web/static в web/static/dist под
+именами вида app.<хеш>.js, рядом кладет сжатые копии (.gz и, если
+установлен brotli, .br) и пишет manifest.json: исходное имя -> путь в
+dist. Шаблон получает адреса через static_url(), поэтому после сборки
+страница ссылается на файлы с хешем. Содержимое такого файла никогда не
+меняется, и браузер может кэшировать его навсегда (immutable). Без
+сборки static_url() отдает исходные файлы, как раньше.
+"""
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+from repository.atomic import atomic_write_bytes
+from .compression import available_encodings, choose_encoding, compress
+
+
+STATIC_DIR = Path(__file__).parent / "static"
+DIST_DIR = "dist"
+MANIFEST = "manifest.json"
+
+# Расширения сжатых копий по кодировкам
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Файлы с хешем в имени не меняются: кэшируются на год без проверки
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+# Остальная статика проверяется при каждом использовании (ETag/Last-Modified)
+REVALIDATE_CACHE = "no-cache"
+
+
+def build(static_dir: Path = STATIC_DIR) -> Dict[str, str]:
+    """Собирает статику в static_dir/dist и возвращает манифест"""
+    dist_dir = static_dir / DIST_DIR
+    dist_dir.mkdir(exist_ok=True)
+
+    manifest = {}
+    built = {MANIFEST}
+    for path in sorted(static_dir.iterdir()):
+        if not path.is_file():
+            continue
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        name = f"{path.stem}.{digest}{path.suffix}"
+
+        (dist_dir / name).write_bytes(data)
+        built.add(name)
+        for encoding in available_encodings():
+            compressed = compress(data, encoding, best=True)
+            # Копия нужна, только если она меньше исходного файла
+            if len(compressed) < len(data):
+                (dist_dir / (name + SUFFIXES[encoding])).write_bytes(compressed)
+                built.add(name + SUFFIXES[encoding])
+        manifest[path.name] = f"{DIST_DIR}/{name}"
+
+    # Файлы предыдущих сборок больше не нужны
+    for path in dist_dir.iterdir():
+        if path.is_file() and path.name not in built:
+            path.unlink()
+
+    atomic_write_bytes(str(dist_dir / MANIFEST), json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def load_manifest(static_dir: Path = STATIC_DIR) -> Dict[str, str]:
+    """Читает манифест сборки; пустой словарь, если статика не собиралась"""
+    try:
+        with open(static_dir / DIST_DIR / MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Ошибка чтения манифеста статики: {e}")
+        return {}
+
+
+def static_url_factory(manifest: Dict[str, str], prefix: str = "./static/"):
+    """Функция для шаблонов: адрес статического файла с учетом сборки"""
+    def static_url(name: str) -> str:
+        return prefix + manifest.get(name, name)
+    return static_url
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """Статика с отдачей заранее сжатых копий и долгим кэшированием собранных файлов"""
+
+    async def get_response(self, path: str, scope) -> Response:
+        immutable = Path(path).parts[:1] == (DIST_DIR,)
+        if immutable:
+            response = await self._get_precompressed(path, scope)
+            if response is not None:
+                return response
+
+        response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE
+        return response
+
+    async def _get_precompressed(self, path: str, scope) -> Optional[Response]:
+        """Сжатая копия файла, если клиент принимает ее кодировку и копия есть; иначе None"""
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        # Копии .br отдаются и без пакета brotli: он нужен только при сборке
+        for encoding, suffix in SUFFIXES.items():
+            if choose_encoding(accept_encoding, [encoding]) is None:
+                continue
+            _, stat_result = self.lookup_path(path + suffix)
+            if stat_result is None:
+                continue
+            response = await super().get_response(path + suffix, scope)
+            if response.status_code == 200:
+                response.headers["Content-Encoding"] = encoding
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+        return None
+
+
+def main():
+    """Точка входа: python -m web.assets"""
+    manifest = build()
+    for name, built_name in manifest.items():
+        print(f"[OK] {name} -> {built_name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
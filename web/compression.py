@@ -0,0 +1,129 @@
+"""Сжатие ответов gzip/brotli
+
+Сжимаются ответы текстовых типов (JSON, HTML, JS, CSS) не меньше
+MINIMUM_SIZE байт, отданные одним куском. Потоковые ответы (поток
+событий, файлы) проходят без изменений: поток событий нельзя
+буферизовать, а статические файлы сжаты заранее при сборке (web/assets.py).
+Brotli используется, если установлен пакет brotli, иначе только gzip.
+"""
+import asyncio
+import gzip
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # необязательная зависимость
+    brotli = None
+
+
+# Ответы меньше этого размера не сжимаются: выигрыш меньше накладных расходов
+MINIMUM_SIZE = 1024
+
+# Ответы больше этого размера сжимаются в пуле потоков, чтобы не держать цикл событий
+THREAD_SIZE = 256 * 1024
+
+# Уровни сжатия для ответов API (быстро) и для сборки статики (максимально)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+GZIP_BEST_LEVEL = 9
+BROTLI_BEST_QUALITY = 11
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/javascript", "text/javascript",
+    "text/html", "text/css", "text/plain", "image/svg+xml"
+)
+
+
+def available_encodings() -> List[str]:
+    """Доступные кодировки в порядке предпочтения"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    """Сжимает данные; best - максимальная степень сжатия для сборки статики"""
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=BROTLI_BEST_QUALITY if best else BROTLI_QUALITY)
+    if encoding == "gzip":
+        # mtime=0: одинаковые данные всегда дают одинаковый архив
+        return gzip.compress(data, compresslevel=GZIP_BEST_LEVEL if best else GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Неподдерживаемая кодировка: {encoding}")
+
+
+def choose_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """Выбирает кодировку из encodings (в порядке предпочтения сервера), которую принимает клиент"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    """Имеет ли смысл сжимать ответ этого типа"""
+    return content_type.split(";")[0].strip().lower() in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    """ASGI middleware: сжимает ответы gzip или brotli по Accept-Encoding клиента"""
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), available_encodings())
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Заголовки отправляются вместе с первым куском тела, когда известно, сжимать ли его
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            start_message, start = start, None
+            headers = MutableHeaders(scope=start_message)
+            if is_compressible(headers.get("content-type", "")) and "content-encoding" not in headers:
+                headers.add_vary_header("Accept-Encoding")
+                body = message.get("body", b"")
+                if not message.get("more_body", False) and len(body) >= self.minimum_size:
+                    if len(body) >= THREAD_SIZE:
+                        body = await asyncio.to_thread(compress, body, encoding)
+                    else:
+                        body = compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    # Сжатое тело не совпадает побайтно с исходным: ETag становится слабым
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        headers["ETag"] = "W/" + etag
+                    message = {**message, "body": body}
+            await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,146 @@
+"""Рассылка событий хранилища подписчикам потока /api/stream (Server-Sent Events)"""
+import asyncio
+from typing import Any, Dict, Optional, Set, Tuple
+
+from repository import codec
+from repository.interfaces import DataManager
+
+
+# Интервал проверки версий хранилища, секунды
+POLL_INTERVAL = 0.5
+
+# Размер очереди событий одного подключения
+QUEUE_SIZE = 100
+
+# Максимум новых записей лога в одном событии; если записей больше, клиенты получают resync
+LOG_BATCH = 1000
+
+# Интервал комментария-пинга, чтобы прокси не закрывали простаивающее соединение
+HEARTBEAT_INTERVAL = 15.0
+
+
+class EventBroker:
+    """Следит за версиями хранилища и рассылает изменения подписчикам
+
+    Изменения определяются по version() репозиториев, поэтому в поток
+    попадают и записи других воркеров. Проверка версий - одно чтение
+    счетчика; данные читаются один раз на изменение, а не на подписчика.
+
+    У каждого подключения своя ограниченная очередь. Если клиент не
+    успевает забирать события и очередь переполнена, она очищается и
+    клиенту отправляется событие resync - он заново загружает данные.
+    """
+
+    def __init__(self, data_manager: DataManager, poll_interval: float = POLL_INTERVAL,
+                 queue_size: int = QUEUE_SIZE):
+        self.data_manager = data_manager
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._watcher: Optional[asyncio.Task] = None
+        self._tasks_version = None
+        self._logs_version = None
+        self._tasks: Dict[str, dict] = {}
+        self._log_cursor: Optional[str] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        """Регистрирует подписчика и при необходимости запускает наблюдение за хранилищем"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Отписывает подписчика; наблюдение останавливается вместе с последним"""
+        self._subscribers.discard(queue)
+
+    async def close(self) -> None:
+        """Завершает потоки всех подписчиков и наблюдение"""
+        for queue in list(self._subscribers):
+            self._put(queue, None)
+        self._subscribers.clear()
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    def publish(self, event: str, data: Any) -> None:
+        """Отправляет событие всем подписчикам (вызывается в цикле событий)"""
+        message = (event, codec.dumps(data))
+        for queue in list(self._subscribers):
+            self._put(queue, message)
+
+    @staticmethod
+    def encode_event(message: Tuple[str, bytes]) -> bytes:
+        """Кодирует событие в формат text/event-stream"""
+        event, data = message
+        return b"event: " + event.encode('utf-8') + b"\ndata: " + data + b"\n\n"
+
+    def _put(self, queue: asyncio.Queue, message) -> None:
+        """Кладет событие в очередь; при переполнении заменяет ее содержимое на resync"""
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            if message is not None:
+                message = ("resync", b"{}")
+            queue.put_nowait(message)
+
+    async def _watch(self) -> None:
+        """Цикл наблюдения: работает, пока есть подписчики"""
+        tasks_repo = self.data_manager.get_tasks()
+        logs_repo = self.data_manager.get_logs()
+
+        # Начальное состояние - точка отсчета, от нее события не рассылаются
+        self._tasks_version = tasks_repo.version()
+        self._logs_version = logs_repo.version()
+        self._tasks = await asyncio.to_thread(self._task_snapshot)
+        self._log_cursor = await asyncio.to_thread(logs_repo.get_cursor)
+
+        while self._subscribers:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self._check_tasks(tasks_repo)
+                await self._check_logs(logs_repo)
+            except Exception as e:
+                print(f"Ошибка рассылки событий: {e}")
+
+    async def _check_tasks(self, tasks_repo) -> None:
+        """Рассылает изменившиеся и удаленные задания"""
+        version = tasks_repo.version()
+        if version == self._tasks_version:
+            return
+        self._tasks_version = version
+
+        snapshot = await asyncio.to_thread(self._task_snapshot)
+        changed = [data for task_id, data in snapshot.items() if self._tasks.get(task_id) != data]
+        deleted = [task_id for task_id in self._tasks if task_id not in snapshot]
+        self._tasks = snapshot
+        if changed or deleted:
+            self.publish("tasks", {"version": version, "changed": changed, "deleted": deleted})
+
+    async def _check_logs(self, logs_repo) -> None:
+        """Рассылает новые записи лога"""
+        version = logs_repo.version()
+        if version == self._logs_version:
+            return
+        self._logs_version = version
+
+        # Новые записи читаются от курсора по индексу, без сверки с последними записями
+        new, cursor = await asyncio.to_thread(logs_repo.get_since, self._log_cursor, LOG_BATCH)
+        if len(new) >= LOG_BATCH:
+            # Между проверками записано слишком много: клиенты перечитывают логи сами
+            cursor = await asyncio.to_thread(logs_repo.get_cursor)
+            self.publish("resync", {})
+        elif new:
+            self.publish("logs", {"version": version, "cursor": cursor, "entries": [entry.to_dict() for entry in new]})
+        self._log_cursor = cursor
+
+    def _task_snapshot(self) -> Dict[str, dict]:
+        """Текущие задания: ID -> словарь"""
+        return {task.id: task.to_dict() for task in self.data_manager.get_tasks().get_all()}
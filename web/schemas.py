@@ -66,11 +66,36 @@ class TaskResponse(BaseModel):
     position: int
 
 
+class TaskPageResponse(BaseModel):
+    """Модель ответа для страницы заданий"""
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = Field(default=None, description="Курсор следующей страницы; null на последней")
+
+
+class TaskImportError(BaseModel):
+    """Ошибка строки импорта заданий"""
+    row: int = Field(..., description="Номер строки в файле")
+    error: str = Field(..., description="Описание ошибки")
+
+
+class TaskImportResponse(BaseModel):
+    """Модель ответа импорта заданий"""
+    created: int = Field(..., description="Число созданных заданий")
+    task_ids: List[str] = Field(default_factory=list, description="ID созданных заданий в порядке строк")
+    errors: List[TaskImportError] = Field(default_factory=list, description="Строки, не прошедшие проверку")
+
+
 class TaskReorderRequest(BaseModel):
     """Модель для изменения порядка заданий"""
     task_positions: Dict[str, int] = Field(..., description="Словарь ID задания -> позиция")
 
 
+class TaskMoveRequest(BaseModel):
+    """Модель для перемещения задания"""
+    task_id: str = Field(..., description="ID перемещаемого задания")
+    before_id: Optional[str] = Field(default=None, description="ID задания, перед которым поставить (пусто - в конец)")
+
+
 # Модели для настроек
 class SettingsResponse(BaseModel):
     """Модель ответа для настроек"""
@@ -161,11 +186,25 @@ class LogEntryResponse(BaseModel):
     error: str
 
 
+class LogDeltaResponse(BaseModel):
+    """Модель ответа для новых записей лога после курсора"""
+    entries: List[LogEntryResponse]
+    cursor: str = Field(..., description="Курсор для следующего запроса ?since=")
+
+
+class LogBufferStatsResponse(BaseModel):
+    """Модель ответа для статистики буфера последних логов"""
+    capacity: int
+    size: int
+    memory_bytes: int
+
+
 # Модели для автоматизации
 class AutomationStartRequest(BaseModel):
     """Модель для запуска автоматизации"""
     taskIds: List[str] = Field(default_factory=list, description="Список ID заданий")
     taskId: Optional[str] = Field(default=None, description="ID одного задания (для обратной совместимости)")
+    allInWork: bool = Field(default=False, description="Выполнить все задания с отметкой \"В работе\" (выбираются на сервере)")
     parallel: bool = Field(default=False, description="Параллельное выполнение")
     maxConcurrency: int = Field(default=5, description="Максимальная параллельность")
 
@@ -174,6 +213,7 @@ class AutomationResponse(BaseModel):
     """Модель ответа для автоматизации"""
     success: bool
     message: Optional[str] = None
+    task_count: Optional[int] = Field(default=None, description="Число запущенных заданий")
 
 
 # Модели для подключения
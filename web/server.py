@@ -1,24 +1,33 @@
 """FastAPI веб-сервер"""
 from fastapi import FastAPI, HTTPException, Query, Request, Body
-from fastapi.responses import HTMLResponse, JSONResponse, Response
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from jinja2 import Environment, FileSystemLoader
+from contextlib import asynccontextmanager
+import asyncio
 import threading
-from typing import List
+from typing import Dict, List, Optional, Union
 
-from service.task_service import TaskService
+from pydantic import ValidationError
+
+from service.task_service import TaskService, decode_cursor
 from service.automation_service import AutomationService
-from repository.json_repository import JSONDataManager
+from repository.interfaces import DataManager
+from repository import codec
 from domain.task import Task
 from domain.settings import Settings
 from domain.log import LogEntry, LogLevel, LogCategory, create_user_action_log
 from domain.references import ReferenceType
+from .events import EventBroker, HEARTBEAT_INTERVAL
+from .compression import CompressionMiddleware
+from .assets import PrecompressedStaticFiles, load_manifest, static_url_factory
+from .task_import import CSV, NDJSON, detect_format, iter_lines, iter_csv_rows, iter_ndjson_rows
 from .schemas import (
-    TaskCreate, TaskUpdate, TaskResponse, TaskReorderRequest,
+    TaskCreate, TaskUpdate, TaskResponse, TaskPageResponse, TaskReorderRequest, TaskMoveRequest,
+    TaskImportResponse, TaskImportError,
     SettingsResponse, SettingsUpdate,
     ReferencesResponse, ReferenceAddRequest, ReferenceDeleteRequest, ReferenceItemResponse,
-    LogEntryResponse,
+    LogEntryResponse, LogDeltaResponse, LogBufferStatsResponse,
     AutomationStartRequest, AutomationResponse,
     ConnectionTestRequest, ConnectionTestResponse,
     SuccessResponse, ErrorResponse,
@@ -26,6 +35,22 @@ from .schemas import (
 )
 
 
+# Размер страницы списка заданий по умолчанию и максимальный
+TASKS_PAGE_SIZE = 100
+TASKS_MAX_PAGE_SIZE = 1000
+
+# Число последних записей лога в ответе без курсора и максимум записей в ответе с курсором
+LOGS_LATEST_SIZE = 100
+LOGS_MAX_DELTA_SIZE = 1000
+
+# Максимум строк в одном импорте заданий
+TASK_IMPORT_MAX_ROWS = 10000
+
+# Поля задания в строке импорта и обязательные из них
+TASK_IMPORT_FIELDS = set(TaskCreate.model_fields)
+TASK_IMPORT_REQUIRED = {name for name, field in TaskCreate.model_fields.items() if field.is_required()}
+
+
 class WebServer:
     """FastAPI веб-сервер"""
     
@@ -33,11 +58,19 @@ class WebServer:
         self,
         task_service: TaskService,
         automation_service: AutomationService,
-        data_manager: JSONDataManager
+        data_manager: DataManager
     ):
         self.task_service = task_service
         self.automation_service = automation_service
         self.data_manager = data_manager
+        self.events = EventBroker(data_manager)
+        
+        @asynccontextmanager
+        async def lifespan(app: FastAPI):
+            """Жизненный цикл приложения: при остановке закрываем потоки событий и сбрасываем логи на диск"""
+            yield
+            await self.events.close()
+            self.data_manager.close()
         
         # Создаем FastAPI приложение
         self.app = FastAPI(
@@ -45,7 +78,8 @@ class WebServer:
             description="API для автоматизации регистрации ввозы/вывоза контейнеров",
             version="2.0.0",
             docs_url="/docs",
-            redoc_url="/redoc"
+            redoc_url="/redoc",
+            lifespan=lifespan
         )
         
         # CORS
@@ -57,6 +91,9 @@ class WebServer:
             allow_headers=["*"],
         )
         
+        # Сжатие JSON и HTML ответов (gzip, brotli при наличии пакета)
+        self.app.add_middleware(CompressionMiddleware)
+        
         # Статические файлы и шаблоны
         from pathlib import Path
         import os
@@ -67,11 +104,13 @@ class WebServer:
         templates_dir = base_dir / "web" / "templates"
         
         if static_dir.exists():
-            self.app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+            self.app.mount("/static", PrecompressedStaticFiles(directory=str(static_dir)), name="static")
         
         # Инициализируем Jinja2 окружение
         if templates_dir.exists():
             self.templates_env = Environment(loader=FileSystemLoader(str(templates_dir)))
+            # Адреса статики из манифеста сборки (python -m web.assets), без сборки - исходные файлы
+            self.templates_env.globals["static_url"] = static_url_factory(load_manifest(static_dir))
         else:
             self.templates_env = None
         
@@ -143,12 +182,44 @@ class WebServer:
                 raise HTTPException(status_code=500, detail=str(e))
         
         # API заданий
-        @self.app.get("/api/tasks", response_model=List[TaskResponse])
-        async def get_tasks():
-            """Получает список заданий"""
+        @self.app.get("/api/tasks", response_model=TaskPageResponse)
+        async def get_tasks(
+            request: Request,
+            limit: int = Query(TASKS_PAGE_SIZE, ge=1, le=TASKS_MAX_PAGE_SIZE, description="Размер страницы"),
+            cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+            status: Optional[str] = Query(None, description="Фильтр по статусу"),
+            date: Optional[str] = Query(None, description="Фильтр по дате"),
+            in_work: Optional[bool] = Query(None, description="Фильтр по признаку \"в работе\""),
+            driver: Optional[str] = Query(None, description="Фильтр по водителю"),
+            all_tasks: bool = Query(False, alias="all", description="Вернуть все задания списком без пагинации (прежний формат)")
+        ):
+            """Получает страницу заданий в порядке выполнения"""
+            etag = self._etag("tasks", self.data_manager.get_tasks())
+            not_modified = self._not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+            
+            if all_tasks:
+                try:
+                    tasks = self.task_service.get_all_tasks()
+                    # Модели кодируются сразу в байты, минуя повторную валидацию pydantic
+                    return Response(content=codec.encode_tasks(tasks), media_type="application/json",
+                                    headers=self._cache_headers(etag))
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=str(e))
+            
+            if cursor:
+                try:
+                    decode_cursor(cursor)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+            
             try:
-                tasks = self.task_service.get_all_tasks()
-                return [TaskResponse(**task.to_dict()) for task in tasks]
+                tasks, next_cursor = self.task_service.get_tasks_page(
+                    limit, cursor, status=status, date=date, in_work=in_work, driver=driver
+                )
+                content = b'{"items":' + codec.encode_tasks(tasks) + b',"next_cursor":' + codec.dumps(next_cursor) + b'}'
+                return Response(content=content, media_type="application/json", headers=self._cache_headers(etag))
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
         
@@ -156,28 +227,69 @@ class WebServer:
         async def create_task(task_data: TaskCreate):
             """Создает новое задание"""
             try:
-                task = Task(
-                    type_task=task_data.type_task,
-                    status=task_data.status,
-                    date=task_data.date,
-                    time_slot=task_data.time_slot,
-                    num_auto=task_data.num_auto,
-                    driver=task_data.driver,
-                    place=task_data.place,
-                    index_container=task_data.index_container,
-                    number_container=task_data.number_container,
-                    release_order=task_data.release_order,
-                    contract_terminal=task_data.contract_terminal,
-                    time_cancel=task_data.time_cancel,
-                    count_try=task_data.count_try,
-                    delay_try=task_data.delay_try
-                )
-                
+                task = self._task_from_create(task_data)
                 self.task_service.create_task(task)
                 return SuccessResponse(message=f"Задание создано с ID: {task.id}")
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
         
+        @self.app.post("/api/tasks/import", response_model=TaskImportResponse)
+        async def import_tasks(
+            request: Request,
+            format: Optional[str] = Query(None, description="csv или ndjson; по умолчанию по Content-Type")
+        ):
+            """Импортирует задания из CSV или NDJSON; принятые строки записываются одной записью"""
+            import_format = format or detect_format(request.headers.get("content-type", ""))
+            if import_format not in (CSV, NDJSON):
+                raise HTTPException(
+                    status_code=415,
+                    detail="Ожидается CSV (text/csv) или NDJSON (application/x-ndjson)"
+                )
+            
+            try:
+                batch = self.task_service.begin_import()
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+            
+            lines = iter_lines(request.stream())
+            if import_format == CSV:
+                rows = iter_csv_rows(lines, TASK_IMPORT_FIELDS, TASK_IMPORT_REQUIRED)
+            else:
+                rows = iter_ndjson_rows(lines)
+            
+            try:
+                async for line, data, error in rows:
+                    if batch.rows >= TASK_IMPORT_MAX_ROWS:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"Слишком много строк: не больше {TASK_IMPORT_MAX_ROWS} за один импорт"
+                        )
+                    if error is None:
+                        try:
+                            task = self._task_from_create(TaskCreate.model_validate(data))
+                        except ValidationError as e:
+                            error = "; ".join(
+                                f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+                                for item in e.errors()
+                            )
+                    if error is None:
+                        batch.add(line, task)
+                    else:
+                        batch.add_error(line, error)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            
+            try:
+                created = batch.commit()
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Не удалось сохранить задания: {e}")
+            
+            return TaskImportResponse(
+                created=len(created),
+                task_ids=[task.id for task in created],
+                errors=[TaskImportError(row=line, error=error) for line, error in batch.errors]
+            )
+        
         @self.app.put("/api/tasks/update", response_model=SuccessResponse)
         async def update_task(task_data: TaskUpdate):
             """Обновляет задание"""
@@ -230,12 +342,27 @@ class WebServer:
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
         
+        @self.app.post("/api/tasks/move", response_model=TaskResponse)
+        async def move_task(request_data: TaskMoveRequest):
+            """Перемещает задание перед другим заданием; меняется только его позиция"""
+            try:
+                task = self.task_service.move_task(request_data.task_id, request_data.before_id)
+                return TaskResponse(**task.to_dict())
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
         # API настроек
         @self.app.get("/api/settings", response_model=SettingsResponse)
-        async def get_settings():
+        async def get_settings(request: Request, response: Response):
             """Получает настройки"""
+            etag = self._etag("settings", self.data_manager.get_settings())
+            not_modified = self._not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+            
             try:
-                settings = self.data_manager.get_settings().get()
+                settings = self.data_manager.get_settings().get_snapshot()
+                response.headers.update(self._cache_headers(etag))
                 return SettingsResponse(**settings.to_dict())
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
@@ -257,10 +384,16 @@ class WebServer:
         
         # API справочников
         @self.app.get("/api/references", response_model=ReferencesResponse)
-        async def get_references():
+        async def get_references(request: Request, response: Response):
             """Получает справочники"""
+            etag = self._etag("references", self.data_manager.get_references())
+            not_modified = self._not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+            
             try:
                 references = self.data_manager.get_references().get()
+                response.headers.update(self._cache_headers(etag))
                 ref_dict = references.to_dict()
                 # Преобразуем в нужный формат
                 return ReferencesResponse(
@@ -297,7 +430,7 @@ class WebServer:
                     raise HTTPException(status_code=400, detail="Неизвестный тип справочника")
                 
                 # Валидация
-                references = self.data_manager.get_references().get()
+                references = self.data_manager.get_references().get_index()
                 is_valid, error_msg = references.validate_new_item(
                     ref_type, request_data.value, request_data.description
                 )
@@ -366,12 +499,80 @@ class WebServer:
                 raise HTTPException(status_code=400, detail=str(e))
         
         # API логов
-        @self.app.get("/api/logs", response_model=List[LogEntryResponse])
-        async def get_logs():
-            """Получает логи"""
+        @self.app.get("/api/logs", response_model=Union[List[LogEntryResponse], LogDeltaResponse])
+        async def get_logs(
+            request: Request,
+            since: Optional[str] = Query(None, description="Курсор из предыдущего ответа; пустой - последние записи и курсор"),
+            limit: int = Query(LOGS_MAX_DELTA_SIZE, ge=1, le=LOGS_MAX_DELTA_SIZE, description="Максимум записей после курсора")
+        ):
+            """Получает последние логи; с параметром since - только записи, добавленные после курсора"""
+            logs_repo = self.data_manager.get_logs()
+            etag = self._etag("logs", logs_repo)
+            not_modified = self._not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+            
+            if since is None:
+                try:
+                    logs = logs_repo.get_latest(LOGS_LATEST_SIZE)
+                    return Response(content=codec.encode_logs(logs), media_type="application/json",
+                                    headers=self._cache_headers(etag))
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=str(e))
+            
+            try:
+                if since:
+                    logs, cursor = logs_repo.get_since(since, limit)
+                else:
+                    # Курсор берется до чтения: запись, попавшая между вызовами, придет еще раз, а не потеряется
+                    cursor = logs_repo.get_cursor()
+                    logs = logs_repo.get_latest(LOGS_LATEST_SIZE)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+            
+            content = b'{"entries":' + codec.encode_logs(logs) + b',"cursor":' + codec.dumps(cursor) + b'}'
+            return Response(content=content, media_type="application/json", headers=self._cache_headers(etag))
+        
+        @self.app.get("/api/stream")
+        async def stream_events(request: Request):
+            """Поток событий (Server-Sent Events): новые записи лога (logs), изменения заданий (tasks)
+            
+            Событие resync означает, что часть событий пропущена и данные нужно перечитать.
+            """
+            queue = self.events.subscribe()
+            
+            async def events():
+                try:
+                    # Браузер переподключится через 3 секунды после обрыва
+                    yield b"retry: 3000\n\n"
+                    while True:
+                        try:
+                            message = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+                        except asyncio.TimeoutError:
+                            if await request.is_disconnected():
+                                break
+                            yield b": ping\n\n"
+                            continue
+                        if message is None:
+                            break
+                        yield EventBroker.encode_event(message)
+                finally:
+                    self.events.unsubscribe(queue)
+            
+            return StreamingResponse(
+                events(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        
+        @self.app.get("/api/logs/stats", response_model=LogBufferStatsResponse)
+        async def get_logs_stats():
+            """Получает статистику буфера последних логов"""
             try:
-                logs = self.data_manager.get_logs().get_latest(100)
-                return [LogEntryResponse(**log.to_dict()) for log in logs]
+                stats = self.data_manager.get_logs().get_buffer_stats()
+                return LogBufferStatsResponse(**stats)
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
         
@@ -386,6 +587,15 @@ class WebServer:
                 if request_data.taskId:
                     task_ids = [request_data.taskId]
                 
+                # Все задания "В работе" выбираются здесь: клиент видит только загруженные страницы
+                if request_data.allInWork:
+                    task_ids = [task.id for task in self.task_service.get_active_tasks_in_order()]
+                    if not task_ids:
+                        raise HTTPException(
+                            status_code=400,
+                            detail='Нет заданий для выполнения (установите флажок "В работе")'
+                        )
+                
                 if not task_ids:
                     raise HTTPException(status_code=400, detail="Не указаны задания для выполнения")
                 
@@ -429,7 +639,7 @@ class WebServer:
                 thread = threading.Thread(target=run_automation, daemon=True)
                 thread.start()
                 
-                return AutomationResponse(success=True)
+                return AutomationResponse(success=True, task_count=len(task_ids))
             except HTTPException:
                 raise
             except Exception as e:
@@ -475,12 +685,60 @@ class WebServer:
                 raise
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
+    
+    @staticmethod
+    def _task_from_create(task_data: TaskCreate) -> Task:
+        """Создает задание из данных запроса"""
+        return Task(
+            type_task=task_data.type_task,
+            status=task_data.status,
+            date=task_data.date,
+            time_slot=task_data.time_slot,
+            num_auto=task_data.num_auto,
+            driver=task_data.driver,
+            place=task_data.place,
+            index_container=task_data.index_container,
+            number_container=task_data.number_container,
+            release_order=task_data.release_order,
+            contract_terminal=task_data.contract_terminal,
+            time_cancel=task_data.time_cancel,
+            count_try=task_data.count_try,
+            delay_try=task_data.delay_try
+        )
+    
+    @staticmethod
+    def _etag(name: str, repo) -> Optional[str]:
+        """ETag по версии хранилища; None, если хранилище не ведет версий
+        
+        Версию нужно брать до чтения данных: тогда данные не старше ETag.
+        """
+        version = repo.version()
+        return f'"{name}-{version}"' if version is not None else None
+    
+    @staticmethod
+    def _cache_headers(etag: Optional[str]) -> Dict[str, str]:
+        """Заголовки ответа: ETag и обязательная проверка актуальности перед использованием кэша"""
+        if etag is None:
+            return {}
+        return {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    def _not_modified(self, request: Request, etag: Optional[str]) -> Optional[Response]:
+        """Ответ 304, если у клиента уже есть данные с этим ETag"""
+        if etag is None:
+            return None
+        header = request.headers.get("if-none-match")
+        if not header:
+            return None
+        tags = [tag.strip() for tag in header.split(",")]
+        if "*" in tags or etag in tags or f"W/{etag}" in tags:
+            return Response(status_code=304, headers=self._cache_headers(etag))
+        return None
 
 
 def create_web_server(
     task_service: TaskService,
     automation_service: AutomationService,
-    data_manager: JSONDataManager
+    data_manager: DataManager
 ) -> WebServer:
     """Создает веб-сервер"""
     return WebServer(task_service, automation_service, data_manager)
@@ -1,5 +1,6 @@
 // Глобальные переменные
 let currentTasks = [];
+let tasksNextCursor = null;
 let currentSettings = {};
 let currentReferences = {};
 let currentTab = 'tasks';
@@ -56,6 +57,7 @@ function setupEventListeners() {
 
     // Кнопки управления
     document.getElementById('add-task-btn').addEventListener('click', async () => await openTaskModal());
+    document.getElementById('load-more-tasks-btn').addEventListener('click', () => loadMoreTasks());
     document.getElementById('start-automation-sequential-btn').addEventListener('click', () => startAutomation(false));
     document.getElementById('start-automation-parallel-btn').addEventListener('click', () => startAutomation(true));
     document.getElementById('stop-automation-btn').addEventListener('click', stopAutomation);
@@ -142,31 +144,135 @@ function switchReferenceType(refType) {
 function loadInitialData() {
     loadTasks();
     loadLogs();
+    connectEventStream();
+}
+
+// Таймеры опроса сервера, пока поток событий недоступен
+let pollingTimers = [];
+
+function startPolling() {
+    if (pollingTimers.length > 0) {
+        return;
+    }
 
     // Обновление данных: задания каждые 30 секунд, логи каждые 5 секунд
-    setInterval(() => {
+    pollingTimers.push(setInterval(() => {
         if (currentTab === 'tasks') {
             loadTasks();
         }
-    }, 30000);
+    }, 30000));
 
     // Частое обновление логов для отслеживания автоматизации
-    setInterval(() => {
+    pollingTimers.push(setInterval(() => {
+        loadLogs();
+    }, 5000));
+}
+
+function stopPolling() {
+    pollingTimers.forEach(timer => clearInterval(timer));
+    pollingTimers = [];
+}
+
+// Подписка на поток событий сервера; при его недоступности работает опрос
+function connectEventStream() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    const source = new EventSource('/api/stream');
+
+    source.addEventListener('open', () => {
+        stopPolling();
+        // После (пере)подключения догружаем то, что могло измениться без нас
+        loadTasks();
+        loadLogs();
+    });
+
+    source.addEventListener('logs', (e) => {
+        const data = JSON.parse(e.data);
+        appendLogs(data.entries);
+        logCursor = data.cursor;
+    });
+
+    source.addEventListener('tasks', (e) => {
+        applyTaskChanges(JSON.parse(e.data));
+    });
+
+    source.addEventListener('resync', () => {
+        loadTasks();
+        logCursor = null;
         loadLogs();
-    }, 5000);
+    });
+
+    // Браузер сам переподключается к потоку, а пока опрашиваем сервер
+    source.addEventListener('error', () => {
+        startPolling();
+    });
+}
+
+// Применение изменений заданий из потока событий
+function applyTaskChanges(changes) {
+    const byId = new Map(currentTasks.map(task => [task.id, task]));
+
+    // Новые, удаленные и перемещенные задания меняют состав и порядок таблицы - перечитываем страницу
+    const needsReload = changes.deleted.some(id => byId.has(id)) || changes.changed.some(task => {
+        const current = byId.get(task.id);
+        return current ? current.position !== task.position : !tasksNextCursor;
+    });
+    if (needsReload) {
+        loadTasks();
+        return;
+    }
+
+    const tbody = document.querySelector('#tasks-table tbody');
+    changes.changed.forEach(task => {
+        const current = byId.get(task.id);
+        if (!current) {
+            return;
+        }
+        Object.assign(current, task);
+        const row = tbody.querySelector(`tr[data-task-id="${task.id}"]`);
+        if (row) {
+            row.replaceWith(createTaskRow(current));
+        }
+    });
+}
+
+// Кэш GET-ответов по ETag: URL -> { etag, text }
+const API_CACHE_LIMIT = 50;
+const apiCache = new Map();
+
+// Сохранение ответа в кэш; самые старые записи вытесняются
+function cacheApiResponse(url, etag, text) {
+    apiCache.delete(url);
+    apiCache.set(url, { etag, text });
+    if (apiCache.size > API_CACHE_LIMIT) {
+        apiCache.delete(apiCache.keys().next().value);
+    }
 }
 
 // API запросы
 async function apiRequest(url, options = {}) {
     try {
+        const method = (options.method || 'GET').toUpperCase();
+        const cached = method === 'GET' ? apiCache.get(url) : null;
+
         const response = await fetch(url, {
+            ...options,
             headers: {
                 'Content-Type': 'application/json',
+                // Сервер ответит 304 без тела, если данные не изменились
+                ...(cached ? { 'If-None-Match': cached.etag } : {}),
                 ...options.headers
-            },
-            ...options
+            }
         });
 
+        if (response.status === 304 && cached) {
+            // Разбираем сохраненный текст заново, чтобы изменения объектов на странице не попадали в кэш
+            return JSON.parse(cached.text);
+        }
+
         if (!response.ok) {
             // Создаем ошибку с дополнительной информацией о статусе
             const errorText = await response.text();
@@ -178,6 +284,12 @@ async function apiRequest(url, options = {}) {
 
         const contentType = response.headers.get('content-type');
         if (contentType && contentType.includes('application/json')) {
+            const etag = response.headers.get('ETag');
+            if (method === 'GET' && etag) {
+                const text = await response.text();
+                cacheApiResponse(url, etag, text);
+                return JSON.parse(text);
+            }
             return await response.json();
         }
 
@@ -191,27 +303,67 @@ async function apiRequest(url, options = {}) {
     }
 }
 
-// Загрузка заданий
+// Размер страницы заданий и максимум, который сервер отдает за один запрос
+const TASKS_PAGE_SIZE = 100;
+const TASKS_MAX_PAGE_SIZE = 1000;
+
+// Загрузка заданий: сервер отдает их страницами уже в порядке выполнения
 async function loadTasks() {
     try {
-        const tasks = await apiRequest('/api/tasks');
-        // Сортируем задания по позиции (position) для правильного отображения порядка
-        currentTasks = tasks.sort((a, b) => (a.position || 0) - (b.position || 0));
+        // При обновлении перечитываем столько заданий, сколько уже показано,
+        // страницами не больше TASKS_MAX_PAGE_SIZE
+        const wanted = Math.max(currentTasks.length, TASKS_PAGE_SIZE);
+        let items = [];
+        let cursor = null;
+        do {
+            const limit = Math.min(wanted - items.length, TASKS_MAX_PAGE_SIZE);
+            const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+            const page = await apiRequest(`/api/tasks?limit=${limit}${cursorParam}`);
+            items = items.concat(page.items);
+            cursor = page.next_cursor;
+        } while (cursor && items.length < wanted);
+        currentTasks = items;
+        tasksNextCursor = cursor;
         displayTasks();
     } catch (error) {
         console.error('Error loading tasks:', error);
     }
 }
 
+// Загрузка следующей страницы заданий
+async function loadMoreTasks() {
+    if (!tasksNextCursor) {
+        return;
+    }
+
+    try {
+        const page = await apiRequest(`/api/tasks?limit=${TASKS_PAGE_SIZE}&cursor=${encodeURIComponent(tasksNextCursor)}`);
+        currentTasks = currentTasks.concat(page.items);
+        tasksNextCursor = page.next_cursor;
+        appendTaskRows(page.items);
+    } catch (error) {
+        console.error('Error loading tasks:', error);
+        showError('❌ Ошибка загрузки заданий');
+    }
+}
+
 // Отображение заданий
 function displayTasks() {
     const tbody = document.querySelector('#tasks-table tbody');
     tbody.innerHTML = '';
+    appendTaskRows(currentTasks);
+}
 
-    currentTasks.forEach(task => {
-        const row = createTaskRow(task);
-        tbody.appendChild(row);
+// Добавление строк заданий в конец таблицы одной вставкой в DOM
+function appendTaskRows(tasks) {
+    const tbody = document.querySelector('#tasks-table tbody');
+    const fragment = document.createDocumentFragment();
+    tasks.forEach(task => {
+        fragment.appendChild(createTaskRow(task));
     });
+    tbody.appendChild(fragment);
+
+    document.getElementById('load-more-tasks-btn').style.display = tasksNextCursor ? '' : 'none';
 }
 
 // Создание строки задания
@@ -497,15 +649,9 @@ async function deleteTask(taskId) {
 
 // Запуск автоматизации
 async function startAutomation(isParallel = false) {
-    const selectedTasks = currentTasks.filter(task => task.in_work);
-
-    if (selectedTasks.length === 0) {
-        showError('Выберите задания для выполнения (установите флажок "В работе")');
-        return;
-    }
-
+    // Задания "В работе" выбирает сервер: в таблице могут быть загружены не все страницы
     const requestData = {
-        taskIds: selectedTasks.map(task => task.id),
+        allInWork: true,
         sequential: !isParallel,
         parallel: isParallel
     };
@@ -517,7 +663,7 @@ async function startAutomation(isParallel = false) {
     }
 
     try {
-        await apiRequest('/api/automation/start', {
+        const result = await apiRequest('/api/automation/start', {
             method: 'POST',
             body: JSON.stringify(requestData)
         });
@@ -525,7 +671,7 @@ async function startAutomation(isParallel = false) {
         updateAutomationStatus('running');
         
         const mode = isParallel ? `параллельно (макс. ${requestData.maxConcurrency || 5} одновременно)` : 'поочередно';
-        showSuccess(`🚀 Автоматизация запущена для ${selectedTasks.length} заданий. Обработка будет происходить ${mode}.`);
+        showSuccess(`🚀 Автоматизация запущена для ${result.task_count} заданий. Обработка будет происходить ${mode}.`);
     } catch (error) {
         console.error('Error starting automation:', error);
         showError('Ошибка при запуске автоматизации: ' + error.message);
@@ -807,40 +953,97 @@ function getReferenceFieldName(referenceType) {
     return fieldMapping[referenceType] || 'operation_types';
 }
 
-// Загрузка логов
+// Курсор последней полученной записи лога: сервер отдает только записи после него
+let logCursor = null;
+
+// Максимум записей в ответе /api/logs?since= (LOGS_MAX_DELTA_SIZE на сервере)
+const LOGS_DELTA_LIMIT = 1000;
+
+// Загрузка логов: первый раз - последние записи, затем только новые
 async function loadLogs() {
     try {
-        const logs = await apiRequest('/api/logs');
-        displayLogs(logs);
+        if (logCursor === null) {
+            const data = await apiRequest('/api/logs?since=');
+            displayLogs(data.entries);
+            logCursor = data.cursor;
+            return;
+        }
+
+        const data = await apiRequest(`/api/logs?since=${encodeURIComponent(logCursor)}&limit=${LOGS_DELTA_LIMIT}`);
+        if (data.entries.length >= LOGS_DELTA_LIMIT) {
+            // Пропущено слишком много записей - проще загрузить последние заново
+            logCursor = null;
+            return loadLogs();
+        }
+        appendLogs(data.entries);
+        logCursor = data.cursor;
     } catch (error) {
+        if (error.status === 400) {
+            // Курсор больше не действителен (например, после восстановления хранилища)
+            logCursor = null;
+        }
         console.error('Error loading logs:', error);
     }
 }
 
+// Сколько записей лога держим на странице
+const MAX_LOG_ROWS = 100;
+
+// ID показанных записей: поток событий и перезагрузка списка могут прислать одну запись дважды
+let displayedLogIds = new Set();
+
 // Отображение логов
 function displayLogs(logs) {
     const container = document.getElementById('logs-content');
-    const wasAtBottom = container.scrollTop >= (container.scrollHeight - container.clientHeight - 50);
-
     container.innerHTML = '';
+    displayedLogIds = new Set();
+    appendLogs(logs);
+}
 
+// Добавление записей лога в конец списка; старые записи сверх MAX_LOG_ROWS удаляются
+function appendLogs(logs) {
+    logs = logs.filter(log => !displayedLogIds.has(log.id));
+    if (logs.length === 0) {
+        return;
+    }
+
+    const container = document.getElementById('logs-content');
+    const wasAtBottom = container.scrollTop >= (container.scrollHeight - container.clientHeight - 50);
+
+    const fragment = document.createDocumentFragment();
     logs.forEach(log => {
-        const div = document.createElement('div');
-        div.className = `log-entry ${log.level.toLowerCase()}`;
-        div.innerHTML = `
-            <div class="log-timestamp">${formatTimestamp(log.timestamp)}</div>
-            <div class="log-category">${log.category}</div>
-            <div class="log-message">${log.message}</div>
-        `;
-        container.appendChild(div);
+        displayedLogIds.add(log.id);
+        fragment.appendChild(createLogElement(log));
     });
+    container.appendChild(fragment);
+
+    while (container.childElementCount > MAX_LOG_ROWS) {
+        displayedLogIds.delete(container.firstElementChild.dataset.logId);
+        container.firstElementChild.remove();
+    }
+
+    // Новые записи подчиняются выбранным фильтрам
+    filterLogs();
 
     // Автопрокрутка к последнему сообщению (только если пользователь был внизу)
-    if (wasAtBottom || logs.length === 1) {
+    if (wasAtBottom || container.childElementCount === logs.length) {
         container.scrollTop = container.scrollHeight;
     }
 }
 
+// Элемент записи лога
+function createLogElement(log) {
+    const div = document.createElement('div');
+    div.className = `log-entry ${log.level.toLowerCase()}`;
+    div.dataset.logId = log.id;
+    div.innerHTML = `
+        <div class="log-timestamp">${formatTimestamp(log.timestamp)}</div>
+        <div class="log-category">${log.category}</div>
+        <div class="log-message">${log.message}</div>
+    `;
+    return div;
+}
+
 // Фильтрация логов
 function filterLogs() {
     const levelFilter = document.getElementById('log-level-filter').value;
@@ -870,6 +1073,7 @@ function filterLogs() {
 function clearLogs() {
     if (confirm('Очистить все логи?')) {
         document.getElementById('logs-content').innerHTML = '';
+        displayedLogIds = new Set();
     }
 }
 
@@ -1151,8 +1355,8 @@ function handleDrop(e) {
             tbody.insertBefore(draggedRow, this);
         }
 
-        // Обновляем позиции заданий
-        updateTaskPositions();
+        // Сообщаем серверу, перед каким заданием оказалось перемещенное
+        moveTaskBeforeRow(draggedRow.dataset.taskId, draggedRow.nextElementSibling);
     }
 
     this.classList.remove('drag-over');
@@ -1169,33 +1373,41 @@ function handleDragEnd(e) {
     draggedRow = null;
 }
 
-// Обновление позиций заданий на сервере
-async function updateTaskPositions() {
-    try {
-        const tbody = document.querySelector('#tasks-table tbody');
-        const rows = Array.from(tbody.querySelectorAll('tr'));
+// Перемещение задания перед строкой таблицы. После последней загруженной строки
+// задание встает перед первым заданием следующей страницы, а не в самый конец списка
+async function moveTaskBeforeRow(taskId, nextRow) {
+    if (nextRow || !tasksNextCursor) {
+        return moveTask(taskId, nextRow ? nextRow.dataset.taskId : null);
+    }
 
-        const taskPositions = {};
-        rows.forEach((row, index) => {
-            const taskId = row.dataset.taskId;
-            if (taskId) {
-                taskPositions[taskId] = index + 1; // Позиции начинаются с 1
-            }
-        });
+    try {
+        const page = await apiRequest(`/api/tasks?limit=1&cursor=${encodeURIComponent(tasksNextCursor)}`);
+        await moveTask(taskId, page.items.length ? page.items[0].id : null);
+        // Задание стало последним загруженным, а курсор следующей страницы указывает
+        // на прежнее последнее - перечитываем показанные задания вместе с курсором
+        loadTasks();
+    } catch (error) {
+        console.error('Error loading tasks:', error);
+        showError('❌ Ошибка при обновлении порядка заданий');
+        loadTasks();
+    }
+}
 
-        // Отправляем обновленные позиции на сервер
-        await apiRequest('/api/tasks/reorder', {
+// Перемещение задания на сервере: меняется только позиция перемещенного задания
+async function moveTask(taskId, beforeId) {
+    try {
+        const movedTask = await apiRequest('/api/tasks/move', {
             method: 'POST',
-            body: JSON.stringify({ task_positions: taskPositions })
+            body: JSON.stringify({ task_id: taskId, before_id: beforeId })
         });
 
         // Обновляем локальный список заданий
-        updateLocalTaskPositions(taskPositions);
+        updateLocalTaskPosition(movedTask);
 
         showSuccess('✅ Порядок заданий обновлен');
 
     } catch (error) {
-        console.error('Error updating task positions:', error);
+        console.error('Error moving task:', error);
         showError('❌ Ошибка при обновлении порядка заданий');
 
         // Перезагружаем задания для восстановления исходного порядка
@@ -1203,13 +1415,13 @@ async function updateTaskPositions() {
     }
 }
 
-// Обновление локального списка заданий с новыми позициями
-function updateLocalTaskPositions(taskPositions) {
-    currentTasks.forEach(task => {
-        if (taskPositions[task.id] !== undefined) {
-            task.position = taskPositions[task.id];
-        }
-    });
+// Обновление позиции задания в локальном списке
+function updateLocalTaskPosition(movedTask) {
+    const task = currentTasks.find(t => t.id === movedTask.id);
+    if (task) {
+        task.position = movedTask.position;
+        task.updated_at = movedTask.updated_at;
+    }
 
     // Сортируем по новым позициям
     currentTasks.sort((a, b) => (a.position || 0) - (b.position || 0));
@@ -0,0 +1,127 @@
+"""Разбор тела импорта заданий: CSV или NDJSON (объект JSON на строку)
+
+Тело читается по мере поступления: строки разбираются и проверяются, не
+дожидаясь конца загрузки, а в памяти держится только незаконченная
+строка. Каждая строка дает тройку (номер строки, поля, ошибка): ошибка
+одной строки не прерывает импорт. Ошибки всего тела (кодировка,
+заголовок CSV) поднимаются как ValueError.
+"""
+import codecs
+import csv
+import io
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from repository import codec
+
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+# Типы содержимого для определения формата по заголовку Content-Type
+CONTENT_TYPES = {
+    "text/csv": CSV,
+    "application/csv": CSV,
+    "application/x-ndjson": NDJSON,
+    "application/ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+    "application/x-jsonlines": NDJSON,
+}
+
+# Разделители CSV: выбирается встречающийся в заголовке чаще других (Excel пишет ";")
+DELIMITERS = ",;\t"
+
+# Строка импорта: (номер строки в файле, поля или None, текст ошибки или None)
+ImportRow = Tuple[int, Optional[Dict[str, str]], Optional[str]]
+
+
+def detect_format(content_type: str) -> Optional[str]:
+    """Формат импорта по заголовку Content-Type; None, если тип не поддерживается"""
+    return CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Строки UTF-8 (BOM допускается) из потока байтов с номерами, начиная с 1"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_no = 0
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            lines = pending.split("\n")
+            pending = lines.pop()
+            for line in lines:
+                line_no += 1
+                yield line_no, line.rstrip("\r")
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ValueError(f"Тело импорта должно быть в кодировке UTF-8 (строка {line_no + 1})")
+    if pending:
+        yield line_no + 1, pending.rstrip("\r")
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[ImportRow]:
+    """Строки NDJSON: каждая непустая строка - объект JSON с полями задания"""
+    async for line_no, line in lines:
+        if not line.strip():
+            continue
+        try:
+            data = codec.loads(line)
+        except Exception as e:
+            yield line_no, None, f"Некорректный JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield line_no, None, "Строка должна быть объектом JSON"
+            continue
+        yield line_no, data, None
+
+
+async def iter_csv_rows(
+    lines: AsyncIterator[Tuple[int, str]],
+    fields: Set[str],
+    required: Set[str]
+) -> AsyncIterator[ImportRow]:
+    """Строки CSV с заголовком из имен полей задания; пустые ячейки пропускаются"""
+    header: Optional[List[str]] = None
+    delimiter = ","
+    record: List[str] = []
+    quotes = 0
+    start = 0
+    async for line_no, line in lines:
+        if not record:
+            start = line_no
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            # Кавычка не закрыта: значение продолжается на следующей строке
+            continue
+        text = "\n".join(record)
+        record, quotes = [], 0
+        if not text.strip():
+            continue
+
+        if header is None:
+            delimiter = max(DELIMITERS, key=text.count)
+            header = [name.strip() for name in _parse_record(text, delimiter)]
+            unknown = [name for name in header if name not in fields]
+            if unknown:
+                raise ValueError(f"Неизвестные колонки CSV: {', '.join(unknown)}")
+            missing = sorted(required - set(header))
+            if missing:
+                raise ValueError(f"В CSV нет обязательных колонок: {', '.join(missing)}")
+            continue
+
+        values = _parse_record(text, delimiter)
+        if len(values) > len(header):
+            yield start, None, f"Значений больше, чем колонок: {len(values)} > {len(header)}"
+            continue
+        yield start, {name: value.strip() for name, value in zip(header, values) if value.strip()}, None
+
+    if record:
+        yield start, None, "Незакрытая кавычка"
+    if header is None:
+        raise ValueError("Пустой CSV: нет строки заголовка")
+
+
+def _parse_record(text: str, delimiter: str) -> List[str]:
+    """Разбирает одну запись CSV"""
+    return next(csv.reader(io.StringIO(text), delimiter=delimiter), [])
@@ -10,7 +10,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from web.server import create_web_server
-from repository.json_repository import JSONDataManager
+from repository import create_data_manager
 from service.task_service import TaskService
 from service.automation_service import AutomationService
 from domain.log import LogEntry, LogLevel, LogCategory
@@ -25,7 +25,7 @@ def create_app():
     data_dir = home_dir / ".rlisystems_python"
     
     # Инициализируем менеджер данных
-    data_manager = JSONDataManager(str(data_dir))
+    data_manager = create_data_manager(str(data_dir))
     data_manager.initialize()
     
     if not data_manager.is_healthy():
@@ -38,7 +38,8 @@ def create_app():
         data_manager.get_tasks(),
         data_manager.get_logs(),
         data_manager.get_references(),
-        data_manager.get_settings()
+        data_manager.get_settings(),
+        data_manager.unit_of_work
     )
     
     automation_service = AutomationService(